@@ -4,17 +4,36 @@
 # @File     : main.py
 
 import sys
-from src import pyside_version
+import time
+
+# 启动时刻，用于启动耗时分析
+_START = time.perf_counter()
 
 
 class ClickRun:
     def __init__(self):
         pass
 
-    def run_pyside_version(self):
+    def run_pyside_version(self, profile=False):
+        from src.startup import PROFILER
+        if profile:
+            PROFILER.enable(_START)
+        # 延迟导入，命令行模式下不加载 GUI 工具包
+        with PROFILER.phase("import_toolkit"):
+            from src import pyside_version
         pyside_version.main()
 
+    def run_cli(self, argv):
+        from src import cli
+        return cli.main(argv)
+
 
 if __name__ == "__main__":
     app = ClickRun()
-    app.run_pyside_version()
+    args = sys.argv[1:]
+    if args == ["--profile-startup"]:
+        app.run_pyside_version(profile=True)
+    elif args:
+        sys.exit(app.run_cli(args))
+    else:
+        app.run_pyside_version()
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : audit.py
+import math
+import multiprocessing
+import os
+import re
+from bisect import bisect_right
+from collections import Counter
+from operator import eq, sub
+
+from src import pools
+
+# 每个分片读取的字节数
+CHUNK_BYTES = 8 * 1024 * 1024
+
+# 超过该长度的单个密码改用整块扫描
+LONG_PASSWORD = 4096
+
+# 强度等级 (名称, 有效熵下限（位）)，从高到低排列
+RATINGS = (
+    ("very_strong", 128),
+    ("strong", 60),
+    ("fair", 36),
+    ("weak", 28),
+    ("very_weak", 0),
+)
+
+# 每种字符类型的字节集合与大小，与 get_char_pool 使用相同的定义
+_CLASS_BYTES = tuple((name, chars.encode("ascii"), len(chars)) for name, chars in pools.CLASSES)
+_ALL_CLASS_BYTES = b"".join(chars for _, chars, _ in _CLASS_BYTES)
+
+
+def _build_deletes():
+    """每种字符类型对应的 translate 删除集合：删除该类型以外除换行外的所有字节"""
+    deletes = []
+    for _, chars, _ in _CLASS_BYTES:
+        keep = set(chars) | {ord("\n")}
+        deletes.append(bytes(b for b in range(256) if b not in keep))
+    return tuple(deletes)
+
+
+_CLASS_DELETES = _build_deletes()
+_OTHER_DELETE = _ALL_CLASS_BYTES
+# 字节值减一 / 加一的映射表，用于查找连续递增 / 递减的字符
+_MINUS_ONE = bytes((b - 1) % 256 for b in range(256))
+_PLUS_ONE = bytes((b + 1) % 256 for b in range(256))
+
+_NEWLINE = re.compile(b"\n")
+_ZERO = re.compile(b"\x00")
+
+
+def _xor(a: bytes, b: bytes) -> bytes:
+    """两个等长字节串逐字节异或，相同的位置为 0"""
+    return (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(len(a), "little")
+
+
+def _is_sequence(step, next_step):
+    """相邻两次差值相同且为 ±1，即 abc、321 这类连续序列"""
+    return step == next_step and (step == 1 or step == -1)
+
+
+def rating_for(bits: float) -> str:
+    """按有效熵获取强度等级"""
+    for name, threshold in RATINGS:
+        if bits >= threshold:
+            return name
+    return RATINGS[-1][0]
+
+
+def _scan(data: bytes) -> tuple:
+    """扫描单个密码，返回 (长度, 其他字符种数, 重复字符数, 序列字符数, 是否包含各字符类型...)
+
+    结果是可哈希的元组，批量审计时可以直接按元组计数。
+    """
+    flags = tuple(bool(data.translate(None, delete)) for delete in _CLASS_DELETES)
+    other = data.translate(None, _OTHER_DELETE)
+    steps = list(map(sub, data[1:], data[:-1]))
+    sequences = 0
+    # 大多数密码没有相邻相等的差值，先在 C 层判断，避免逐个调用 _is_sequence
+    if True in map(eq, steps, steps[1:]):
+        sequences = sum(map(_is_sequence, steps, steps[1:]))
+    return (len(data), len(set(other)), steps.count(0), sequences) + flags
+
+
+def _describe(scan: tuple) -> dict:
+    """由扫描结果计算熵与强度等级"""
+    length, other_size, repeats, sequences, *flags = scan
+    classes = []
+    pool_size = other_size
+    for enabled, (name, _, size) in zip(flags, _CLASS_BYTES):
+        if enabled:
+            classes.append(name)
+            pool_size += size
+    if other_size:
+        classes.append("other")
+    bits_per_char = math.log2(pool_size) if pool_size > 1 else 0.0
+    effective = (length - repeats - sequences) * bits_per_char
+    return {
+        "length": length,
+        "classes": classes,
+        "entropy": length * bits_per_char,
+        "effective_entropy": effective,
+        "repeats": repeats,
+        "sequences": sequences,
+        "rating": rating_for(effective),
+    }
+
+
+def analyze(password) -> dict:
+    """分析单个密码
+
+    - entropy: 按包含的字符类型计算的熵（长度 × log2(字符池大小)）
+    - effective_entropy: 去掉可预测字符（重复、连续序列）后的熵，用于评定等级
+    - classes: 包含的字符类型，other 表示不属于任何类型的字符
+    - repeats: 与前一个字符相同的字符数
+    - sequences: 处于连续递增或递减序列中（从第三个字符起）的字符数
+    """
+    data = password.encode("utf-8") if isinstance(password, str) else bytes(password)
+    if len(data) > LONG_PASSWORD and b"\n" not in data:
+        # 很长的结果（GUI 中可达数 MB）使用整块扫描
+        return _describe(next(_scan_chunk(data)))
+    return _describe(_scan(data))
+
+
+class AuditSummary:
+    """审计结果汇总，只保存计数，内存占用与密码数量无关"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_length = 0
+        self.total_entropy = 0.0
+        self.min_entropy = None
+        self.max_entropy = None
+        self.lengths = Counter()
+        self.ratings = Counter()
+        self.classes = Counter()
+        self.class_counts = Counter()
+        self.with_repeats = 0
+        self.with_sequences = 0
+
+    def add(self, result: dict, n: int = 1):
+        """加入 n 条相同的 analyze() 结果"""
+        self.count += n
+        self.total_length += result["length"] * n
+        entropy = result["effective_entropy"]
+        self.total_entropy += entropy * n
+        self.min_entropy = entropy if self.min_entropy is None else min(self.min_entropy, entropy)
+        self.max_entropy = entropy if self.max_entropy is None else max(self.max_entropy, entropy)
+        self.lengths[result["length"]] += n
+        self.ratings[result["rating"]] += n
+        for name in result["classes"]:
+            self.classes[name] += n
+        self.class_counts[len(result["classes"])] += n
+        if result["repeats"]:
+            self.with_repeats += n
+        if result["sequences"]:
+            self.with_sequences += n
+
+    def merge(self, other: "AuditSummary"):
+        """合并另一个分片的汇总"""
+        self.count += other.count
+        self.total_length += other.total_length
+        self.total_entropy += other.total_entropy
+        if other.count:
+            if self.min_entropy is None:
+                self.min_entropy, self.max_entropy = other.min_entropy, other.max_entropy
+            else:
+                self.min_entropy = min(self.min_entropy, other.min_entropy)
+                self.max_entropy = max(self.max_entropy, other.max_entropy)
+        self.lengths.update(other.lengths)
+        self.ratings.update(other.ratings)
+        self.classes.update(other.classes)
+        self.class_counts.update(other.class_counts)
+        self.with_repeats += other.with_repeats
+        self.with_sequences += other.with_sequences
+        return self
+
+    def to_dict(self) -> dict:
+        """紧凑的汇总报告"""
+        count = self.count or 1
+        return {
+            "count": self.count,
+            "length": {
+                "min": min(self.lengths) if self.lengths else 0,
+                "max": max(self.lengths) if self.lengths else 0,
+                "mean": self.total_length / count,
+            },
+            "effective_entropy": {
+                "min": self.min_entropy if self.count else 0.0,
+                "max": self.max_entropy if self.count else 0.0,
+                "mean": self.total_entropy / count,
+            },
+            "ratings": {name: self.ratings[name] for name, _ in RATINGS},
+            "classes": dict(self.classes),
+            "class_counts": {str(n): self.class_counts[n] for n in sorted(self.class_counts)},
+            "with_repeats": self.with_repeats,
+            "with_sequences": self.with_sequences,
+        }
+
+
+def audit_lines(lines) -> AuditSummary:
+    """审计一组字节串形式的密码（空行会被跳过）
+
+    先按扫描结果计数，再对每种不同的结果计算一次熵，
+    大批量审计时逐行的开销只剩 _scan 本身。
+    """
+    summary = AuditSummary()
+    for scan, n in Counter(map(_scan, filter(None, lines))).items():
+        summary.add(_describe(scan), n)
+    return summary
+
+
+def _scan_chunk(data: bytes):
+    """整块扫描以换行分隔的密码，结果与逐行调用 _scan 相同
+
+    每种字符类型整块 translate 一次，按行切分后非空即包含该类型；重复与连续序列
+    通过整块错位异或后查找 0 字节得到，只有命中的位置才回到 Python 层处理。
+    """
+    lines = data.split(b"\n")
+    flags = [map(bool, data.translate(None, delete).split(b"\n")) for delete in _CLASS_DELETES]
+    others = data.translate(None, _OTHER_DELETE)
+    if len(others) > len(lines) - 1:
+        other_sizes = [len(set(other)) for other in others.split(b"\n")]
+    else:
+        # 只有换行，没有任何其他字符
+        other_sizes = [0] * len(lines)
+
+    repeats = [0] * len(lines)
+    sequences = [0] * len(lines)
+    if len(data) > 1:
+        newlines = [match.start() for match in _NEWLINE.finditer(data)]
+        head, tail = data[:-1], data[1:]
+        for match in _ZERO.finditer(_xor(head, tail)):
+            position = match.start()
+            if data[position] != 10:
+                repeats[bisect_right(newlines, position)] += 1
+        # tail 减一后与 head 相同表示递增一步，加一后相同表示递减一步，连续两步即为序列
+        for table in (_MINUS_ONE, _PLUS_ONE):
+            steps = _xor(head, tail.translate(table))
+            # bytes.find 比带前瞻的正则快得多，逐个查找可以找到重叠的位置
+            position = steps.find(b"\x00\x00")
+            while position >= 0:
+                if b"\n" not in data[position:position + 3]:
+                    sequences[bisect_right(newlines, position)] += 1
+                position = steps.find(b"\x00\x00", position + 1)
+    return zip(map(len, lines), other_sizes, repeats, sequences, *flags)
+
+
+def audit_chunk(data: bytes) -> AuditSummary:
+    """审计一块以换行分隔的密码（空行会被跳过）"""
+    if b"\r" in data:
+        data = data.replace(b"\r", b"")
+    summary = AuditSummary()
+    for scan, n in Counter(_scan_chunk(data)).items():
+        if scan[0]:
+            summary.add(_describe(scan), n)
+    return summary
+
+
+def _read_range(path, start, end):
+    """读取 [start, end) 范围内开始的完整行
+
+    start 不为 0 时跳过第一个（不完整的）行，末尾的行读到换行为止，
+    相邻分片读取的行恰好不重不漏。
+    """
+    with open(path, "rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            # 前一个字节是换行说明分片恰好从行首开始
+            if f.read(1) != b"\n":
+                f.readline()
+        position = f.tell()
+        if position >= end:
+            return b""
+        data = f.read(end - position)
+        if not data.endswith(b"\n"):
+            data += f.readline()
+        return data
+
+
+def _audit_range(task):
+    """工作进程：审计文件中的一个分片"""
+    path, start, end = task
+    return audit_chunk(_read_range(path, start, end))
+
+
+def audit_stream(stream, chunk_bytes=CHUNK_BYTES) -> AuditSummary:
+    """逐块审计二进制输出流（如标准输入）中的密码"""
+    summary = AuditSummary()
+    rest = b""
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            break
+        data = rest + data
+        cut = data.rfind(b"\n") + 1
+        rest = data[cut:]
+        summary.merge(audit_chunk(data[:cut]))
+    if rest:
+        summary.merge(audit_chunk(rest))
+    return summary
+
+
+def audit_file(path, workers=None, chunk_bytes=CHUNK_BYTES) -> AuditSummary:
+    """多进程分片审计密码文件
+
+    每个工作进程自行读取文件中的一段，父进程只合并各分片的汇总，不传输文件内容。
+    workers 为 1 时在当前进程中执行。
+    """
+    size = os.path.getsize(path)
+    ranges = [(path, start, min(start + chunk_bytes, size)) for start in range(0, size, chunk_bytes)]
+    workers = workers or os.cpu_count() or 1
+    summary = AuditSummary()
+    if workers == 1 or len(ranges) <= 1:
+        for task in ranges:
+            summary.merge(_audit_range(task))
+        return summary
+    with multiprocessing.Pool(min(workers, len(ranges))) as process_pool:
+        for part in process_pool.imap_unordered(_audit_range, ranges):
+            summary.merge(part)
+    return summary
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : benchmark.py
+import json
+import platform
+import sys
+import time
+
+from src import engine, numpy_backend, pools, seeded, tasks
+
+# 单次生成的长度
+LENGTHS = (1, 16, 256, 4096, 65536, 1000000)
+# 批量生成的数量（每个 16 字符）
+BATCH_SIZES = (1, 100, 10000, 100000)
+BATCH_LENGTH = 16
+# 按字符类型组合测试时使用的长度
+POOL_LENGTH = 4096
+# 种子模式使用的固定种子，保证每次运行工作量一致
+SEED = 20251222
+
+
+def _pool_name(pool):
+    """字符类型组合名称，例如 upper+lower"""
+    return "+".join(name for enabled, (name, _) in zip(pool.flags, pools.CLASSES) if enabled)
+
+
+def measure(func, min_time=0.2, repeat=5):
+    """多轮计时，返回单次调用的最短耗时（秒）
+
+    每轮至少运行 min_time 秒，取各轮平均值中的最小值，减少调度抖动的影响。
+    """
+    best = None
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        per_call = elapsed / calls
+        best = per_call if best is None else min(best, per_call)
+    return best
+
+
+def _result(name, seconds, chars, tokens, **extra):
+    """生成一条测试结果"""
+    result = {
+        "name": name,
+        "seconds": seconds,
+        "chars_per_sec": chars / seconds if seconds else 0.0,
+        "tokens_per_sec": tokens / seconds if seconds else 0.0,
+    }
+    result.update(extra)
+    return result
+
+
+def _secure_backends():
+    """当前环境可用的安全随机后端"""
+    return [backend for backend in engine.SECURE_BACKENDS if backend != "numpy" or numpy_backend.AVAILABLE]
+
+
+def bench_pools(min_time, repeat):
+    """字符池获取（GUI 中的 get_char_pool）"""
+    results = []
+    for flags, pool in pools.POOLS.items():
+        name = _pool_name(pool)
+        seconds = measure(lambda: pools.get_pool(*flags), min_time, repeat)
+        results.append(_result(f"pool/lookup/{name}", seconds, 0, 1, pool=name))
+        seconds = measure(lambda: pools.build_table(pool.chars), min_time, repeat)
+        results.append(_result(f"pool/build/{name}", seconds, 0, 1, pool=name))
+    return results
+
+
+def bench_lengths(lengths, min_time, repeat):
+    """单个字符串的生成（GUI 中的安全随机与种子随机路径）"""
+    results = []
+    pool = pools.DEFAULT_POOL
+    for length in lengths:
+        for backend in _secure_backends():
+            seconds = measure(lambda: engine.generate(length, pool, backend), min_time, repeat)
+            results.append(_result(f"secure/{backend}/length={length}", seconds, length, 1,
+                                   backend=backend, length=length))
+        seconds = measure(lambda: seeded.SeededStream(SEED).generate(length, pool), min_time, repeat)
+        results.append(_result(f"seeded/length={length}", seconds, length, 1, backend="random", length=length))
+        seconds = measure(lambda: tasks.GenerationTask(length, pool).run(), min_time, repeat)
+        results.append(_result(f"task/secrets/length={length}", seconds, length, 1,
+                               backend="secrets", length=length))
+    return results
+
+
+def bench_batches(batch_sizes, min_time, repeat):
+    """批量生成（命令行批量模式）"""
+    results = []
+    pool = pools.DEFAULT_POOL
+    for count in batch_sizes:
+        chars = count * BATCH_LENGTH
+        for backend in _secure_backends():
+            seconds = measure(lambda: engine.generate_lines(count, BATCH_LENGTH, pool, backend=backend),
+                              min_time, repeat)
+            results.append(_result(f"batch/{backend}/count={count}", seconds, chars, count,
+                                   backend=backend, count=count, length=BATCH_LENGTH))
+        seconds = measure(lambda: seeded.shard_lines(SEED, 0, count, BATCH_LENGTH, pool), min_time, repeat)
+        results.append(_result(f"batch/seeded/count={count}", seconds, chars, count,
+                               backend="random", count=count, length=BATCH_LENGTH))
+    return results
+
+
+def bench_pool_combinations(min_time, repeat):
+    """每种字符类型组合下的生成速度"""
+    results = []
+    for pool in pools.POOLS.values():
+        name = _pool_name(pool)
+        for backend in _secure_backends():
+            seconds = measure(lambda: engine.generate(POOL_LENGTH, pool, backend), min_time, repeat)
+            results.append(_result(f"combo/{backend}/{name}", seconds, POOL_LENGTH, 1,
+                                   backend=backend, pool=name, length=POOL_LENGTH))
+    return results
+
+
+def run(quick=False, min_time=0.2, repeat=5):
+    """运行全部测试"""
+    lengths = LENGTHS[:-1] if quick else LENGTHS
+    batch_sizes = BATCH_SIZES[:-1] if quick else BATCH_SIZES
+    if quick:
+        min_time, repeat = min_time / 4, max(1, repeat // 2)
+    results = []
+    results.extend(bench_pools(min_time, repeat))
+    results.extend(bench_lengths(lengths, min_time, repeat))
+    results.extend(bench_batches(batch_sizes, min_time, repeat))
+    results.extend(bench_pool_combinations(min_time, repeat))
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "numpy": numpy_backend.AVAILABLE,
+            "quick": quick,
+            "min_time": min_time,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold=0.1):
+    """与基线比较，返回吞吐量下降超过 threshold 的测试项"""
+    baseline_results = {item["name"]: item for item in baseline.get("results", [])}
+    regressions = []
+    for item in report["results"]:
+        old = baseline_results.get(item["name"])
+        if old is None or not old["tokens_per_sec"]:
+            continue
+        ratio = item["tokens_per_sec"] / old["tokens_per_sec"]
+        if ratio < 1 - threshold:
+            regressions.append({
+                "name": item["name"],
+                "baseline_tokens_per_sec": old["tokens_per_sec"],
+                "tokens_per_sec": item["tokens_per_sec"],
+                "ratio": ratio,
+            })
+    return regressions
+
+
+def main(output=None, baseline=None, quick=False, threshold=0.1):
+    """运行测试、写出 JSON 报告并与基线比较，存在性能回退时返回 1"""
+    report = run(quick=quick)
+    for item in report["results"]:
+        print(f"{item['name']:<40} {item['chars_per_sec']:>16,.0f} chars/s {item['tokens_per_sec']:>14,.0f} tokens/s")
+
+    if baseline:
+        with open(baseline, "r", encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), threshold)
+        for item in report["regressions"]:
+            print(f"性能回退: {item['name']} {item['ratio']:.2%}")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+    return 1 if report.get("regressions") else 0
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : cli.py
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+
+from src import engine, policy, pools, streaming
+from src.metrics import METRICS
+from src.settings import Settings
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# 每次生成并写出的字符数上限，控制内存占用
+CHUNK_CHARS = streaming.CHUNK_CHARS
+
+
+def build_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="main.py", description="安全随机字符串生成器（命令行模式）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    gen = subparsers.add_parser("gen", help="批量生成随机字符串")
+    gen.add_argument("-n", "--count", type=int, default=1, help="生成数量")
+    gen.add_argument("-l", "--length", type=int, default=None, help="字符串长度")
+    gen.add_argument("--upper", action="store_true", help="包含大写字母")
+    gen.add_argument("--lower", action="store_true", help="包含小写字母")
+    gen.add_argument("--digits", action="store_true", help="包含阿拉伯数字")
+    gen.add_argument("--special", action="store_true", help="包含特殊字符")
+    gen.add_argument("-o", "--output", default="-", help="输出文件，默认为标准输出")
+    gen.add_argument("-j", "--workers", type=int, default=1, help="并行进程数，0 表示使用全部 CPU")
+    gen.add_argument("--backend", choices=engine.SECURE_BACKENDS, default=None, help="安全随机生成后端")
+    gen.add_argument("--seed", type=int, default=None, help="使用可复现的种子随机（非安全随机）")
+    gen.add_argument("--unordered", action="store_true", help="并行模式下按完成顺序输出（更快）")
+    gen.add_argument("--mmap", action="store_true", help="预分配输出文件并通过内存映射写入")
+    gen.add_argument("--min-per-class", type=int, default=None, help="每种已选字符类型至少出现的次数")
+    gen.add_argument("--no-consecutive", action=argparse.BooleanOptionalAction, default=None,
+                     help="相邻字符不能相同")
+    gen.add_argument("--unique", action=argparse.BooleanOptionalAction, default=None, help="所有字符互不相同")
+    gen.add_argument("--registry", default=None, help="发放登记表目录，保证与本次及历史发放的字符串均不重复")
+    gen.add_argument("--passphrase", action="store_true", help="生成口令（从词表中抽取单词）")
+    gen.add_argument("--wordlist", default=None, help="口令模式使用的词表（每行一个单词）")
+    gen.add_argument("--words", type=int, default=None, help="口令的单词个数")
+    gen.add_argument("--separator", default=None, help="口令单词之间的分隔符")
+    gen.add_argument("--capitalize", action=argparse.BooleanOptionalAction, default=None, help="单词首字母大写")
+    gen.add_argument("--digit", action=argparse.BooleanOptionalAction, default=None, help="在口令中插入一位数字")
+    gen.add_argument("--template", default=None,
+                     help="按模板或预设名称生成（如 AAAA-9999-????，? 使用所选字符类型），忽略长度与约束")
+    gen.add_argument("--metrics", default=None, help="导出耗时指标的文件（.json 为 JSON 快照，其他为 Prometheus 格式）")
+
+    registry = subparsers.add_parser("registry", help="管理发放登记表")
+    registry.add_argument("path", help="登记表目录")
+    registry_actions = registry.add_subparsers(dest="action", required=True)
+    registry_actions.add_parser("info", help="显示登记表概况")
+    registry_actions.add_parser("compact", help="合并全部段文件")
+    registry_merge = registry_actions.add_parser("merge", help="合并其他登记表")
+    registry_merge.add_argument("sources", nargs="+", help="要合并的登记表目录")
+    registry_check = registry_actions.add_parser("check", help="检查文件中已发放过的字符串数量")
+    registry_check.add_argument("input", nargs="?", default="-", help="字符串文件（每行一个），默认为标准输入")
+
+    serve = subparsers.add_parser("serve", help="启动本地生成服务")
+    serve.add_argument("--host", default="127.0.0.1", help="监听地址")
+    serve.add_argument("--port", type=int, default=8765, help="监听端口")
+    serve.add_argument("--unix", default=None, help="监听 Unix 套接字路径（代替 TCP）")
+    serve.add_argument("--backend", choices=engine.SECURE_BACKENDS, default=None, help="安全随机生成后端")
+
+    audit = subparsers.add_parser("audit", help="审计密码列表的强度")
+    audit.add_argument("input", nargs="?", default="-", help="密码文件（每行一个），默认为标准输入")
+    audit.add_argument("-j", "--workers", type=int, default=0, help="并行进程数，0 表示使用全部 CPU")
+    audit.add_argument("-o", "--output", default=None, help="JSON 报告输出文件，默认输出到标准输出")
+
+    bench = subparsers.add_parser("bench", help="运行性能基准测试")
+    bench.add_argument("-o", "--output", default=None, help="JSON 报告输出文件")
+    bench.add_argument("--baseline", default=None, help="用于比较的基线 JSON 报告")
+    bench.add_argument("--threshold", type=float, default=0.1, help="判定为性能回退的吞吐量下降比例")
+    bench.add_argument("--quick", action="store_true", help="快速模式（跳过最大的测试规模）")
+    return parser
+
+
+def _resolve_pool(args, settings):
+    """命令行未指定字符类型时使用配置中的默认值"""
+    if args.upper or args.lower or args.digits or args.special:
+        return pools.get_pool(args.upper, args.lower, args.digits, args.special)
+    return pools.get_pool(
+        settings.default_include_upper,
+        settings.default_include_lower,
+        settings.default_include_number,
+        settings.default_include_special,
+    )
+
+
+def _started(chunks):
+    """先生成第一块再返回迭代器：生成器一开始就失败时（如登记表已耗尽）不会留下空的输出文件"""
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        return iter(())
+    return itertools.chain((first,), chunks)
+
+
+def _write_output(args, chunks, size=None):
+    """写出到标准输出或 -o 指定的文件，size 为 --mmap 预分配的大小"""
+    chunks = _started(chunks)
+    if args.output == "-":
+        streaming.write_stream(sys.stdout.buffer, chunks)
+        sys.stdout.buffer.flush()
+    elif args.mmap:
+        streaming.write_mmap(args.output, chunks, size)
+    else:
+        # 块大小已足够大，直接写入文件，不再经过缓冲区复制
+        with open(args.output, "wb", buffering=0) as f:
+            streaming.write_stream(f, chunks)
+
+
+def _passphrase_chunks(args, parser, settings):
+    """口令模式：按命令行参数（未指定时使用配置）逐块生成"""
+    from src import passphrase, seeded
+
+    if args.mmap or args.registry or args.workers != 1:
+        parser.error("口令模式不支持 --mmap、--registry 与并行模式")
+    path = args.wordlist or settings.passphrase_wordlist
+    if not path:
+        parser.error("口令模式需要通过 --wordlist 或配置指定词表")
+    try:
+        spec = passphrase.Passphrase(
+            settings.passphrase_words if args.words is None else args.words,
+            settings.passphrase_separator if args.separator is None else args.separator,
+            settings.passphrase_capitalize if args.capitalize is None else args.capitalize,
+            settings.passphrase_digit if args.digit is None else args.digit,
+        )
+        wordlist = passphrase.open_wordlist(path)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    rng = seeded.SeededStream(args.seed).rng if args.seed is not None else None
+    return passphrase.iter_lines(args.count, wordlist, spec, rng)
+
+
+def cmd_gen(args, parser):
+    """gen 子命令"""
+    settings = Settings(logger)
+    if args.count < 0:
+        parser.error("生成数量不能为负数")
+    if args.passphrase:
+        if args.metrics:
+            METRICS.enable()
+        chunks = METRICS.time_iter("chunk", _passphrase_chunks(args, parser, settings))
+        try:
+            _write_output(args, chunks)
+        finally:
+            if args.metrics:
+                METRICS.dump(args.metrics)
+        return
+
+    char_pool = _resolve_pool(args, settings)
+    compiled = None
+    if args.template is not None:
+        from src import template
+        try:
+            compiled = template.compile_template(template.resolve(args.template, settings.template_presets), char_pool)
+        except ValueError as e:
+            parser.error(str(e))
+        # 模板的长度为每个字符串的字节数
+        length = compiled.length
+    else:
+        length = settings.length_default if args.length is None else args.length
+        if not settings.length_min <= length <= settings.length_max:
+            parser.error(f"长度必须在 {settings.length_min}-{settings.length_max} 之间")
+        if char_pool is None:
+            parser.error("至少需要选择一种字符类型！")
+
+    if args.workers < 0:
+        parser.error("并行进程数不能为负数")
+    if args.mmap and args.output == "-":
+        parser.error("--mmap 需要通过 -o 指定输出文件")
+    if args.registry and (args.seed is not None or args.workers != 1):
+        parser.error("--registry 不能与 --seed 或并行模式同时使用")
+    if compiled is not None and args.workers != 1:
+        parser.error("模板模式不支持并行模式")
+
+    # 未指定的约束使用配置中的默认值
+    defaults = policy.Policy.from_settings(settings)
+    try:
+        constraints = policy.Policy(
+            defaults.min_per_class if args.min_per_class is None else args.min_per_class,
+            defaults.no_consecutive if args.no_consecutive is None else args.no_consecutive,
+            defaults.unique if args.unique is None else args.unique,
+        )
+        if compiled is None:
+            policy.validate(length, char_pool, constraints)
+    except ValueError as e:
+        parser.error(str(e))
+
+    backend = args.backend
+    if backend is None:
+        # 配置中的默认算法为种子随机时，命令行仍使用安全随机
+        backend = settings.default_algorithm if settings.default_algorithm in engine.SECURE_BACKENDS else "secrets"
+
+    if args.metrics:
+        METRICS.enable()
+    token_registry = None
+    if args.registry:
+        from src import registry
+        try:
+            token_registry = registry.TokenRegistry(args.registry)
+        except RuntimeError as e:
+            parser.error(str(e))
+        chunks = registry.issue_lines(token_registry, args.count, length, char_pool, backend, constraints,
+                                      template=compiled)
+    elif compiled is not None:
+        chunks = template.iter_lines(args.count, compiled, args.seed, backend)
+    elif args.workers == 1:
+        chunks = streaming.iter_lines(args.count, length, char_pool, args.seed, backend, CHUNK_CHARS, constraints)
+    else:
+        chunks = streaming.iter_lines_parallel(
+            args.count, length, char_pool, args.workers, not args.unordered, args.seed, backend, constraints
+        )
+
+    # 每块的耗时为生成该块的耗时（写出不计入）
+    chunks = METRICS.time_iter("chunk", chunks)
+    try:
+        _write_output(args, chunks, streaming.output_size(args.count, length))
+    except RuntimeError as e:
+        parser.error(str(e))
+    finally:
+        if token_registry is not None:
+            token_registry.close()
+        if args.metrics:
+            METRICS.dump(args.metrics)
+
+
+def cmd_audit(args, parser):
+    """audit 子命令"""
+    from src import audit
+
+    if args.workers < 0:
+        parser.error("并行进程数不能为负数")
+    if args.input == "-":
+        summary = audit.audit_stream(sys.stdin.buffer)
+    else:
+        summary = audit.audit_file(args.input, workers=args.workers or None)
+
+    report = json.dumps(summary.to_dict(), ensure_ascii=False, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+def cmd_registry(args, parser):
+    """registry 子命令"""
+    from src import registry
+
+    try:
+        token_registry = registry.TokenRegistry(args.path)
+    except RuntimeError as e:
+        parser.error(str(e))
+    with token_registry:
+        if args.action == "merge":
+            for source in args.sources:
+                added = token_registry.merge(source)
+                logger.info(f"已合并 {source}，新增 {added} 条")
+        elif args.action == "compact":
+            token_registry.compact()
+        elif args.action == "check":
+            stream = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+            try:
+                lines = (line.rstrip(b"\r\n") for line in stream)
+                issued = sum(1 for line in lines if line and line in token_registry)
+            finally:
+                if stream is not sys.stdin.buffer:
+                    stream.close()
+            print(json.dumps({"issued": issued}, ensure_ascii=False, indent=4))
+            return 1 if issued else 0
+        print(json.dumps(token_registry.info(), ensure_ascii=False, indent=4))
+    return 0
+
+
+def main(argv=None):
+    """命令行入口，输出管道被关闭（如 gen ... | head）时安静退出"""
+    try:
+        return _run(argv)
+    except BrokenPipeError:
+        # 解释器退出时还会刷新标准输出，重定向到空设备以免再次报错
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+
+
+def _run(argv):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "gen":
+        cmd_gen(args, parser)
+    elif args.command == "serve":
+        from src import server
+        server.serve(Settings(logger), args.host, args.port, args.unix, args.backend)
+    elif args.command == "audit":
+        cmd_audit(args, parser)
+    elif args.command == "registry":
+        return cmd_registry(args, parser)
+    elif args.command == "bench":
+        from src import benchmark
+        return benchmark.main(args.output, args.baseline, args.quick, args.threshold)
+    return 0
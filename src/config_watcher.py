@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : config_watcher.py
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+
+# inotify 常量（见 <sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """监听配置文件所在目录的 inotify 句柄（仅 Linux）
+
+    监听目录而不是文件本身，原子替换（rename）后仍能收到事件。
+    """
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        directory = os.path.dirname(os.path.abspath(path))
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, "inotify_add_watch 失败")
+        self._name = os.fsencode(os.path.basename(path))
+
+    def has_events(self) -> bool:
+        """非阻塞读取事件，返回配置文件是否可能发生了变化"""
+        touched = False
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return touched
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                _, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + name_length].rstrip(b"\0")
+                offset += name_length
+                if mask & IN_Q_OVERFLOW or name == self._name:
+                    touched = True
+
+    def close(self):
+        os.close(self._fd)
+
+
+class ConfigWatcher:
+    """配置文件变化检测
+
+    在 Linux 上优先使用 inotify，没有事件时不访问文件系统；
+    其他平台每次检查只做一次 stat，比较 (mtime, size, inode) 签名。
+    签名变化时才重新解析配置，并只通知发生变化的配置项（见 Settings.subscribe）。
+    check() 应在界面线程中定时调用，回调也就在界面线程中执行。
+    """
+
+    def __init__(self, settings, use_inotify=True):
+        self.settings = settings
+        self._inotify = None
+        # 创建监听之前的变化无法通过 inotify 得知，首次检查总是比较签名
+        self._first_check = True
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(settings.config_path)
+            except (OSError, AttributeError) as e:
+                settings.logger.info(f"inotify 不可用，改用文件签名轮询: {str(e)}")
+
+    def check(self):
+        """检查配置文件是否变化，返回发生变化的配置项"""
+        if self._inotify is not None and not self._inotify.has_events() and not self._first_check:
+            return {}
+        self._first_check = False
+        return self.settings.reload_if_changed()
+
+    def close(self):
+        """释放 inotify 句柄"""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
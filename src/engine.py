@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : engine.py
+import logging
+from functools import lru_cache
+
+from src import entropy, numpy_backend
+from src.batch import TokenBatch
+from src.pools import CharPool, build_table
+
+logger = logging.getLogger(__name__)
+
+# 单次向系统申请的熵块上限（字节）
+BLOCK_SIZE = 1024 * 1024
+
+# 安全随机后端（"random" 为种子随机，见 seeded 模块）
+SECURE_BACKENDS = ("secrets", "numpy")
+
+
+@lru_cache(maxsize=64)
+def _pool_table(chars: str):
+    """为非预计算的字符池构建并缓存映射表"""
+    return build_table(chars)
+
+
+def _resolve_pool(pool):
+    """将字符池统一转换为映射表"""
+    if isinstance(pool, CharPool):
+        return pool.table, pool.delete, pool.limit
+    return _pool_table("".join(pool))
+
+
+@lru_cache(maxsize=None)
+def resolve_backend(backend: str) -> str:
+    """返回实际可用的安全随机后端，NumPy 未安装时回退到 secrets（只提示一次）"""
+    if backend == "numpy" and not numpy_backend.AVAILABLE:
+        logger.warning("未安装 NumPy，回退到 secrets 后端")
+        return "secrets"
+    if backend not in SECURE_BACKENDS:
+        raise ValueError(f"未知的生成后端: {backend}")
+    return backend
+
+
+def iter_random_bytes(total: int, pool, backend: str = "secrets"):
+    """逐块产出共 total 个来自字符池的字符，每块不超过 BLOCK_SIZE 字节
+
+    熵来自 entropy 模块的缓冲池（大块请求直接读取系统熵），
+    通过 bytes.translate 一次性完成映射与拒绝采样。
+    """
+    table, delete, limit = _resolve_pool(pool)
+    numpy = resolve_backend(backend) == "numpy"
+    remaining = total
+    while remaining > 0:
+        if numpy:
+            chunk = numpy_backend.random_bytes(min(remaining, BLOCK_SIZE), table, limit)
+        else:
+            # 按拒绝率多取一些，尽量一次取够
+            request = min(remaining * 256 // limit + 64, BLOCK_SIZE)
+            chunk = entropy.urandom(request).translate(table, delete)
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+        yield chunk
+        remaining -= len(chunk)
+
+
+def random_bytes(total: int, pool, backend: str = "secrets") -> bytes:
+    """生成 total 个来自字符池的字符（latin-1 编码的字节串）"""
+    if resolve_backend(backend) == "numpy":
+        table, _, limit = _resolve_pool(pool)
+        return numpy_backend.random_bytes(total, table, limit)
+    return b"".join(iter_random_bytes(total, pool, backend))
+
+
+def generate(length: int, pool, backend: str = "secrets") -> str:
+    """生成单个安全随机字符串"""
+    return random_bytes(length, pool, backend).decode("latin-1")
+
+
+def generate_batch(count: int, length: int, pool, backend: str = "secrets") -> list:
+    """批量生成 count 个长度为 length 的安全随机字符串（大批量请使用 generate_token_batch）"""
+    if count <= 0:
+        return []
+    data = random_bytes(count * length, pool, backend).decode("latin-1")
+    if length <= 0:
+        return [""] * count
+    return [data[i:i + length] for i in range(0, count * length, length)]
+
+
+def generate_lines(count: int, length: int, pool, sep: bytes = b"\n", backend: str = "secrets") -> bytes:
+    """批量生成以 sep 结尾的多行字符串（字节形式），便于直接写入文件"""
+    if count <= 0:
+        return b""
+    if resolve_backend(backend) == "numpy":
+        table, _, limit = _resolve_pool(pool)
+        return numpy_backend.generate_lines(count, length, table, limit, sep)
+    return join_lines(random_bytes(count * length, pool), count, length, sep)
+
+
+def generate_token_batch(count: int, length: int, pool, sep: bytes = b"\n", backend: str = "secrets") -> TokenBatch:
+    """批量生成并紧凑存放在一块缓冲区中，不为每个字符串创建 str 对象"""
+    count = max(count, 0)
+    return TokenBatch(generate_lines(count, length, pool, sep, backend), count, length, sep)
+
+
+def join_lines(data: bytes, count: int, length: int, sep: bytes = b"\n") -> bytes:
+    """将连续的 count * length 字节按固定长度切分并在每段后追加 sep"""
+    stride = length + len(sep)
+    out = bytearray(count * stride)
+    # 按列切片赋值，Python 层循环次数只与 length 有关
+    for offset in range(length):
+        out[offset::stride] = data[offset::length]
+    for offset, byte in enumerate(sep):
+        out[length + offset::stride] = bytes((byte,)) * count
+    return bytes(out)
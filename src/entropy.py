@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : entropy.py
+import os
+import queue
+import random
+import threading
+import weakref
+
+# 每次向系统申请的熵块大小（字节）
+POOL_BLOCK = 256 * 1024
+# 后台线程预先读取并排队等待取用的块数
+READY_BLOCKS = 2
+# 不小于该大小的请求直接向系统申请，不经过缓冲区
+DIRECT_READ = 64 * 1024
+
+
+class EntropyPool:
+    """操作系统熵的缓冲池
+
+    按大块读取 os.urandom，再从缓冲区中切出调用方需要的字节，每个字节只使用一次。
+    每个线程使用自己的缓冲区，取用时不需要加锁；后台线程预先读取下一批块放入队列，
+    缓冲区用完时通常直接取现成的块，不需要等待系统调用。
+    fork 后子进程丢弃继承的缓冲区与预读块并重新读取，父子进程不会得到相同的随机字节。
+    """
+
+    def __init__(self, block_size=POOL_BLOCK, background=True):
+        self.block_size = block_size
+        self.background = background
+        self._reset()
+        # 只持有弱引用，池被回收后回调自动失效
+        ref = weakref.ref(self)
+        os.register_at_fork(after_in_child=lambda: (pool := ref()) is not None and pool._reset())
+
+    def _reset(self):
+        """初始化（或在 fork 后的子进程中重置）全部状态"""
+        self._local = threading.local()
+        self._ready = queue.Queue(READY_BLOCKS)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def _refill_loop(self, ready):
+        """后台线程：持续读取新块，队列满时阻塞等待取用"""
+        while True:
+            # os.urandom 读取期间释放 GIL，不阻塞生成线程
+            ready.put(os.urandom(self.block_size))
+
+    def _next_block(self) -> bytes:
+        """取下一块熵：优先使用后台预读的块，没有时同步读取"""
+        if self.background and self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._refill_loop, args=(self._ready,),
+                                                    name="entropy-refill", daemon=True)
+                    self._thread.start()
+        try:
+            return self._ready.get_nowait()
+        except queue.Empty:
+            return os.urandom(self.block_size)
+
+    def read(self, n: int) -> bytes:
+        """取出 n 个随机字节"""
+        if n >= DIRECT_READ:
+            return os.urandom(n)
+        local = self._local
+        try:
+            buffer, position = local.buffer, local.position
+        except AttributeError:
+            buffer, position = b"", 0
+        end = position + n
+        if end > len(buffer):
+            buffer = buffer[position:] + self._next_block()
+            local.buffer = buffer
+            position, end = 0, n
+        local.position = end
+        return buffer[position:end]
+
+
+class PooledRandom(random.SystemRandom):
+    """从熵缓冲池取字节的 SystemRandom，randrange、sample、shuffle 等方法的行为不变"""
+
+    def __init__(self, pool: EntropyPool = None):
+        self._pool = pool or DEFAULT_POOL
+        super().__init__()
+
+    def random(self):
+        return (int.from_bytes(self._pool.read(7), "big") >> 3) * (2 ** -53)
+
+    def getrandbits(self, k):
+        if k < 0:
+            raise ValueError("number of bits must be non-negative")
+        numbytes = (k + 7) // 8
+        return int.from_bytes(self._pool.read(numbytes), "big") >> (numbytes * 8 - k)
+
+    def randbytes(self, n):
+        return self._pool.read(n)
+
+
+# 安全生成默认使用的熵源
+DEFAULT_POOL = EntropyPool()
+
+
+def urandom(n: int) -> bytes:
+    """与 os.urandom 用法相同，从默认缓冲池取字节"""
+    return DEFAULT_POOL.read(n)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : i18n.py
+import json
+import logging
+import os
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+LOCAL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "local")
+
+# 缺少翻译时回退使用的语言
+FALLBACK_LOCAL = "chinese"
+
+# 语言选择框中显示的名称
+LOCAL_NAMES = {
+    "chinese": "中文",
+    "english": "English",
+    "japanese": "日本語",
+    "russian": "Русский",
+}
+
+
+def available_locals():
+    """列出 local 目录中的语言（只读取文件名，不解析内容）"""
+    try:
+        names = [name[:-5] for name in os.listdir(LOCAL_DIR) if name.endswith(".json")]
+    except OSError:
+        return [FALLBACK_LOCAL]
+    return sorted(names, key=lambda name: (name != FALLBACK_LOCAL, name))
+
+
+@lru_cache(maxsize=None)
+def load_catalog(local: str) -> dict:
+    """读取并缓存语言文件，首次使用时才解析"""
+    path = os.path.join(LOCAL_DIR, f"{local}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"加载语言文件失败: {local} {str(e)}")
+        return {}
+
+
+def _lookup(catalog: dict, key: str):
+    """按点分隔的键查找，例如 syntax_errors.title"""
+    value = catalog
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+class Translator:
+    """界面文本翻译
+
+    只加载当前语言；某个键缺失时才加载回退语言。
+    通过 bind 注册的控件在切换语言时直接更新文本，无需重建窗口。
+    """
+
+    def __init__(self, local: str = FALLBACK_LOCAL):
+        self.local = local
+        self._bindings = []
+        self._listeners = []
+
+    def get(self, key: str, **kwargs) -> str:
+        """获取翻译文本，缺失时依次回退到回退语言和键本身"""
+        value = _lookup(load_catalog(self.local), key)
+        if value is None and self.local != FALLBACK_LOCAL:
+            value = _lookup(load_catalog(FALLBACK_LOCAL), key)
+        if value is None:
+            return key
+        return value.format(**kwargs) if kwargs else value
+
+    def label(self, key: str) -> str:
+        """带冒号的标签文本，冒号样式随语言变化"""
+        return self.get(key) + self.get("label_suffix")
+
+    def bind(self, setter, key: str, label: bool = False):
+        """设置控件文本并在切换语言时自动更新
+
+        setter 为接收文本的函数，例如 label.setText；label=True 时追加冒号。
+        """
+        self._bindings.append((setter, key, label))
+        setter(self.label(key) if label else self.get(key))
+
+    def on_change(self, callback):
+        """注册语言切换回调，用于更新动态生成的文本"""
+        self._listeners.append(callback)
+
+    def set_local(self, local: str):
+        """切换语言，重新设置已绑定控件的文本"""
+        if local == self.local:
+            return
+        self.local = local
+        alive = []
+        for setter, key, label in self._bindings:
+            try:
+                setter(self.label(key) if label else self.get(key))
+            except Exception:
+                # 控件已被销毁
+                continue
+            alive.append((setter, key, label))
+        self._bindings = alive
+        for callback in list(self._listeners):
+            callback()
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : metrics.py
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# 耗时直方图的桶上限（秒），最后一个桶为 +Inf
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# 导出的指标名前缀
+PREFIX = "pwgen"
+
+# 通过环境变量在启动时启用
+ENV_VAR = "PWGEN_METRICS"
+
+
+class Histogram:
+    """耗时直方图：各桶计数、总和、最小值与最大值"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds: float):
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min or 0.0,
+            "max": self.max or 0.0,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "buckets": {str(bound): n for bound, n in zip(BUCKETS + ("+Inf",), self.buckets)},
+        }
+
+
+class _NullSpan:
+    """未启用时使用的空计时区间，不调用任何计时函数"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """计时区间：退出时记录耗时，出现异常时额外计入错误计数"""
+    __slots__ = ("metrics", "name", "begin")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.begin = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.name, time.perf_counter() - self.begin)
+        if exc_type is not None:
+            self.metrics.count(f"{self.name}_errors")
+        return False
+
+
+class Metrics:
+    """生成流程的计时与计数
+
+    未启用时 span() 返回共享的空区间，count() 与 observe() 直接返回，开销只有一次属性判断。
+    启用后每个区间记录到同名直方图，可导出为 JSON 快照或 Prometheus 文本格式。
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        """清空已记录的数据"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def span(self, name):
+        """计时区间，用法：with METRICS.span("rng_draw"): ..."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def observe(self, name, seconds):
+        """记录一次耗时"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, name, n=1):
+        """累加计数"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def time_iter(self, name, iterable):
+        """逐项计时产出迭代器中的元素（每项的耗时为取得该项的耗时），未启用时原样返回"""
+        if not self.enabled:
+            return iterable
+        return self._timed(name, iterable)
+
+    def _timed(self, name, iterable):
+        iterator = iter(iterable)
+        while True:
+            begin = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.observe(name, time.perf_counter() - begin)
+            yield item
+
+    def snapshot(self) -> dict:
+        """JSON 快照"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "counters": dict(self._counters),
+                "histograms": {name: histogram.to_dict() for name, histogram in self._histograms.items()},
+            }
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式（耗时单位为秒）"""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                metric = f"{PREFIX}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {self._counters[name]}")
+            for name in sorted(self._histograms):
+                histogram = self._histograms[name]
+                metric = f"{PREFIX}_{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, n in zip(BUCKETS + ("+Inf",), histogram.buckets):
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f"{metric}_sum {histogram.sum}")
+                lines.append(f"{metric}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary_lines(self) -> list:
+        """调试面板中显示的简要表格"""
+        snapshot = self.snapshot()
+        lines = [f"{'span':<16}{'count':>8}{'mean ms':>10}{'max ms':>10}{'total ms':>11}"]
+        for name, data in sorted(snapshot["histograms"].items()):
+            lines.append(f"{name:<16}{data['count']:>8}{data['mean'] * 1000:>10.3f}"
+                         f"{data['max'] * 1000:>10.3f}{data['sum'] * 1000:>11.1f}")
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"{name:<16}{value:>8}")
+        return lines
+
+    def dump(self, path):
+        """按扩展名导出：.json 为 JSON 快照，其他为 Prometheus 文本格式"""
+        if path.endswith(".json"):
+            data = json.dumps(self.snapshot(), ensure_ascii=False, indent=4)
+        else:
+            data = self.to_prometheus()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data)
+
+
+# 全局指标，设置环境变量 PWGEN_METRICS=1 时启动即启用
+METRICS = Metrics(enabled=os.environ.get(ENV_VAR, "") not in ("", "0"))
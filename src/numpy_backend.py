@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : numpy_backend.py
+import importlib.util
+import os
+
+# NumPy 为可选依赖，首次使用时才导入
+AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+# 单次向系统申请的熵块上限（字节）
+BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def _numpy():
+    import numpy
+    return numpy
+
+
+def random_array(total: int, table: bytes, limit: int):
+    """生成 total 个字符的 uint8 数组
+
+    一次读取整块系统熵，以向量化方式完成拒绝采样与查表映射。
+    """
+    np = _numpy()
+    lookup = np.frombuffer(table, dtype=np.uint8)
+    out = np.empty(total, dtype=np.uint8)
+    filled = 0
+    while filled < total:
+        need = total - filled
+        request = min(need * 256 // limit + 64, BLOCK_SIZE)
+        raw = np.frombuffer(os.urandom(request), dtype=np.uint8)
+        accepted = raw[raw < limit][:need]
+        out[filled:filled + len(accepted)] = lookup[accepted]
+        filled += len(accepted)
+    return out
+
+
+def random_bytes(total: int, table: bytes, limit: int) -> bytes:
+    """生成 total 个字符（latin-1 编码的字节串）"""
+    return random_array(total, table, limit).tobytes()
+
+
+def generate_lines(count: int, length: int, table: bytes, limit: int, sep: bytes = b"\n") -> bytes:
+    """生成 count x length 的字符矩阵，追加分隔符列后一次性输出连续字节"""
+    np = _numpy()
+    matrix = np.empty((count, length + len(sep)), dtype=np.uint8)
+    matrix[:, :length] = random_array(count * length, table, limit).reshape(count, length)
+    matrix[:, length:] = np.frombuffer(sep, dtype=np.uint8)
+    return matrix.tobytes()
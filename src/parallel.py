@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : parallel.py
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+from src import engine, policy, seeded
+
+# 每个分片的默认字符串数量
+DEFAULT_SHARD_SIZE = 65536
+# 每个分片的字节数上限，长字符串时减少分片中的字符串数量，共享内存总量与长度无关
+SHARD_BYTES = 4 * 1024 * 1024
+
+# 工作进程内挂载的共享内存
+_SHM = None
+
+
+def _worker_init(shm_name):
+    """工作进程初始化：挂载共享内存
+
+    每个进程从操作系统读取熵，fork 时熵缓冲池会被重置，不继承父进程的任何随机状态。
+    """
+    global _SHM
+    _SHM = shared_memory.SharedMemory(name=shm_name)
+
+
+def _fill_shard(task):
+    """生成一个分片并写入共享内存中对应的槽位"""
+    index, slot_offset, count, length, chars, seed, backend, constraints = task
+    if seed is not None:
+        data = seeded.shard_lines(seed, index, count, length, chars, constraints)
+    elif constraints is not None and constraints.active:
+        data = policy.generate_lines(count, length, chars, constraints)
+    else:
+        data = engine.generate_lines(count, length, chars, backend=backend)
+    _SHM.buf[slot_offset:slot_offset + len(data)] = data
+    return index, slot_offset, len(data)
+
+
+def shard_size_for(length: int) -> int:
+    """长度为 length 时每个分片的字符串数量（种子模式下分片划分决定输出，单进程与多进程必须一致）"""
+    return max(1, min(DEFAULT_SHARD_SIZE, SHARD_BYTES // (length + 1)))
+
+
+def generate_parallel(count, length, pool, workers=None, ordered=True, shard_size=None, seed=None,
+                      backend="secrets", constraints=None):
+    """多进程分片生成，逐个分片产出以换行分隔的字节块
+
+    工作进程将结果写入共享内存，父进程只接收分片位置，避免逐个字符串序列化。
+    分片大小默认按 SHARD_BYTES 计算，共享内存最多约 workers * 2 * SHARD_BYTES 字节。
+    ordered=False 时按完成顺序产出分片，速度更快。
+    指定 seed 时每个分片使用独立的可复现子流（见 seeded.shard_lines）。
+    constraints 为生成约束（policy.Policy）。
+    产出的 memoryview 只在下一次迭代前有效。
+    """
+    if count <= 0:
+        return
+    workers = workers or os.cpu_count() or 1
+    chars = "".join(pool)
+    stride = length + 1
+    shard_size = max(1, min(shard_size or shard_size_for(length), count))
+    # 每轮最多处理 workers * 2 个分片，共享内存按槽位复用
+    slots = min(workers * 2, -(-count // shard_size))
+    slot_bytes = shard_size * stride
+    shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+    try:
+        with multiprocessing.Pool(workers, initializer=_worker_init, initargs=(shm.name,)) as process_pool:
+            remaining = count
+            index = 0
+            while remaining > 0:
+                tasks = []
+                for slot in range(slots):
+                    if remaining <= 0:
+                        break
+                    n = min(shard_size, remaining)
+                    tasks.append((index, slot * slot_bytes, n, length, chars, seed, backend, constraints))
+                    remaining -= n
+                    index += 1
+                mapper = process_pool.imap if ordered else process_pool.imap_unordered
+                for _, offset, size in mapper(_fill_shard, tasks):
+                    view = shm.buf[offset:offset + size]
+                    try:
+                        yield view
+                    finally:
+                        view.release()
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : passphrase.py
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+from array import array
+
+from src import entropy
+from src.settings import FILE_MODE
+
+# 偏移索引文件：词表文件名 + 该后缀，与词表放在同一目录；
+# 词表目录不可写时保存在用户缓存目录（INDEX_CACHE_DIR）中
+INDEX_SUFFIX = ".idx"
+INDEX_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "pwgen", "wordlists",
+)
+_INDEX_MAGIC = b"PWIDX\x00\x00\x01"
+# 文件头：标识、词表大小、词表修改时间（纳秒）、单词数
+_HEADER = struct.Struct("<8sQQQ")
+
+# 每行一个单词；兼容 diceware 格式（“11111<Tab>单词”），忽略空行与行尾空白
+_WORD = re.compile(rb"^(?:[0-9]+[ \t]+)?([^\r\n]*[^\s])", re.MULTILINE)
+
+# 插入的数字
+DIGITS = "0123456789"
+
+# 默认使用系统熵源（经 entropy 模块的缓冲池读取）
+_SYSTEM_RANDOM = entropy.PooledRandom()
+
+
+class Passphrase:
+    """口令格式
+
+    - words: 单词个数
+    - separator: 单词之间的分隔符（不能包含换行，否则无法按行输出）
+    - capitalize: 每个单词首字母大写（不增加熵）
+    - digit: 在随机一个单词的末尾追加一位随机数字
+    """
+    __slots__ = ("words", "separator", "capitalize", "digit")
+
+    def __init__(self, words: int = 6, separator: str = "-", capitalize: bool = False, digit: bool = False):
+        if words < 1:
+            raise ValueError("单词个数至少为 1")
+        if "\n" in str(separator) or "\r" in str(separator):
+            raise ValueError("分隔符不能包含换行")
+        object.__setattr__(self, "words", int(words))
+        object.__setattr__(self, "separator", str(separator))
+        object.__setattr__(self, "capitalize", bool(capitalize))
+        object.__setattr__(self, "digit", bool(digit))
+
+    @classmethod
+    def from_settings(cls, settings) -> "Passphrase":
+        """从配置中读取默认格式"""
+        return cls(settings.passphrase_words, settings.passphrase_separator,
+                   settings.passphrase_capitalize, settings.passphrase_digit)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Passphrase 不可修改")
+
+    def _key(self):
+        return self.words, self.separator, self.capitalize, self.digit
+
+    def __eq__(self, other):
+        return isinstance(other, Passphrase) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __reduce__(self):
+        return Passphrase, self._key()
+
+    def __repr__(self):
+        return (f"Passphrase(words={self.words}, separator={self.separator!r}, "
+                f"capitalize={self.capitalize}, digit={self.digit})")
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def build_index(data) -> array:
+    """扫描词表，返回每个单词的 (起始, 结束) 字节偏移（交替存放）"""
+    offsets = array("Q")
+    for match in _WORD.finditer(data):
+        offsets.extend(match.span(1))
+    return offsets
+
+
+def _index_paths(path) -> tuple:
+    """索引文件的候选位置：词表旁边，其次是用户缓存目录（按词表绝对路径命名）"""
+    name = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()[:32] + INDEX_SUFFIX
+    return path + INDEX_SUFFIX, os.path.join(INDEX_CACHE_DIR, name)
+
+
+def _write_index(index_path, signature, offsets: array):
+    """原子写入偏移索引文件，权限与 open() 新建的文件相同（按 umask）"""
+    directory = os.path.dirname(os.path.abspath(index_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp.", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_INDEX_MAGIC, signature[0], signature[1], len(offsets) // 2))
+            offsets.tofile(f)
+        os.chmod(temp_path, FILE_MODE)
+        os.replace(temp_path, index_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class Wordlist:
+    """内存映射的词表
+
+    词表与偏移索引都通过 mmap 访问，打开时不解析词表、不创建任何单词对象，
+    取第 i 个单词时才从映射中切出并解码。索引缺失或与词表不一致时重新构建并保存，
+    词表所在目录不可写时保存到用户缓存目录，两处都不可写时只保存在内存中。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.signature = _source_signature(path)
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.signature[0] else b""
+        self._index_file = None
+        self._index_map = None
+        self._offsets = self._load_index()
+        self.count = len(self._offsets) // 2
+        if self.count == 0:
+            self.close()
+            raise ValueError(f"词表中没有单词: {path}")
+
+    def _load_index(self):
+        """映射已有的索引文件，都不存在或已过期时重新构建"""
+        index_paths = _index_paths(self.path)
+        for index_path in index_paths:
+            offsets = self._map_index(index_path)
+            if offsets is not None:
+                return offsets
+
+        offsets = build_index(self._map)
+        for index_path in index_paths:
+            try:
+                _write_index(index_path, self.signature, offsets)
+                break
+            except OSError:
+                continue
+        return offsets
+
+    def _map_index(self, index_path):
+        """映射与词表一致的索引文件，不存在或已过期时返回 None"""
+        try:
+            index_file = open(index_path, "rb")
+        except OSError:
+            return None
+        try:
+            header = index_file.read(_HEADER.size)
+            if len(header) == _HEADER.size:
+                magic, size, mtime_ns, count = _HEADER.unpack(header)
+                expected = _HEADER.size + count * 16
+                if (magic, size, mtime_ns) == (_INDEX_MAGIC, *self.signature) \
+                        and os.fstat(index_file.fileno()).st_size == expected:
+                    self._index_map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._index_file = index_file
+                    return memoryview(self._index_map)[_HEADER.size:].cast("Q")
+        except OSError:
+            pass
+        index_file.close()
+        return None
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index: int) -> str:
+        if not 0 <= index < self.count:
+            raise IndexError("单词下标越界")
+        return self._map[self._offsets[2 * index]:self._offsets[2 * index + 1]].decode("utf-8")
+
+    @property
+    def bits_per_word(self) -> float:
+        return math.log2(self.count)
+
+    def close(self):
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_file.close()
+            self._index_map = None
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __del__(self):
+        # 缓存中被替换的词表可能仍在其他线程中使用，最后一个引用释放时才关闭
+        if hasattr(self, "_offsets"):
+            self.close()
+
+
+# 已打开的词表（按路径缓存，词表文件变化后重新打开）
+_OPENED = {}
+_OPENED_LOCK = threading.Lock()
+
+
+def open_wordlist(path) -> Wordlist:
+    """打开词表并缓存，同一词表在进程内只映射一次
+
+    词表文件变化后重新打开并替换缓存；旧的词表不在这里关闭，仍在使用它的任务可以继续读取，
+    最后一个引用释放时自动关闭。
+    """
+    path = os.path.abspath(path)
+    signature = _source_signature(path)
+    with _OPENED_LOCK:
+        wordlist = _OPENED.get(path)
+        if wordlist is None or wordlist.signature != signature:
+            wordlist = _OPENED[path] = Wordlist(path)
+        return wordlist
+
+
+def entropy_bits(wordlist: Wordlist, spec: Passphrase) -> float:
+    """口令的熵（位）：单词均匀抽取，插入数字时再加上数字与位置的选择"""
+    bits = spec.words * wordlist.bits_per_word
+    if spec.digit:
+        bits += math.log2(len(DIGITS) * spec.words)
+    return bits
+
+
+def random_indices(k: int, n: int, rng=None) -> list:
+    """k 个 [0, n) 内均匀分布的随机下标
+
+    一次取一整块随机字节按 32 位整数解释，拒绝不小于 n 的最大整数倍的值，
+    避免逐个调用 randrange。
+    """
+    rng = rng or _SYSTEM_RANDOM
+    if not 0 < n <= 1 << 32:
+        raise ValueError(f"下标范围必须在 1-{1 << 32} 之间: {n}")
+    limit = (1 << 32) // n * n
+    result = []
+    while len(result) < k:
+        # 按拒绝率多取一些，尽量一次取够
+        need = k - len(result)
+        values = array("I")
+        values.frombytes(rng.randbytes((need + need * ((1 << 32) - limit) // limit + 16) * 4))
+        result.extend(value % n for value in values if value < limit)
+    del result[k:]
+    return result
+
+
+def generate_batch(count: int, wordlist: Wordlist, spec: Passphrase, rng=None) -> list:
+    """批量生成口令：先一次取得全部单词与数字的下标，再逐个拼接"""
+    if count <= 0:
+        return []
+    rng = rng or _SYSTEM_RANDOM
+    words_per = spec.words
+    indices = random_indices(count * words_per, wordlist.count, rng)
+    if spec.digit:
+        positions = random_indices(count, words_per, rng)
+        digits = random_indices(count, len(DIGITS), rng)
+    mapped, offsets = wordlist._map, wordlist._offsets
+    words = [mapped[offsets[2 * i]:offsets[2 * i + 1]].decode("utf-8") for i in indices]
+    if spec.capitalize:
+        words = [word[:1].upper() + word[1:] for word in words]
+    join = spec.separator.join
+    result = []
+    for n in range(count):
+        chosen = words[n * words_per:(n + 1) * words_per]
+        if spec.digit:
+            chosen[positions[n]] += DIGITS[digits[n]]
+        result.append(join(chosen))
+    return result
+
+
+def generate(wordlist: Wordlist, spec: Passphrase, rng=None) -> str:
+    """生成单个口令，rng 默认为系统熵源"""
+    return generate_batch(1, wordlist, spec, rng)[0]
+
+
+def generate_lines(count: int, wordlist: Wordlist, spec: Passphrase, rng=None, sep: bytes = b"\n") -> bytes:
+    """批量生成以 sep 结尾的多行口令（字节形式）"""
+    if count <= 0:
+        return b""
+    return "\n".join(generate_batch(count, wordlist, spec, rng)).encode("utf-8").replace(b"\n", sep) + sep
+
+
+def iter_lines(count: int, wordlist: Wordlist, spec: Passphrase, rng=None, per_chunk: int = 65536):
+    """逐块产出多行口令，内存占用只与块大小有关"""
+    for start in range(0, count, per_chunk):
+        yield generate_lines(min(per_chunk, count - start), wordlist, spec, rng)
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : policy.py
+from functools import lru_cache
+from itertools import accumulate
+from math import comb, factorial, prod
+
+from src import entropy, pools
+from src.pools import CharPool
+
+# 默认使用系统熵源（经 entropy 模块的缓冲池读取）
+_SYSTEM_RANDOM = entropy.PooledRandom()
+
+# 精确计数表的规模上限：长度与表格单元数（长度 × 行数 × 状态数）都不超过上限时逐位解码，
+# 否则按位置抽取候选字符串并拒绝不满足最少数量的候选（同样均匀，内存与长度成正比）
+MAX_EXACT_LENGTH = 256
+MAX_TABLE_CELLS = 1 << 16
+# 拒绝抽样的最大尝试次数，超过时认为约束过严
+MAX_REJECTION_DRAWS = 100
+# 拒绝抽样时每次抽取的字符数，每块之间检查取消
+DRAW_CHUNK = 64 * 1024
+
+
+class Policy:
+    """生成约束
+
+    - min_per_class: 每种已选字符类型至少出现的次数
+    - no_consecutive: 相邻字符不能相同
+    - unique: 所有字符互不相同（隐含 no_consecutive）
+    """
+    __slots__ = ("min_per_class", "no_consecutive", "unique")
+
+    def __init__(self, min_per_class: int = 0, no_consecutive: bool = False, unique: bool = False):
+        if min_per_class < 0:
+            raise ValueError("每种字符类型的最少数量不能为负数")
+        object.__setattr__(self, "min_per_class", int(min_per_class))
+        object.__setattr__(self, "no_consecutive", bool(no_consecutive))
+        object.__setattr__(self, "unique", bool(unique))
+
+    @classmethod
+    def from_settings(cls, settings) -> "Policy":
+        """从配置中读取默认约束"""
+        return cls(settings.policy_min_per_class, settings.policy_no_consecutive, settings.policy_unique)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Policy 不可修改")
+
+    @property
+    def active(self) -> bool:
+        """是否有任何约束（没有约束时直接使用普通生成路径）"""
+        return bool(self.min_per_class or self.no_consecutive or self.unique)
+
+    def _key(self):
+        return self.min_per_class, self.no_consecutive, self.unique
+
+    def __eq__(self, other):
+        return isinstance(other, Policy) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __reduce__(self):
+        return Policy, self._key()
+
+    def __repr__(self):
+        return (f"Policy(min_per_class={self.min_per_class}, no_consecutive={self.no_consecutive}, "
+                f"unique={self.unique})")
+
+
+# 不受约束的默认策略
+NO_POLICY = Policy()
+
+
+@lru_cache(maxsize=64)
+def split_pool(chars: str) -> tuple:
+    """将字符池按字符类型拆分为 ((字符, 是否为已选类型), ...)
+
+    不属于任何字符类型的字符归为最后一组，不要求最少数量。
+    """
+    groups = []
+    remaining = chars
+    for _, class_chars in pools.CLASSES:
+        group = "".join(c for c in chars if c in class_chars)
+        if group:
+            groups.append((group, True))
+            remaining = "".join(c for c in remaining if c not in class_chars)
+    if remaining:
+        groups.append((remaining, False))
+    return tuple(groups)
+
+
+def _deficit_states(deficits: tuple):
+    """列出所有仍需数量的状态，并预先计算每个状态在选择第 j 组后转移到的状态编号"""
+    states = [()]
+    for deficit in deficits:
+        states = [state + (d,) for state in states for d in range(deficit + 1)]
+    index = {state: i for i, state in enumerate(states)}
+    transitions = [
+        [index[state[:j] + (max(state[j] - 1, 0),) + state[j + 1:]] for j in range(len(deficits))]
+        for state in states
+    ]
+    return states, index, transitions
+
+
+def _exact(length: int, sizes: tuple, deficits: tuple, no_consecutive: bool) -> bool:
+    """计数表是否在规模上限之内"""
+    rows = len(sizes) + 1 if no_consecutive else 1
+    return length <= MAX_EXACT_LENGTH and length * rows * prod(d + 1 for d in deficits) <= MAX_TABLE_CELLS
+
+
+@lru_cache(maxsize=2)
+def _count_table(length: int, sizes: tuple, deficits: tuple, no_consecutive: bool):
+    """计数表：table[r][last + 1][state] 为剩余 r 个位置时满足约束的补全方式数
+
+    state 为各组仍需最少数量的状态编号，last 为上一个字符所在的组（-1 表示没有）。
+    不限制相邻字符时只有 last = -1 一行。计数为精确整数，用于无偏地逐位解码。
+    """
+    states, index, transitions = _deficit_states(deficits)
+    groups = range(len(sizes))
+    rows = len(sizes) + 1 if no_consecutive else 1
+    satisfied = [int(not any(state)) for state in states]
+    table = [[satisfied] * rows]
+    for _ in range(length):
+        previous = table[-1]
+        if no_consecutive:
+            # 先按不限制相邻字符计算，再减去与上一个字符相同的那一种选择
+            free = [sum(sizes[j] * previous[j + 1][targets[j]] for j in groups) for targets in transitions]
+            layer = [free]
+            for j in groups:
+                row = previous[j + 1]
+                layer.append([total - row[targets[j]] for total, targets in zip(free, transitions)])
+        else:
+            row = previous[0]
+            layer = [[sum(sizes[j] * row[targets[j]] for j in groups) for targets in transitions]]
+        table.append(layer)
+    return table, index, transitions
+
+
+def _generate_sequential(length, groups, policy, rng, cancelled=None):
+    """按位置逐个解码：一次 randrange 取得 [0, 总数) 中的序号，再映射为对应的字符串
+
+    每个满足约束的字符串恰好对应一个序号，因此结果在所有满足约束的字符串上均匀分布，
+    不需要生成后检查再重试。计数表超出规模上限时改用拒绝抽样。
+    """
+    sizes = tuple(len(group) for group, _ in groups)
+    deficits = tuple(policy.min_per_class if required else 0 for _, required in groups)
+    no_consecutive = policy.no_consecutive
+    if not _exact(length, sizes, deficits, no_consecutive):
+        return _generate_rejection(length, groups, policy, rng, cancelled)
+    table, index_of, transitions = _count_table(length, sizes, deficits, no_consecutive)
+
+    state, last = index_of[deficits], -1
+    total = table[length][0][state]
+    if total == 0:
+        raise ValueError("没有满足约束的字符串，请调整长度或约束")
+    index = rng.randrange(total)
+
+    result = []
+    previous_char = None
+    for remaining in range(length, 0, -1):
+        if cancelled is not None and cancelled():
+            return None
+        following = table[remaining - 1]
+        for j, (group, _) in enumerate(groups):
+            same_group = no_consecutive and j == last
+            choices = sizes[j] - same_group
+            next_state = transitions[state][j]
+            count = following[j + 1 if no_consecutive else 0][next_state]
+            block = choices * count
+            if index < block:
+                position, index = divmod(index, count)
+                if same_group and position >= group.index(previous_char):
+                    # 跳过与上一个字符相同的字符
+                    position += 1
+                previous_char = group[position]
+                result.append(previous_char)
+                state, last = next_state, j
+                break
+            index -= block
+    return "".join(result)
+
+
+def _draw(length, chars, no_consecutive, rng, cancelled=None):
+    """按位置抽取一个只满足相邻约束的字符串，在所有这样的字符串上均匀分布
+
+    限制相邻字符时第一个字符任取，之后每个字符在其余 n - 1 个字符中均匀选取：
+    序号为上一个序号加上 [1, n) 中的随机偏移再对 n 取模。
+    """
+    n = len(chars)
+    if no_consecutive and n == 1:
+        return chars * length
+    parts = []
+    previous = None
+    for start in range(0, length, DRAW_CHUNK):
+        if cancelled is not None and cancelled():
+            return None
+        k = min(DRAW_CHUNK, length - start)
+        if not no_consecutive:
+            parts.append("".join(rng.choices(chars, k=k)))
+            continue
+        steps = rng.choices(range(1, n), k=k)
+        if previous is None:
+            steps[0] = rng.randrange(n)
+        else:
+            steps[0] += previous
+        indices = [i % n for i in accumulate(steps)]
+        previous = indices[-1]
+        parts.append("".join(map(chars.__getitem__, indices)))
+    return "".join(parts)
+
+
+def _generate_rejection(length, groups, policy, rng, cancelled=None):
+    """拒绝抽样：抽取只满足相邻约束的字符串，直到各组的数量满足最少数量
+
+    候选在更大的集合上均匀分布，接受的结果因此在满足全部约束的字符串上均匀分布。
+    """
+    if not feasible(length, groups, policy):
+        raise ValueError("没有满足约束的字符串，请调整长度或约束")
+    chars = "".join(group for group, _ in groups)
+    required = [group for group, needed in groups if needed]
+    for _ in range(MAX_REJECTION_DRAWS):
+        candidate = _draw(length, chars, policy.no_consecutive, rng, cancelled)
+        if candidate is None:
+            return None
+        if all(sum(map(candidate.count, group)) >= policy.min_per_class for group in required):
+            return candidate
+    raise ValueError(f"约束过严，长度为 {length} 时无法高效生成，请减少每种字符类型的最少数量")
+
+
+def feasible(length: int, groups, policy: Policy) -> bool:
+    """约束能否满足（不需要计数，任意长度下都很快）
+
+    把字符串看作各字符出现次数的组合：每个字符最多出现 cap 次（互不相同时为 1，
+    不能相邻时为 ceil(length / 2)，否则为 length），满足约束当且仅当
+    各组的最少数量之和不超过 length、每组的最少数量不超过该组的容量，且全部容量不少于 length。
+    """
+    if length <= 0:
+        return length == 0 and not (policy.min_per_class and any(needed for _, needed in groups))
+    if policy.unique:
+        cap = 1
+    elif policy.no_consecutive:
+        cap = (length + 1) // 2
+    else:
+        cap = length
+    minimums = [(len(group), policy.min_per_class if needed else 0) for group, needed in groups]
+    return (sum(minimum for _, minimum in minimums) <= length
+            and all(minimum <= size * cap for size, minimum in minimums)
+            and sum(size for size, _ in minimums) * cap >= length)
+
+
+def _unique_ways(length, groups, policy):
+    """ways[i][r]：第 i 组及之后的组共取 r 个互不相同字符的方式数 Π C(s_i, c_i) 之和"""
+    minimums = [policy.min_per_class if required else 0 for _, required in groups]
+    sizes = [len(group) for group, _ in groups]
+    ways = [[0] * (length + 1) for _ in range(len(groups) + 1)]
+    ways[-1][0] = 1
+    for i in range(len(groups) - 1, -1, -1):
+        for r in range(length + 1):
+            ways[i][r] = sum(comb(sizes[i], c) * ways[i + 1][r - c] for c in range(minimums[i], min(sizes[i], r) + 1))
+    return ways, minimums, sizes
+
+
+def _generate_unique(length, groups, policy, rng):
+    """字符互不相同：先按组合数抽取各组的数量，再从各组无放回抽取字符并整体打乱
+
+    数量为 (c_1, ..., c_k) 的字符串共有 length! × Π C(s_i, c_i) 个，
+    按 Π C(s_i, c_i) 的权重抽取数量即可保证整体均匀。
+    """
+    ways, minimums, sizes = _unique_ways(length, groups, policy)
+    if ways[0][length] == 0:
+        raise ValueError("没有满足约束的字符串，请调整长度或约束")
+
+    chars = []
+    remaining = length
+    for i, (group, _) in enumerate(groups):
+        index = rng.randrange(ways[i][remaining])
+        for c in range(minimums[i], min(sizes[i], remaining) + 1):
+            weight = comb(sizes[i], c) * ways[i + 1][remaining - c]
+            if index < weight:
+                break
+            index -= weight
+        chars.extend(rng.sample(group, c))
+        remaining -= c
+    rng.shuffle(chars)
+    return "".join(chars)
+
+
+def count(length: int, pool, policy: Policy) -> int:
+    """满足约束的字符串总数（为 0 表示约束无法满足）
+
+    计数表超出规模上限时返回只计相邻约束的上界 n × (n - 1) ^ (length - 1)（或 n ^ length）。
+    """
+    chars = pool.chars if isinstance(pool, CharPool) else "".join(pool)
+    groups = split_pool(chars)
+    if policy.unique:
+        if length > len(chars):
+            return 0
+        ways, _, _ = _unique_ways(length, groups, policy)
+        return factorial(length) * ways[0][length]
+    sizes = tuple(len(group) for group, _ in groups)
+    deficits = tuple(policy.min_per_class if required else 0 for _, required in groups)
+    if not _exact(length, sizes, deficits, policy.no_consecutive):
+        if not feasible(length, groups, policy):
+            return 0
+        n = len(chars)
+        return n * (n - 1) ** (length - 1) if policy.no_consecutive else n ** length
+    table, index_of, _ = _count_table(length, sizes, deficits, policy.no_consecutive)
+    return table[length][0][index_of[deficits]]
+
+
+def validate(length: int, pool, policy: Policy):
+    """检查约束能否满足，不能满足时抛出 ValueError"""
+    chars = pool.chars if isinstance(pool, CharPool) else "".join(pool)
+    if policy.active and not feasible(length, split_pool(chars), policy):
+        raise ValueError("没有满足约束的字符串，请调整长度或约束")
+
+
+def generate(length: int, pool, policy: Policy, rng=None, cancelled=None):
+    """按约束生成单个字符串，rng 默认为系统熵源
+
+    cancelled 为返回是否已取消的函数，逐位解码或抽取时检查，已取消时返回 None。
+    """
+    rng = rng or _SYSTEM_RANDOM
+    chars = pool.chars if isinstance(pool, CharPool) else "".join(pool)
+    groups = split_pool(chars)
+    if policy.unique:
+        if length > len(chars):
+            raise ValueError("长度超过字符池大小，无法保证字符互不相同")
+        return _generate_unique(length, groups, policy, rng)
+    return _generate_sequential(length, groups, policy, rng, cancelled)
+
+
+def generate_lines(count: int, length: int, pool, policy: Policy, rng=None, sep: bytes = b"\n") -> bytes:
+    """按约束批量生成以 sep 结尾的多行字符串（字节形式）"""
+    if count <= 0:
+        return b""
+    return b"".join(generate(length, pool, policy, rng).encode("latin-1") + sep for _ in range(count))
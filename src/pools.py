@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : pools.py
+import itertools
+import string
+
+# 字符类型定义
+UPPER = string.ascii_uppercase
+LOWER = string.ascii_lowercase
+DIGITS = "0123456789"
+SPECIAL = "!@#$%^&*()_+-=[]{}|;:',.<>?/`~"
+
+# (配置名, 字符集)，顺序即字符池中的拼接顺序
+CLASSES = (
+    ("upper", UPPER),
+    ("lower", LOWER),
+    ("number", DIGITS),
+    ("special", SPECIAL),
+)
+
+
+def build_table(chars: str):
+    """构建字符池的映射表
+
+    返回 (table, delete, limit)：
+    - table: 256 字节的 bytes.translate 映射表，字节 b 映射为 chars[b % n]
+    - delete: 需要拒绝的字节集合（b >= limit），保证取模结果无偏
+    - limit: 可接受字节的上界
+    """
+    n = len(chars)
+    if n == 0:
+        raise ValueError("字符池不能为空")
+    if n > 256:
+        raise ValueError("字符池最多支持 256 个字符")
+    try:
+        encoded = chars.encode("latin-1")
+    except UnicodeEncodeError:
+        raise ValueError("字符池只能包含单字节字符") from None
+    limit = 256 - 256 % n
+    table = bytes(encoded[b % n] for b in range(limit)) + bytes(256 - limit)
+    delete = bytes(range(limit, 256))
+    return table, delete, limit
+
+
+class CharPool:
+    """不可变的字符池，附带预先计算好的字节映射表"""
+    __slots__ = ("chars", "flags", "table", "delete", "limit")
+
+    def __init__(self, chars: str, flags: tuple = ()):
+        table, delete, limit = build_table(chars)
+        object.__setattr__(self, "chars", chars)
+        object.__setattr__(self, "flags", flags)
+        object.__setattr__(self, "table", table)
+        object.__setattr__(self, "delete", delete)
+        object.__setattr__(self, "limit", limit)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("CharPool 不可修改")
+
+    def __len__(self):
+        return len(self.chars)
+
+    def __iter__(self):
+        return iter(self.chars)
+
+    def __getitem__(self, index):
+        return self.chars[index]
+
+    def __contains__(self, char):
+        return char in self.chars
+
+    def __repr__(self):
+        return f"CharPool({self.chars!r})"
+
+
+def _build_pools():
+    """预先计算所有字符类型组合的字符池"""
+    result = {}
+    for flags in itertools.product((False, True), repeat=len(CLASSES)):
+        chars = "".join(chars for enabled, (_, chars) in zip(flags, CLASSES) if enabled)
+        if chars:
+            result[flags] = CharPool(chars, flags)
+    return result
+
+
+POOLS = _build_pools()
+
+# 未选择任何字符类型时 Qt 版本使用的默认字符池
+DEFAULT_POOL = POOLS[(True, True, True, False)]
+
+
+def get_pool(upper: bool, lower: bool, number: bool, special: bool):
+    """按字符类型选择获取预计算的字符池，未选择任何类型时返回 None"""
+    return POOLS.get((bool(upper), bool(lower), bool(number), bool(special)))
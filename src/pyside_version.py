@@ -7,23 +7,25 @@ import ctypes
 import datetime
 import json
 import logging
-import math
 import os
-import random
-import secrets
-import string
+import sys
 from typing import Dict, Any
 
-from PySide6.QtCore import Qt, QSize, QTimer
-from PySide6.QtGui import QFont, QPalette, QColor, QIcon
+from PySide6.QtCore import Qt, QSize, QTimer, QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QFont, QPalette, QColor, QIcon, QKeySequence, QShortcut
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QTextEdit, QPushButton, QCheckBox, QSpinBox, QSlider,
+    QLabel, QPlainTextEdit, QPushButton, QCheckBox, QSpinBox, QSlider,
     QGroupBox, QLineEdit, QRadioButton, QButtonGroup, QFrame,
-    QDialog, QDialogButtonBox, QMessageBox
+    QDialog, QDialogButtonBox, QMessageBox, QComboBox, QFileDialog, QScrollArea
 )
 
-from src.settings import Settings
+from src import engine, passphrase, policy, pools, seed_expression, startup, tasks, template
+from src.config_watcher import ConfigWatcher
+from src.i18n import LOCAL_NAMES, Translator, available_locals
+from src.metrics import METRICS
+from src.result_view import ProgressiveText
+from src.settings import GENERATION_KEYS, Settings
 
 # 设置logger格式
 logging.basicConfig(
@@ -32,52 +34,76 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.ERROR)
 
-SETTINGS = Settings(logger)
+# 配置与界面语言在首次需要时由 init() 创建，导入模块时不读取任何文件
+SETTINGS = None
+TRANSLATOR = None
 
-# 高DPI适配
-try:
-    ctypes.windll.shcore.SetProcessDpiAwareness(1)
-except Exception as _e:
-    logger.exception(f"高DPI适配失败: {str(_e)}")
+
+def enable_high_dpi():
+    """高DPI适配（仅 Windows）"""
+    if sys.platform != "win32":
+        return
+    try:
+        ctypes.windll.shcore.SetProcessDpiAwareness(1)
+    except Exception as _e:
+        logger.warning(f"高DPI适配失败: {str(_e)}")
+
+
+def init():
+    """初始化配置、界面语言与高DPI适配（只执行一次）"""
+    global SETTINGS, TRANSLATOR
+    if SETTINGS is not None:
+        return
+    SETTINGS = Settings(logger)
+    # 语言文件在首次使用时才加载
+    TRANSLATOR = Translator(SETTINGS.local)
+    enable_high_dpi()
 
 
 class SettingsDialog(QDialog):
     """设置对话框"""
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("设置")
-        self.setFixedSize(400, 400)
+        self.setWindowTitle(TRANSLATOR.get("settings"))
+        # 选项较多，放在滚动区域中，对话框高度不超过屏幕
+        self.setMinimumWidth(420)
+        self.resize(420, 640)
         self.setup_ui()
         self.load_settings()
 
     def setup_ui(self):
         """设置UI"""
-        layout = QVBoxLayout(self)
+        dialog_layout = QVBoxLayout(self)
+        content = QWidget()
+        layout = QVBoxLayout(content)
         
         # 算法设置
-        algorithm_group = QGroupBox("默认生成算法")
+        algorithm_group = QGroupBox(TRANSLATOR.get("default_algorithm"))
         algorithm_layout = QVBoxLayout()
         
-        self.secrets_radio = QRadioButton("secrets (安全随机)")
-        self.random_radio = QRadioButton("random (种子随机)")
+        self.secrets_radio = QRadioButton(f"secrets ({TRANSLATOR.get('safe_random')})")
+        self.numpy_radio = QRadioButton(f"numpy ({TRANSLATOR.get('vectorized_random')})")
+        self.random_radio = QRadioButton(f"random ({TRANSLATOR.get('seed_random')})")
         
         self.algorithm_group = QButtonGroup(self)
         self.algorithm_group.addButton(self.secrets_radio)
+        self.algorithm_group.addButton(self.numpy_radio)
         self.algorithm_group.addButton(self.random_radio)
         
         algorithm_layout.addWidget(self.secrets_radio)
+        algorithm_layout.addWidget(self.numpy_radio)
         algorithm_layout.addWidget(self.random_radio)
         algorithm_group.setLayout(algorithm_layout)
         layout.addWidget(algorithm_group)
         
         # 默认字符类型
-        char_group = QGroupBox("默认包含字符类型")
+        char_group = QGroupBox(TRANSLATOR.get("default_character_type"))
         char_layout = QVBoxLayout()
         
-        self.upper_check = QCheckBox("大写字母")
-        self.lower_check = QCheckBox("小写字母")
-        self.number_check = QCheckBox("阿拉伯数字")
-        self.special_check = QCheckBox("特殊字符")
+        self.upper_check = QCheckBox(TRANSLATOR.get("uppercase_letters"))
+        self.lower_check = QCheckBox(TRANSLATOR.get("lowercase_letters"))
+        self.number_check = QCheckBox(TRANSLATOR.get("digits"))
+        self.special_check = QCheckBox(TRANSLATOR.get("special_characters"))
         
         char_layout.addWidget(self.upper_check)
         char_layout.addWidget(self.lower_check)
@@ -87,28 +113,124 @@ class SettingsDialog(QDialog):
         layout.addWidget(char_group)
         
         # 复制设置
-        copy_group = QGroupBox("复制功能设置")
+        copy_group = QGroupBox(TRANSLATOR.get("copy_settings"))
         copy_layout = QVBoxLayout()
         
-        self.highlight_check = QCheckBox("复制时高亮文本")
-        self.bubble_check = QCheckBox("显示复制气泡提示")
+        self.highlight_check = QCheckBox(TRANSLATOR.get("copy_highlight"))
+        self.bubble_check = QCheckBox(TRANSLATOR.get("copy_bubble"))
         
         copy_layout.addWidget(self.highlight_check)
         copy_layout.addWidget(self.bubble_check)
         copy_group.setLayout(copy_layout)
         layout.addWidget(copy_group)
         
+        # 生成约束
+        policy_group = QGroupBox(TRANSLATOR.get("policy_settings"))
+        policy_layout = QVBoxLayout()
+
+        min_layout = QHBoxLayout()
+        min_layout.addWidget(QLabel(TRANSLATOR.label("policy_min_per_class")))
+        self.policy_min_spin = QSpinBox()
+        self.policy_min_spin.setRange(0, 16)
+        min_layout.addWidget(self.policy_min_spin)
+        min_layout.addStretch()
+        self.policy_no_consecutive_check = QCheckBox(TRANSLATOR.get("policy_no_consecutive"))
+        self.policy_unique_check = QCheckBox(TRANSLATOR.get("policy_unique"))
+
+        policy_layout.addLayout(min_layout)
+        policy_layout.addWidget(self.policy_no_consecutive_check)
+        policy_layout.addWidget(self.policy_unique_check)
+        policy_group.setLayout(policy_layout)
+        layout.addWidget(policy_group)
+
+        # 口令模式
+        passphrase_group = QGroupBox(TRANSLATOR.get("passphrase_settings"))
+        passphrase_layout = QVBoxLayout()
+
+        wordlist_layout = QHBoxLayout()
+        wordlist_layout.addWidget(QLabel(TRANSLATOR.label("passphrase_wordlist")))
+        self.passphrase_wordlist_edit = QLineEdit()
+        wordlist_layout.addWidget(self.passphrase_wordlist_edit)
+        browse_btn = QPushButton("...")
+        browse_btn.setFixedWidth(30)
+        browse_btn.clicked.connect(self.browse_wordlist)
+        wordlist_layout.addWidget(browse_btn)
+
+        words_layout = QHBoxLayout()
+        words_layout.addWidget(QLabel(TRANSLATOR.label("passphrase_words")))
+        self.passphrase_words_spin = QSpinBox()
+        self.passphrase_words_spin.setRange(1, 64)
+        words_layout.addWidget(self.passphrase_words_spin)
+        words_layout.addWidget(QLabel(TRANSLATOR.label("passphrase_separator")))
+        self.passphrase_separator_edit = QLineEdit()
+        self.passphrase_separator_edit.setFixedWidth(50)
+        words_layout.addWidget(self.passphrase_separator_edit)
+        words_layout.addStretch()
+
+        self.passphrase_capitalize_check = QCheckBox(TRANSLATOR.get("passphrase_capitalize"))
+        self.passphrase_digit_check = QCheckBox(TRANSLATOR.get("passphrase_digit"))
+
+        passphrase_layout.addLayout(wordlist_layout)
+        passphrase_layout.addLayout(words_layout)
+        passphrase_layout.addWidget(self.passphrase_capitalize_check)
+        passphrase_layout.addWidget(self.passphrase_digit_check)
+        passphrase_group.setLayout(passphrase_layout)
+        layout.addWidget(passphrase_group)
+
+        # 模板模式：在预设中输入新名称保存即可添加预设
+        template_group = QGroupBox(TRANSLATOR.get("template_settings"))
+        template_layout = QVBoxLayout()
+
+        pattern_layout = QHBoxLayout()
+        pattern_layout.addWidget(QLabel(TRANSLATOR.label("template_preset")))
+        self.template_preset_combo = QComboBox()
+        self.template_preset_combo.setEditable(True)
+        self.template_preset_combo.textActivated.connect(self.select_template_preset)
+        pattern_layout.addWidget(self.template_preset_combo)
+        pattern_layout.addWidget(QLabel(TRANSLATOR.label("template_pattern")))
+        self.template_pattern_edit = QLineEdit()
+        pattern_layout.addWidget(self.template_pattern_edit)
+        template_help = QLabel(TRANSLATOR.get("template_help"))
+        template_help.setWordWrap(True)
+        template_help.setStyleSheet("color: gray;")
+
+        template_layout.addLayout(pattern_layout)
+        template_layout.addWidget(template_help)
+        template_group.setLayout(template_layout)
+        layout.addWidget(template_group)
+        
+        # 界面语言
+        language_group = QGroupBox(TRANSLATOR.get("language"))
+        language_layout = QVBoxLayout()
+        
+        self.language_combo = QComboBox()
+        for local in available_locals():
+            self.language_combo.addItem(LOCAL_NAMES.get(local, local), local)
+        
+        language_layout.addWidget(self.language_combo)
+        language_group.setLayout(language_layout)
+        layout.addWidget(language_group)
+        
         # 按钮
         button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         button_box.accepted.connect(self.accept)
         button_box.rejected.connect(self.reject)
-        layout.addWidget(button_box)
+
+        # 按钮固定在滚动区域下方，始终可见
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setFrameShape(QFrame.NoFrame)
+        scroll_area.setWidget(content)
+        dialog_layout.addWidget(scroll_area)
+        dialog_layout.addWidget(button_box)
 
     def load_settings(self):
         """加载设置"""
         # 算法设置
         if SETTINGS.default_algorithm == "secrets":
             self.secrets_radio.setChecked(True)
+        elif SETTINGS.default_algorithm == "numpy":
+            self.numpy_radio.setChecked(True)
         else:
             self.random_radio.setChecked(True)
         
@@ -121,45 +243,244 @@ class SettingsDialog(QDialog):
         # 复制设置
         self.highlight_check.setChecked(SETTINGS.copy_highlight_enabled)
         self.bubble_check.setChecked(SETTINGS.copy_bubble_enabled)
+        
+        # 生成约束
+        self.policy_min_spin.setValue(SETTINGS.policy_min_per_class)
+        self.policy_no_consecutive_check.setChecked(SETTINGS.policy_no_consecutive)
+        self.policy_unique_check.setChecked(SETTINGS.policy_unique)
+
+        # 口令模式
+        self.passphrase_wordlist_edit.setText(SETTINGS.passphrase_wordlist)
+        self.passphrase_words_spin.setValue(SETTINGS.passphrase_words)
+        self.passphrase_separator_edit.setText(SETTINGS.passphrase_separator)
+        self.passphrase_capitalize_check.setChecked(SETTINGS.passphrase_capitalize)
+        self.passphrase_digit_check.setChecked(SETTINGS.passphrase_digit)
+
+        # 模板模式
+        self.template_preset_combo.addItems(list(SETTINGS.template_presets))
+        self.template_preset_combo.setCurrentText("")
+        for name, pattern in SETTINGS.template_presets.items():
+            if pattern == SETTINGS.template_pattern:
+                self.template_preset_combo.setCurrentText(name)
+                break
+        self.template_pattern_edit.setText(SETTINGS.template_pattern)
+        
+        # 界面语言
+        index = self.language_combo.findData(SETTINGS.local)
+        if index >= 0:
+            self.language_combo.setCurrentIndex(index)
 
     def save_settings(self):
         """保存设置"""
         # 算法设置
-        algorithm = "secrets" if self.secrets_radio.isChecked() else "random"
-        SETTINGS.update("default_algorithm", algorithm)
-        
-        # 字符类型
-        SETTINGS.update("default_include_upper", self.upper_check.isChecked())
-        SETTINGS.update("default_include_lower", self.lower_check.isChecked())
-        SETTINGS.update("default_include_number", self.number_check.isChecked())
-        SETTINGS.update("default_include_special", self.special_check.isChecked())
-        
-        # 复制设置
-        SETTINGS.update("copy_highlight_enabled", self.highlight_check.isChecked())
-        SETTINGS.update("copy_bubble_enabled", self.bubble_check.isChecked())
+        if self.secrets_radio.isChecked():
+            algorithm = "secrets"
+        elif self.numpy_radio.isChecked():
+            algorithm = "numpy"
+        else:
+            algorithm = "random"
         
-        # 保存到文件
-        SETTINGS.save()
+        # 填写了预设名称时保存为预设，覆盖已有的不同预设前需要确认
+        template_pattern = self.template_pattern_edit.text()
+        template_presets = dict(SETTINGS.template_presets)
+        preset_name = self.template_preset_combo.currentText().strip()
+        if preset_name and template_presets.get(preset_name, template_pattern) != template_pattern:
+            answer = QMessageBox.question(
+                self,
+                TRANSLATOR.get("template_preset_overwrite.title"),
+                TRANSLATOR.get("template_preset_overwrite.message", name=preset_name),
+            )
+            if answer == QMessageBox.Yes:
+                template_presets[preset_name] = template_pattern
+        elif preset_name:
+            template_presets[preset_name] = template_pattern
+
+        # 一次性更新全部配置项，只在后台写入一次文件
+        SETTINGS.update_many({
+            "default_algorithm": algorithm,
+            # 字符类型
+            "default_include_upper": self.upper_check.isChecked(),
+            "default_include_lower": self.lower_check.isChecked(),
+            "default_include_number": self.number_check.isChecked(),
+            "default_include_special": self.special_check.isChecked(),
+            # 复制设置
+            "copy_highlight_enabled": self.highlight_check.isChecked(),
+            "copy_bubble_enabled": self.bubble_check.isChecked(),
+            # 生成约束
+            "policy_min_per_class": self.policy_min_spin.value(),
+            "policy_no_consecutive": self.policy_no_consecutive_check.isChecked(),
+            "policy_unique": self.policy_unique_check.isChecked(),
+            # 口令模式
+            "passphrase_wordlist": self.passphrase_wordlist_edit.text().strip(),
+            "passphrase_words": self.passphrase_words_spin.value(),
+            "passphrase_separator": self.passphrase_separator_edit.text(),
+            "passphrase_capitalize": self.passphrase_capitalize_check.isChecked(),
+            "passphrase_digit": self.passphrase_digit_check.isChecked(),
+            # 模板模式
+            "template_pattern": template_pattern,
+            "template_presets": template_presets,
+            # 界面语言
+            "local": self.language_combo.currentData(),
+        }, background=True)
+
+    def browse_wordlist(self):
+        """选择词表文件"""
+        path, _ = QFileDialog.getOpenFileName(self, TRANSLATOR.get("passphrase_wordlist"))
+        if path:
+            self.passphrase_wordlist_edit.setText(path)
+
+    def select_template_preset(self, name):
+        """选择预设时填入对应的模板"""
+        if name in SETTINGS.template_presets:
+            self.template_pattern_edit.setText(SETTINGS.template_presets[name])
 
     def accept(self):
-        """接受对话框"""
+        """接受对话框（模板无效时提示并保持对话框打开）"""
+        try:
+            template.parse(self.template_pattern_edit.text(), pools.DEFAULT_POOL)
+        except ValueError as e:
+            QMessageBox.critical(
+                self, TRANSLATOR.get("unknown_errors.title"), f"{TRANSLATOR.get('unknown_errors.message')}\n{str(e)}"
+            )
+            return
         self.save_settings()
         super().accept()
 
 
+class MetricsDialog(QDialog):
+    """调试面板：生成流程各阶段的耗时统计"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(TRANSLATOR.get("debug_panel"))
+        self.resize(520, 360)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.enabled_check = QCheckBox(TRANSLATOR.get("metrics_enabled"))
+        self.enabled_check.setChecked(METRICS.enabled)
+        self.enabled_check.toggled.connect(METRICS.enable)
+        layout.addWidget(self.enabled_check)
+
+        self.summary_text = QPlainTextEdit()
+        self.summary_text.setReadOnly(True)
+        self.summary_text.setFont(QFont("Consolas", 10))
+        layout.addWidget(self.summary_text)
+
+        button_layout = QHBoxLayout()
+        for key, slot in (
+                ("metrics_refresh", self.refresh),
+                ("metrics_reset", self.reset),
+                ("metrics_export", self.export),
+        ):
+            button = QPushButton(TRANSLATOR.get(key))
+            button.clicked.connect(slot)
+            button_layout.addWidget(button)
+        layout.addLayout(button_layout)
+
+    def refresh(self):
+        self.summary_text.setPlainText("\n".join(METRICS.summary_lines()))
+
+    def reset(self):
+        METRICS.reset()
+        self.refresh()
+
+    def export(self):
+        """导出为 JSON 快照或 Prometheus 文本"""
+        path, _ = QFileDialog.getSaveFileName(
+            self, TRANSLATOR.get("metrics_export"), "metrics.json", "JSON (*.json);;Prometheus (*.prom)"
+        )
+        if path:
+            METRICS.dump(path)
+
+
+class GenerationSignals(QObject):
+    """生成任务信号（在主线程中创建，跨线程发射时自动排队到主线程）"""
+    finished = Signal(object, object)
+    failed = Signal(object, str)
+
+
+class GenerationWorker(QRunnable):
+    """在线程池中执行生成任务"""
+    def __init__(self, task, signals):
+        super().__init__()
+        self.task = task
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = self.task.run()
+        except Exception as e:
+            self.signals.failed.emit(self.task, str(e))
+            return
+        if result is not None:
+            self.signals.finished.emit(self.task, result)
+
+
 class PasswordGenerator(QMainWindow):
     """密码生成器主窗口"""
+    # 合并重新生成请求的时间窗口（毫秒），约为一帧
+    REGENERATE_INTERVAL_MS = 16
+    # 检查配置文件变化的间隔（毫秒）
+    CONFIG_CHECK_INTERVAL_MS = 1000
+
     def __init__(self):
+        init()
         super().__init__()
+        self.metrics_dialog = None
+        self.setup_scheduler()
+        self.setup_workers()
         self.setup_ui()
         self.setup_connections()
         self.load_settings()
+        self.setup_config_watcher()
         self.generate_password()
 
+    def setup_config_watcher(self):
+        """定时检查配置文件，外部修改后自动应用"""
+        self.config_watcher = ConfigWatcher(SETTINGS)
+        SETTINGS.subscribe(self.on_settings_changed)
+        self.config_timer = QTimer(self)
+        self.config_timer.setInterval(self.CONFIG_CHECK_INTERVAL_MS)
+        self.config_timer.timeout.connect(self.config_watcher.check)
+        self.config_timer.start()
+
+    def on_settings_changed(self, changed):
+        """配置文件发生变化：只应用变化的配置项，生成参数变化时才重新生成
+
+        其他配置项（如复制提示）变化时保留界面上的当前结果与尚未保存的选择。
+        """
+        if "default_algorithm" in changed:
+            self.algorithm = SETTINGS.default_algorithm
+            self.update_expression_visibility()
+            self.seed_time_str = ""
+            self.update_dynamic_texts()
+        if "length_min" in changed or "length_max" in changed:
+            self.length_spin.setRange(SETTINGS.length_min, SETTINGS.length_max)
+            self.length_slider.setRange(SETTINGS.length_min, SETTINGS.length_max)
+        if "default_math_expression" in changed:
+            self.expression_edit.setText(SETTINGS.default_math_expression)
+        checks = {
+            "default_include_upper": self.upper_check,
+            "default_include_lower": self.lower_check,
+            "default_include_number": self.number_check,
+            "default_include_special": self.special_check,
+            "passphrase_mode": self.passphrase_check,
+            "template_mode": self.template_check,
+        }
+        for key, check in checks.items():
+            if key in changed:
+                check.setChecked(bool(changed[key]))
+        if "local" in changed:
+            TRANSLATOR.set_local(SETTINGS.local)
+        if GENERATION_KEYS.intersection(changed):
+            self.schedule_generate()
+
     def setup_ui(self):
         """设置UI"""
         # 设置窗口
-        self.setWindowTitle("安全随机字符串生成器")
+        TRANSLATOR.bind(self.setWindowTitle, "main_window_title")
         self.setMinimumSize(600, 400)
         self.setStyleSheet(self.get_stylesheet())
         
@@ -171,7 +492,8 @@ class PasswordGenerator(QMainWindow):
         self.main_layout.setContentsMargins(20, 20, 20, 20)
         
         # 时间显示
-        self.time_label = QLabel("安全随机生成（不使用种子）")
+        self.time_label = QLabel()
+        self.seed_time_str = ""
         self.time_label.setObjectName("timeLabel")
         self.main_layout.addWidget(self.time_label)
         
@@ -181,9 +503,9 @@ class PasswordGenerator(QMainWindow):
         expression_layout = QHBoxLayout(self.expression_frame)
         expression_layout.setSpacing(10)
         
-        expression_label = QLabel("种子表达式：")
+        expression_label = QLabel()
+        TRANSLATOR.bind(expression_label.setText, "seed_expressions", label=True)
         self.expression_edit = QLineEdit()
-        self.expression_edit.setPlaceholderText("例如: math.cos(total_seconds)")
         
         expression_layout.addWidget(expression_label)
         expression_layout.addWidget(self.expression_edit)
@@ -195,9 +517,10 @@ class PasswordGenerator(QMainWindow):
         length_layout.setSpacing(10)
         
         length_row = QHBoxLayout()
-        length_label = QLabel("字符串长度：")
+        length_label = QLabel()
+        TRANSLATOR.bind(length_label.setText, "string_length", label=True)
         self.length_spin = QSpinBox()
-        self.length_spin.setRange(1, 1024)
+        self.length_spin.setRange(SETTINGS.length_min, SETTINGS.length_max)
         self.length_spin.setValue(16)
         
         length_row.addWidget(length_label)
@@ -205,7 +528,7 @@ class PasswordGenerator(QMainWindow):
         length_row.addStretch()
         
         self.length_slider = QSlider(Qt.Horizontal)
-        self.length_slider.setRange(1, 1024)
+        self.length_slider.setRange(SETTINGS.length_min, SETTINGS.length_max)
         self.length_slider.setValue(16)
         
         length_layout.addLayout(length_row)
@@ -217,17 +540,30 @@ class PasswordGenerator(QMainWindow):
         char_layout = QHBoxLayout(char_frame)
         char_layout.setSpacing(15)
         
-        char_label = QLabel("包含字符类型: ")
-        self.upper_check = QCheckBox("大写字母")
-        self.lower_check = QCheckBox("小写字母")
-        self.number_check = QCheckBox("阿拉伯数字")
-        self.special_check = QCheckBox("特殊字符")
+        char_label = QLabel()
+        self.upper_check = QCheckBox()
+        self.lower_check = QCheckBox()
+        self.number_check = QCheckBox()
+        self.special_check = QCheckBox()
+        # 口令模式：从词表中抽取单词，忽略长度与字符类型
+        self.passphrase_check = QCheckBox()
+        # 模板模式：按设置中的模板逐位置生成，忽略长度（? 使用所选字符类型）
+        self.template_check = QCheckBox()
+        TRANSLATOR.bind(char_label.setText, "character_type", label=True)
+        TRANSLATOR.bind(self.upper_check.setText, "uppercase_letters")
+        TRANSLATOR.bind(self.lower_check.setText, "lowercase_letters")
+        TRANSLATOR.bind(self.number_check.setText, "digits")
+        TRANSLATOR.bind(self.special_check.setText, "special_characters")
+        TRANSLATOR.bind(self.passphrase_check.setText, "passphrase_mode")
+        TRANSLATOR.bind(self.template_check.setText, "template_mode")
         
         char_layout.addWidget(char_label)
         char_layout.addWidget(self.upper_check)
         char_layout.addWidget(self.lower_check)
         char_layout.addWidget(self.number_check)
         char_layout.addWidget(self.special_check)
+        char_layout.addWidget(self.passphrase_check)
+        char_layout.addWidget(self.template_check)
         char_layout.addStretch()
         
         self.main_layout.addWidget(char_frame)
@@ -237,12 +573,21 @@ class PasswordGenerator(QMainWindow):
         result_frame.setObjectName("resultFrame")
         result_layout = QVBoxLayout(result_frame)
         
-        self.result_text = QTextEdit()
+        # QPlainTextEdit 按行块排版，超长结果分段追加（见 ProgressiveText）
+        self.result_view = ProgressiveText()
+        self.result_text = QPlainTextEdit()
         self.result_text.setReadOnly(True)
         self.result_text.setMinimumHeight(150)
         self.result_text.setFont(QFont("Consolas", 12))
+        self.result_text.verticalScrollBar().valueChanged.connect(self.on_result_scrolled)
         
         result_layout.addWidget(self.result_text)
+
+        # 强度评估
+        self.strength = None
+        self.strength_label = QLabel()
+        self.strength_label.setObjectName("strengthLabel")
+        result_layout.addWidget(self.strength_label)
         self.main_layout.addWidget(result_frame)
         
         # 按钮布局
@@ -250,10 +595,17 @@ class PasswordGenerator(QMainWindow):
         button_layout = QHBoxLayout(button_frame)
         button_layout.setSpacing(10)
         
-        self.settings_btn = QPushButton("设置")
-        self.help_btn = QPushButton("怎么使用")
-        self.generate_btn = QPushButton("重新生成")
-        self.copy_btn = QPushButton("复制到剪贴板")
+        self.settings_btn = QPushButton()
+        self.help_btn = QPushButton()
+        self.generate_btn = QPushButton()
+        self.copy_btn = QPushButton()
+        TRANSLATOR.bind(self.settings_btn.setText, "settings")
+        TRANSLATOR.bind(self.help_btn.setText, "how_to_use")
+        TRANSLATOR.bind(self.generate_btn.setText, "rebuild")
+        TRANSLATOR.bind(self.copy_btn.setText, "copy_to_clipboard")
+        
+        # 动态文本在切换语言时单独更新
+        TRANSLATOR.on_change(self.update_dynamic_texts)
         
         # 设置按钮样式
         self.settings_btn.setObjectName("settingsButton")
@@ -269,22 +621,49 @@ class PasswordGenerator(QMainWindow):
         
         self.main_layout.addWidget(button_frame)
 
+    def setup_scheduler(self):
+        """设置重新生成调度器
+
+        输入控件的变化只发出生成请求，同一时间窗口内的多次请求合并为一次生成。
+        """
+        self.regenerate_timer = QTimer(self)
+        self.regenerate_timer.setSingleShot(True)
+        self.regenerate_timer.setInterval(self.REGENERATE_INTERVAL_MS)
+        self.regenerate_timer.timeout.connect(self.generate_password)
+
+    def setup_workers(self):
+        """设置后台生成线程池"""
+        self.thread_pool = QThreadPool.globalInstance()
+        self.current_task = None
+        self.generation_signals = GenerationSignals(self)
+        self.generation_signals.finished.connect(self.on_generation_finished)
+        self.generation_signals.failed.connect(self.on_generation_failed)
+
+    def schedule_generate(self, *args):
+        """请求重新生成（合并同一时间窗口内的请求）"""
+        if not self.regenerate_timer.isActive():
+            self.regenerate_timer.start()
+
     def setup_connections(self):
         """设置信号连接"""
-        # 长度控件连接
+        # 长度控件连接（滑块的变化会同步到输入框，只需监听输入框）
         self.length_spin.valueChanged.connect(self.length_slider.setValue)
         self.length_slider.valueChanged.connect(self.length_spin.setValue)
-        self.length_spin.valueChanged.connect(self.generate_password)
-        self.length_slider.valueChanged.connect(self.generate_password)
+        self.length_spin.valueChanged.connect(self.schedule_generate)
         
         # 字符类型连接
-        self.upper_check.stateChanged.connect(self.generate_password)
-        self.lower_check.stateChanged.connect(self.generate_password)
-        self.number_check.stateChanged.connect(self.generate_password)
-        self.special_check.stateChanged.connect(self.generate_password)
+        self.upper_check.stateChanged.connect(self.schedule_generate)
+        self.lower_check.stateChanged.connect(self.schedule_generate)
+        self.number_check.stateChanged.connect(self.schedule_generate)
+        self.special_check.stateChanged.connect(self.schedule_generate)
+        # 口令模式与模板模式互斥
+        self.passphrase_check.toggled.connect(lambda checked: self.exclude_mode(checked, self.template_check))
+        self.template_check.toggled.connect(lambda checked: self.exclude_mode(checked, self.passphrase_check))
+        self.passphrase_check.stateChanged.connect(self.schedule_generate)
+        self.template_check.stateChanged.connect(self.schedule_generate)
         
         # 表达式连接
-        self.expression_edit.textChanged.connect(self.generate_password)
+        self.expression_edit.textChanged.connect(self.schedule_generate)
         
         # 按钮连接
         self.settings_btn.clicked.connect(self.show_settings)
@@ -292,6 +671,9 @@ class PasswordGenerator(QMainWindow):
         self.generate_btn.clicked.connect(self.generate_password)
         self.copy_btn.clicked.connect(self.copy_to_clipboard)
 
+        # F12 打开调试面板
+        QShortcut(QKeySequence(Qt.Key_F12), self, self.show_metrics)
+
     def get_stylesheet(self):
         """获取样式表"""
         return """
@@ -317,19 +699,19 @@ class PasswordGenerator(QMainWindow):
                 font-weight: 500;
             }
             
-            #timeLabel {
+            #timeLabel, #strengthLabel {
                 font-size: 12px;
                 color: #666;
             }
             
-            QLineEdit, QTextEdit, QSpinBox, QSlider {
+            QLineEdit, QPlainTextEdit, QSpinBox, QSlider {
                 background-color: #ffffff;
                 border: 1px solid #ddd;
                 border-radius: 4px;
                 padding: 8px;
             }
             
-            QLineEdit:focus, QTextEdit:focus {
+            QLineEdit:focus, QPlainTextEdit:focus {
                 border-color: #4CAF50;
                 outline: none;
             }
@@ -426,11 +808,17 @@ class PasswordGenerator(QMainWindow):
         # 加载算法设置
         self.algorithm = SETTINGS.default_algorithm
         
+        # 长度范围
+        self.length_spin.setRange(SETTINGS.length_min, SETTINGS.length_max)
+        self.length_slider.setRange(SETTINGS.length_min, SETTINGS.length_max)
+        
         # 加载字符类型设置
         self.upper_check.setChecked(SETTINGS.default_include_upper)
         self.lower_check.setChecked(SETTINGS.default_include_lower)
         self.number_check.setChecked(SETTINGS.default_include_number)
         self.special_check.setChecked(SETTINGS.default_include_special)
+        self.passphrase_check.setChecked(SETTINGS.passphrase_mode)
+        self.template_check.setChecked(SETTINGS.template_mode and not SETTINGS.passphrase_mode)
         
         # 加载表达式默认值
         self.expression_edit.setText(SETTINGS.default_math_expression)
@@ -438,21 +826,51 @@ class PasswordGenerator(QMainWindow):
         # 更新表达式可见性
         self.update_expression_visibility()
         
+        # 切换界面语言（只更新已有控件的文本）
+        TRANSLATOR.set_local(SETTINGS.local)
+        
         # 更新时间标签
-        if self.algorithm == "secrets":
-            self.time_label.setText("安全随机生成（不使用种子）")
+        self.seed_time_str = ""
+        self.update_dynamic_texts()
+
+    def update_dynamic_texts(self):
+        """更新随状态变化的文本"""
+        if self.algorithm in engine.SECURE_BACKENDS:
+            self.time_label.setText(TRANSLATOR.get("safe_random_introduce"))
         else:
-            self.time_label.setText("种子生成时间: ")
+            self.time_label.setText(TRANSLATOR.label("seed_generation_time") + self.seed_time_str)
+        self.expression_edit.setPlaceholderText(
+            TRANSLATOR.get("expression_placeholder", expression=SETTINGS.default_math_expression)
+        )
+        self.update_strength_label()
+
+    def update_strength_label(self):
+        """显示当前结果的强度评估"""
+        if self.strength is None:
+            self.strength_label.setText("")
+            return
+        rating = TRANSLATOR.get(f"strength_ratings.{self.strength['rating']}")
+        value = TRANSLATOR.get("strength_value", rating=rating, bits=self.strength["effective_entropy"])
+        self.strength_label.setText(TRANSLATOR.label("strength") + value)
 
     def show_settings(self):
         """显示设置对话框"""
         dialog = SettingsDialog(self)
         if dialog.exec() == QDialog.Accepted:
-            # 重新加载设置
-            SETTINGS.reload()
+            # 内存中的配置已是最新，直接应用
             self.load_settings()
             self.generate_password()
-            QMessageBox.information(self, "成功", "设置已保存！")
+            QMessageBox.information(
+                self, TRANSLATOR.get("settings_saved.title"), TRANSLATOR.get("settings_saved.message")
+            )
+
+    def show_metrics(self):
+        """显示调试面板（非模态）"""
+        if self.metrics_dialog is None:
+            self.metrics_dialog = MetricsDialog(self)
+        self.metrics_dialog.refresh()
+        self.metrics_dialog.show()
+        self.metrics_dialog.raise_()
 
     def show_help(self):
         """显示帮助文档"""
@@ -462,7 +880,9 @@ class PasswordGenerator(QMainWindow):
         if os.path.exists(help_file):
             webbrowser.open(f"file://{help_file}")
         else:
-            QMessageBox.information(self, "帮助", "帮助文件不存在")
+            QMessageBox.information(
+                self, TRANSLATOR.get("help_missing.title"), TRANSLATOR.get("help_missing.message")
+            )
 
     def update_expression_visibility(self):
         """根据算法类型更新表达式可见性"""
@@ -473,63 +893,132 @@ class PasswordGenerator(QMainWindow):
 
     def get_char_pool(self):
         """获取字符池"""
-        char_pool = []
-        if self.upper_check.isChecked():
-            char_pool.extend(string.ascii_uppercase)
-        if self.lower_check.isChecked():
-            char_pool.extend(string.ascii_lowercase)
-        if self.number_check.isChecked():
-            char_pool.extend("0123456789")
-        if self.special_check.isChecked():
-            char_pool.extend("!@#$%^&*()_+-=[]{}|;:',.<>?/`~")
-        
-        if not char_pool:
-            QMessageBox.critical(self, "错误", "至少需要选择一种字符类型！")
-            return list(string.ascii_letters + string.digits)  # 默认返回所有字符
+        with METRICS.span("pool"):
+            char_pool = pools.get_pool(
+                self.upper_check.isChecked(),
+                self.lower_check.isChecked(),
+                self.number_check.isChecked(),
+                self.special_check.isChecked(),
+            )
+        
+        if char_pool is None:
+            QMessageBox.critical(self, TRANSLATOR.get("error"), TRANSLATOR.get("char_pool_error"))
+            return pools.DEFAULT_POOL  # 默认返回所有字符
         
         return char_pool
 
     def generate_password(self):
         """生成密码"""
+        # 直接生成时取消尚未执行的调度请求
+        self.regenerate_timer.stop()
         try:
+            if self.passphrase_check.isChecked():
+                self.start_task(self.create_passphrase_task())
+                return
+            if self.template_check.isChecked():
+                self.start_task(self.create_template_task())
+                return
+
             char_pool = self.get_char_pool()
             length = self.length_spin.value()
             
-            if self.algorithm == "secrets":
-                generated = "".join(secrets.choice(char_pool) for _ in range(length))
+            constraints = policy.Policy.from_settings(SETTINGS)
+            if self.algorithm in engine.SECURE_BACKENDS:
+                task = tasks.GenerationTask(length, char_pool, backend=self.algorithm, constraints=constraints)
             else:
-                current_time = datetime.datetime.now()
-                time_str = current_time.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                self.time_label.setText(f"种子生成时间: {time_str}")
-                
-                total_seconds = (
-                        current_time
-                        - current_time.replace(hour=0, minute=0, second=0, microsecond=0)
-                ).total_seconds()
-                
-                context = {
-                    "math": math,
-                    "total_seconds": total_seconds,
-                    "hours": current_time.hour,
-                    "minutes": current_time.minute,
-                    "seconds": current_time.second,
-                    "microseconds": current_time.microsecond,
-                }
-                
-                expression = self.expression_edit.text() or "math.cos(total_seconds)"
-                seed_value = eval(expression, context)
-                random.seed(abs(seed_value))
-                generated = "".join(random.choices(char_pool, k=length))
+                # 每次生成使用独立的随机流，不修改全局 random 状态
+                task = tasks.GenerationTask(length, char_pool, seed=self.evaluate_seed(), constraints=constraints)
             
-            self.result_text.setText(generated)
+            self.start_task(task)
         except SyntaxError as e:
-            QMessageBox.critical(self, "语法错误", f"生成过程中发生错误：\n{str(e)}")
+            QMessageBox.critical(
+                self, TRANSLATOR.get("syntax_errors.title"), f"{TRANSLATOR.get('syntax_errors.message')}\n{str(e)}"
+            )
         except Exception as e:
-            QMessageBox.critical(self, "未知错误", f"生成过程中发生错误: \n{str(e)}")
+            QMessageBox.critical(
+                self, TRANSLATOR.get("unknown_errors.title"), f"{TRANSLATOR.get('unknown_errors.message')}\n{str(e)}"
+            )
+
+    def evaluate_seed(self):
+        """按当前时间计算种子表达式"""
+        current_time = datetime.datetime.now()
+        self.seed_time_str = current_time.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        self.update_dynamic_texts()
+
+        expression = self.expression_edit.text() or "math.cos(total_seconds)"
+        with METRICS.span("seed_eval"):
+            seed_value = seed_expression.evaluate(expression, current_time)
+        return abs(seed_value)
+
+    def create_passphrase_task(self):
+        """口令模式：从设置中的词表抽取单词（种子随机算法下同样使用种子）"""
+        if not SETTINGS.passphrase_wordlist:
+            raise ValueError(TRANSLATOR.get("passphrase_wordlist_missing"))
+        seed = None if self.algorithm in engine.SECURE_BACKENDS else self.evaluate_seed()
+        return tasks.PassphraseTask(
+            SETTINGS.passphrase_wordlist, passphrase.Passphrase.from_settings(SETTINGS), seed
+        )
+
+    def create_template_task(self):
+        """模板模式：模板在界面线程中编译（已缓存），? 使用所选字符类型"""
+        char_pool = pools.get_pool(
+            self.upper_check.isChecked(),
+            self.lower_check.isChecked(),
+            self.number_check.isChecked(),
+            self.special_check.isChecked(),
+        )
+        compiled = template.compile_template(SETTINGS.template_pattern, char_pool)
+        if self.algorithm in engine.SECURE_BACKENDS:
+            return tasks.TemplateTask(compiled, backend=self.algorithm)
+        return tasks.TemplateTask(compiled, seed=self.evaluate_seed())
+
+    def exclude_mode(self, checked, other):
+        """勾选一种模式时取消另一种模式"""
+        if checked:
+            other.setChecked(False)
+
+    def start_task(self, task):
+        """取消过期任务并在后台执行新任务"""
+        if self.current_task is not None:
+            self.current_task.cancel()
+        self.current_task = task
+        self.thread_pool.start(GenerationWorker(task, self.generation_signals))
+
+    def on_generation_finished(self, task, generated):
+        """后台生成完成（丢弃过期任务的结果）"""
+        if task is not self.current_task:
+            return
+        self.current_task = None
+        with METRICS.span("render"):
+            self.result_view.reset(generated)
+            self.result_text.setPlainText(self.result_view.next_chunk())
+        with METRICS.span("strength"):
+            self.strength = task.strength(generated)
+        self.update_strength_label()
+        startup.PROFILER.finish()
+
+    def on_result_scrolled(self, value):
+        """滚动到结果末尾附近时追加下一段"""
+        scroll_bar = self.result_text.verticalScrollBar()
+        if self.result_view.complete or value < scroll_bar.maximum() - scroll_bar.pageStep():
+            return
+        cursor = self.result_text.textCursor()
+        cursor.movePosition(cursor.MoveOperation.End)
+        cursor.insertText(self.result_view.next_chunk())
+
+    def on_generation_failed(self, task, message):
+        """后台生成失败"""
+        if task is not self.current_task:
+            return
+        self.current_task = None
+        QMessageBox.critical(
+            self, TRANSLATOR.get("unknown_errors.title"), f"{TRANSLATOR.get('unknown_errors.message')}\n{message}"
+        )
 
     def copy_to_clipboard(self):
         """复制到剪贴板"""
-        text = self.result_text.toPlainText().strip()
+        # 直接使用完整结果，不从控件中读取（控件中可能只渲染了一部分）
+        text = self.result_view.text.strip()
         if text:
             clipboard = QApplication.clipboard()
             clipboard.setText(text)
@@ -557,7 +1046,7 @@ class PasswordGenerator(QMainWindow):
 
     def show_copy_bubble(self):
         """显示复制气泡提示"""
-        bubble = QLabel("已复制到剪贴板！", self)
+        bubble = QLabel(TRANSLATOR.get("selected_message_box.message"), self)
         bubble.setObjectName("copyBubble")
         bubble.setStyleSheet("""
             QLabel#copyBubble {
@@ -586,16 +1075,25 @@ class PasswordGenerator(QMainWindow):
 
 def main():
     """主函数"""
-    app = QApplication([])
-    app.setStyle("Fusion")
+    profiler = startup.PROFILER
+    with profiler.phase("settings"):
+        init()
+    
+    with profiler.phase("application"):
+        app = QApplication([])
+        app.setStyle("Fusion")
     
     # 设置应用程序图标（如果有的话）
     # app.setWindowIcon(QIcon("path/to/icon.png"))
     
-    window = PasswordGenerator()
-    window.show()
+    with profiler.phase("window"):
+        window = PasswordGenerator()
+    with profiler.phase("show"):
+        window.show()
     
     app.exec()
+    # 等待尚未完成的配置写入
+    SETTINGS.flush()
 
 
 if __name__ == "__main__":
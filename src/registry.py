@@ -0,0 +1,452 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : registry.py
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import tempfile
+from bisect import bisect_right
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from src import engine, policy
+from src.batch import TokenBatch
+
+# 每个已发放字符串在磁盘上只保存 16 字节的 BLAKE2b 摘要
+DIGEST_SIZE = 16
+_PERSON = b"pwgen-registry"
+
+# 布隆过滤器的默认容量与误判率，超出容量时按两倍容量重建
+DEFAULT_CAPACITY = 10_000_000
+DEFAULT_ERROR_RATE = 0.001
+
+# 段文件中每隔多少条记录在内存中保留一个索引键
+FENCE_INTERVAL = 1024
+# 段文件数量上限，超出后合并较小的段
+MAX_SEGMENTS = 16
+# 合并段文件时每次读取的记录数
+MERGE_BATCH = 65536
+# 发放时每批生成并登记的字符串数
+ISSUE_BATCH = 1_000_000
+# 连续抽取超过“可能的字符串总数 × 该倍数”个候选仍没有新字符串时认为已耗尽，
+# 此时即使只剩一个未发放的字符串，误判的概率也低于 e^-32
+EXHAUSTION_FACTOR = 32
+
+META_FILE = "meta.json"
+BLOOM_FILE = "bloom.bin"
+LOCK_FILE = "lock"
+
+
+def digest(token) -> bytes:
+    """字符串的 16 字节摘要（不可逆，注册表中不保存明文）"""
+    data = token.encode("utf-8") if isinstance(token, str) else token
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE, person=_PERSON).digest()
+
+
+def _lock_directory(path):
+    """对登记表目录加排他锁，返回锁文件（关闭即释放），已被其他进程锁定时抛出 RuntimeError"""
+    lock_file = open(os.path.join(path, LOCK_FILE), "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock_file.close()
+        raise RuntimeError(f"登记表正在被其他进程使用: {path}") from None
+    return lock_file
+
+
+def _bloom_shape(capacity: int, error_rate: float):
+    """按容量与误判率计算 (位数, 哈希函数个数)"""
+    bits = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+    bits = -(-bits // 8) * 8
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+def _atomic_write(path, data: bytes):
+    """先写临时文件再替换（与 Settings 的配置写入方式相同）"""
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp.", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class _Segment:
+    """有序摘要段文件（只读），通过稀疏索引 + 块内二分查找判断成员"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = os.path.getsize(path) // DIGEST_SIZE
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+        self._fences = [self._record(i) for i in range(0, self.count, FENCE_INTERVAL)]
+
+    def _record(self, index):
+        offset = index * DIGEST_SIZE
+        return self._map[offset:offset + DIGEST_SIZE]
+
+    def __contains__(self, key: bytes) -> bool:
+        block = bisect_right(self._fences, key) - 1
+        if block < 0:
+            return False
+        lo = block * FENCE_INTERVAL
+        hi = min(lo + FENCE_INTERVAL, self.count)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            if record < key:
+                lo = mid + 1
+            elif record > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def __iter__(self):
+        """按顺序逐条读取记录"""
+        with open(self.path, "rb") as f:
+            while True:
+                data = f.read(MERGE_BATCH * DIGEST_SIZE)
+                if not data:
+                    return
+                for offset in range(0, len(data), DIGEST_SIZE):
+                    yield data[offset:offset + DIGEST_SIZE]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class TokenRegistry:
+    """已发放字符串的持久化登记表
+
+    磁盘结构（一个目录）：
+    - segment-*.bin：按字节序排列的 16 字节摘要，每次登记写入一个新段，段过多时合并
+    - bloom.bin：覆盖全部摘要的布隆过滤器（内存映射），绝大多数新字符串只需检查它
+    - meta.json：段列表、总数与布隆过滤器参数
+
+    布隆过滤器判断“可能存在”时再到各段中精确查找，因此不会误判为未发放。
+    内存中只保留布隆过滤器的映射与每段的稀疏索引，不保存全部字符串。
+    打开期间持有目录的排他锁（lock 文件），同一登记表不能同时被多个进程写入。
+    """
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock_file = _lock_directory(path)
+        try:
+            self._open(capacity, error_rate)
+        except BaseException:
+            self._lock_file.close()
+            raise
+
+    def _open(self, capacity, error_rate):
+        """读取元数据并映射段文件与布隆过滤器"""
+        path = self.path
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        else:
+            bits, hashes = _bloom_shape(capacity, error_rate)
+            meta = {
+                "version": 1,
+                "digest_size": DIGEST_SIZE,
+                "count": 0,
+                "next_segment": 0,
+                "segments": [],
+                "bloom": {"capacity": capacity, "error_rate": error_rate, "bits": bits, "hashes": hashes},
+            }
+        if meta["digest_size"] != DIGEST_SIZE:
+            raise ValueError(f"不支持的摘要长度: {meta['digest_size']}")
+        self._meta = meta
+        self._segments = [_Segment(os.path.join(path, name)) for name in meta["segments"]]
+        self._bloom_file = None
+        self._bloom = None
+        self._open_bloom()
+        if not os.path.exists(meta_path):
+            self._save_meta()
+
+    # 布隆过滤器
+
+    def _open_bloom(self):
+        """映射布隆过滤器文件，文件不存在或大小不符时重建"""
+        bloom_path = os.path.join(self.path, BLOOM_FILE)
+        size = self._meta["bloom"]["bits"] // 8
+        if not os.path.exists(bloom_path) or os.path.getsize(bloom_path) != size:
+            self._build_bloom(bloom_path, size)
+        self._bloom_file = open(bloom_path, "r+b")
+        self._bloom = mmap.mmap(self._bloom_file.fileno(), size)
+        self._bits = self._meta["bloom"]["bits"]
+        self._hashes = self._meta["bloom"]["hashes"]
+
+    def _build_bloom(self, bloom_path, size):
+        """由全部段文件重新计算布隆过滤器"""
+        bits, hashes = self._meta["bloom"]["bits"], self._meta["bloom"]["hashes"]
+        bloom = bytearray(size)
+        for segment in self._segments:
+            for key in segment:
+                for position in self._positions(key, bits, hashes):
+                    bloom[position >> 3] |= 1 << (position & 7)
+        _atomic_write(bloom_path, bytes(bloom))
+
+    def _close_bloom(self):
+        if self._bloom is not None:
+            self._bloom.flush()
+            self._bloom.close()
+            self._bloom_file.close()
+            self._bloom = None
+
+    @staticmethod
+    def _positions(key: bytes, bits: int, hashes: int):
+        """双重哈希：摘要本身已均匀分布，直接拆成两个 64 位整数"""
+        h1 = int.from_bytes(key[:8], "little")
+        h2 = int.from_bytes(key[8:], "little") | 1
+        return [(h1 + i * h2) % bits for i in range(hashes)]
+
+    def _bloom_contains(self, key: bytes) -> bool:
+        bloom = self._bloom
+        for position in self._positions(key, self._bits, self._hashes):
+            if not bloom[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def _bloom_add(self, key: bytes):
+        bloom = self._bloom
+        for position in self._positions(key, self._bits, self._hashes):
+            bloom[position >> 3] |= 1 << (position & 7)
+
+    def _grow_bloom(self):
+        """登记数量超出容量时按两倍容量重建布隆过滤器，保持误判率"""
+        bloom_meta = self._meta["bloom"]
+        capacity = max(bloom_meta["capacity"] * 2, self._meta["count"] * 2)
+        bits, hashes = _bloom_shape(capacity, bloom_meta["error_rate"])
+        self._close_bloom()
+        bloom_meta.update(capacity=capacity, bits=bits, hashes=hashes)
+        self._build_bloom(os.path.join(self.path, BLOOM_FILE), bits // 8)
+        self._save_meta()
+        self._open_bloom()
+
+    # 元数据与段文件
+
+    def _save_meta(self):
+        self._meta["segments"] = [os.path.basename(segment.path) for segment in self._segments]
+        data = json.dumps(self._meta, ensure_ascii=False, indent=4).encode("utf-8")
+        _atomic_write(os.path.join(self.path, META_FILE), data)
+
+    def _new_segment_path(self):
+        name = f"segment-{self._meta['next_segment']:06d}.bin"
+        self._meta["next_segment"] += 1
+        return os.path.join(self.path, name)
+
+    def _write_segment(self, keys) -> "_Segment":
+        """将有序摘要流写入新的段文件"""
+        path = self._new_segment_path()
+        fd, temp_path = tempfile.mkstemp(prefix=".tmp.", dir=self.path)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                batch = []
+                for key in keys:
+                    batch.append(key)
+                    if len(batch) >= MERGE_BATCH:
+                        f.write(b"".join(batch))
+                        batch.clear()
+                f.write(b"".join(batch))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return _Segment(path)
+
+    @staticmethod
+    def _unique_merge(segments):
+        """多路归并有序段并去重"""
+        previous = None
+        for key in heapq.merge(*segments):
+            if key != previous:
+                yield key
+                previous = key
+
+    def _merge_segments(self, segments):
+        """将若干段合并为一个新段，替换原有的段"""
+        merged = self._write_segment(self._unique_merge(segments))
+        remaining = [segment for segment in self._segments if segment not in segments]
+        self._segments = remaining + [merged]
+        self._save_meta()
+        for segment in segments:
+            segment.close()
+            os.unlink(segment.path)
+
+    def _maybe_compact(self):
+        """段过多时合并较小的一半"""
+        if len(self._segments) > MAX_SEGMENTS:
+            smallest = sorted(self._segments, key=lambda segment: segment.count)[:len(self._segments) // 2 + 1]
+            self._merge_segments(smallest)
+
+    # 公共接口
+
+    def __len__(self):
+        return self._meta["count"]
+
+    def __contains__(self, token) -> bool:
+        return self.contains_digest(digest(token))
+
+    def contains_digest(self, key: bytes) -> bool:
+        """按摘要判断是否已登记：布隆过滤器排除后才查找段文件"""
+        if not self._bloom_contains(key):
+            return False
+        return any(key in segment for segment in self._segments)
+
+    def register(self, tokens, limit=None) -> list:
+        """登记一批字符串，返回其中新登记的字符串的下标（按输入顺序）
+
+        与已登记的字符串或本批中前面的字符串重复的会被丢弃；指定 limit 时最多登记 limit 个。
+        本批摘要排序后写成一个新段，因此同一次发放中的后续批次也能查到。
+        """
+        keys = {}
+        # 本批中已确认登记过的摘要，可用字符串不多时同一批中会大量重复出现
+        issued = set()
+        for index, token in enumerate(tokens):
+            key = digest(token)
+            if key in keys or key in issued:
+                continue
+            if self.contains_digest(key):
+                issued.add(key)
+                continue
+            keys[key] = index
+            if limit is not None and len(keys) >= limit:
+                break
+        if not keys:
+            return []
+
+        self._segments.append(self._write_segment(sorted(keys)))
+        for key in keys:
+            self._bloom_add(key)
+        self._bloom.flush()
+        self._meta["count"] += len(keys)
+        self._save_meta()
+        if self._meta["count"] > self._meta["bloom"]["capacity"]:
+            self._grow_bloom()
+        self._maybe_compact()
+        return list(keys.values())
+
+    def add_batch(self, tokens) -> list:
+        """登记一批字符串，返回其中新登记的字符串（按输入顺序）"""
+        tokens = list(tokens)
+        return [tokens[index] for index in self.register(tokens)]
+
+    def merge(self, other_path) -> int:
+        """合并另一个登记表目录中的全部摘要，返回新增数量"""
+        other = TokenRegistry(other_path)
+        try:
+            before = self._meta["count"]
+            fresh = self._write_segment(
+                key for key in self._unique_merge(other._segments) if not self.contains_digest(key)
+            )
+            if fresh.count:
+                self._segments.append(fresh)
+                for key in fresh:
+                    self._bloom_add(key)
+                self._bloom.flush()
+                self._meta["count"] += fresh.count
+                self._save_meta()
+            else:
+                fresh.close()
+                os.unlink(fresh.path)
+            if self._meta["count"] > self._meta["bloom"]["capacity"]:
+                self._grow_bloom()
+            self._maybe_compact()
+            return self._meta["count"] - before
+        finally:
+            other.close()
+
+    def compact(self):
+        """将全部段合并为一个"""
+        if len(self._segments) > 1:
+            self._merge_segments(list(self._segments))
+
+    def info(self) -> dict:
+        """登记表概况"""
+        return {
+            "path": self.path,
+            "count": self._meta["count"],
+            "segments": len(self._segments),
+            "bloom": dict(self._meta["bloom"]),
+        }
+
+    def close(self):
+        self._close_bloom()
+        for segment in self._segments:
+            segment.close()
+        self._lock_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def issue_lines(registry: TokenRegistry, count, length, pool, backend="secrets", constraints=None,
+                batch_size=ISSUE_BATCH, template=None):
+    """逐批产出以换行结尾、在本次发放内及与历史记录均不重复的字符串（字节形式）
+
+    每批生成后先登记再产出，重复的字符串直接丢弃并在下一批中补足。
+    出现重复后（可用的字符串已不多）每批至少抽取 batch_size 个候选，只登记仍需要的数量，
+    连续抽取的候选数远超可能的字符串总数仍没有新字符串时才认为已耗尽。
+    每批紧凑存放在 TokenBatch 中，登记与写出都不为每个字符串创建 str 对象。
+    指定 template（template.Template）时按模板生成，忽略 length、pool 与 constraints。
+    """
+    if template is not None:
+        space = template.combinations
+    elif constraints is not None and constraints.active:
+        space = policy.count(length, pool, constraints)
+    else:
+        space = len(pool) ** length
+    if count > space:
+        raise RuntimeError(f"可能的字符串只有 {space} 个，无法发放 {count} 个不重复的字符串，请增加长度或字符类型")
+
+    empty_draws = 0
+    short = False
+    remaining = count
+    while remaining > 0:
+        n = batch_size if short else min(batch_size, remaining)
+        if template is not None:
+            candidates = template.generate_token_batch(n, backend=backend)
+        elif constraints is not None and constraints.active:
+            candidates = TokenBatch.from_tokens(policy.generate(length, pool, constraints) for _ in range(n))
+        else:
+            candidates = engine.generate_token_batch(n, length, pool, backend=backend)
+        fresh = registry.register(candidates, remaining)
+        short = len(fresh) < n
+        if not fresh:
+            empty_draws += n
+            if empty_draws >= EXHAUSTION_FACTOR * space:
+                raise RuntimeError("可用的不重复字符串已耗尽，请增加长度或字符类型")
+            continue
+        empty_draws = 0
+        remaining -= len(fresh)
+        # 绝大多数批次没有重复，直接写出整块缓冲区
+        batch = candidates if len(fresh) == len(candidates) else candidates.select(fresh)
+        yield batch.buffer
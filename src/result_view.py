@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : result_view.py
+
+
+class ProgressiveText:
+    """大结果的分段渲染状态（与界面工具包无关）
+
+    完整结果只保存在内存中，控件里先放入首段，滚动到末尾附近时再追加下一段，
+    避免一次性对数 MB 文本做排版。复制等操作直接使用完整结果。
+    """
+    # 首次渲染与每次追加的字符数
+    CHUNK_CHARS = 64 * 1024
+
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.rendered = 0
+
+    def reset(self, text: str):
+        """替换为新的结果"""
+        self.text = text
+        self.rendered = 0
+
+    def next_chunk(self) -> str:
+        """取下一段待渲染的文本，全部渲染完时返回空字符串"""
+        chunk = self.text[self.rendered:self.rendered + self.CHUNK_CHARS]
+        self.rendered += len(chunk)
+        return chunk
+
+    @property
+    def complete(self) -> bool:
+        return self.rendered >= len(self.text)
+
+
+def needs_wrap(char_count: int, char_width: int, container_width: int) -> bool:
+    """等宽字体下按字符数计算文本宽度，判断是否需要换行"""
+    return char_count * char_width > container_width
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : seed_expression.py
+import ast
+import datetime
+import math
+import types
+from functools import lru_cache
+
+# 整数运算结果的位数上限，超过时拒绝计算，避免 9**9**9 之类的表达式长时间占用 CPU 和内存
+MAX_INT_BITS = 4096
+# math.factorial / math.comb / math.perm 参数的上限
+MAX_FACTORIAL = 1000
+
+
+def _check_bits(bits):
+    if bits > MAX_INT_BITS:
+        raise ValueError(f"表达式中的整数过大（超过 {MAX_INT_BITS} 位）")
+
+
+def _int_bits(value) -> int:
+    return abs(value).bit_length() if isinstance(value, int) else 0
+
+
+def _check_factorial(n):
+    if isinstance(n, (int, float)) and n > MAX_FACTORIAL:
+        raise ValueError(f"阶乘、组合数的参数不能超过 {MAX_FACTORIAL}")
+
+
+def _safe_pow(base, exp, mod=None):
+    """pow / ** 运算，按底数位数 × 指数估算结果位数"""
+    if mod is None and isinstance(exp, int) and exp > 0 and isinstance(base, int) and abs(base) > 1:
+        _check_bits(_int_bits(base) * exp)
+    return pow(base, exp) if mod is None else pow(base, exp, mod)
+
+
+def _safe_mul(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        _check_bits(_int_bits(a) + _int_bits(b))
+    return a * b
+
+
+def _safe_lshift(a, b):
+    if isinstance(b, int) and b > 0:
+        _check_bits(_int_bits(a) + b)
+    return a << b
+
+
+def _safe_round(number, ndigits=None):
+    # 整数按负的位数取整时会计算 10 ** -ndigits
+    if isinstance(number, int) and isinstance(ndigits, int) and ndigits < 0:
+        _check_bits(-ndigits * 4)
+    return round(number, ndigits)
+
+
+def _safe_factorial(n):
+    _check_factorial(n)
+    return math.factorial(n)
+
+
+def _safe_comb(n, k):
+    _check_factorial(n)
+    return math.comb(n, k)
+
+
+def _safe_perm(n, k=None):
+    _check_factorial(n)
+    return math.perm(n, k)
+
+
+# 表达式中可以使用的内置函数
+SAFE_BUILTINS = {
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "round": _safe_round,
+    "int": int,
+    "float": float,
+    "pow": _safe_pow,
+}
+
+# 表达式中的 math：与 math 模块相同，但可能产生巨大整数的函数带上限检查
+SAFE_MATH = types.SimpleNamespace(
+    **{
+        **{name: getattr(math, name) for name in dir(math) if not name.startswith("_")},
+        "factorial": _safe_factorial, "comb": _safe_comb, "perm": _safe_perm,
+    }
+)
+
+# 替换为带上限检查的函数调用的运算符（名称以 _ 开头，表达式本身无法引用）
+_GUARDED_OPERATORS = {ast.Pow: "_pow", ast.Mult: "_mul", ast.LShift: "_lshift"}
+_GUARDS = {"_pow": _safe_pow, "_mul": _safe_mul, "_lshift": _safe_lshift}
+
+# 表达式上下文中可以使用的变量
+CONTEXT_NAMES = ("math", "total_seconds", "hours", "minutes", "seconds", "microseconds")
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.Load,
+    ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.Name, ast.Attribute, ast.Constant,
+    ast.operator, ast.unaryop, ast.boolop, ast.cmpop,
+)
+
+
+def _validate(tree):
+    """检查语法树只包含允许的节点"""
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise SyntaxError(f"表达式中不允许使用: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise SyntaxError(f"表达式中不允许使用常量: {node.value!r}")
+        if isinstance(node, ast.Name) and node.id not in CONTEXT_NAMES and node.id not in SAFE_BUILTINS:
+            raise SyntaxError(f"未知的名称: {node.id}")
+        if isinstance(node, ast.Attribute):
+            if not (isinstance(node.value, ast.Name) and node.value.id == "math"):
+                raise SyntaxError("只允许访问 math 模块的属性")
+            if node.attr.startswith("_") or not hasattr(math, node.attr):
+                raise SyntaxError(f"math 模块中不存在: {node.attr}")
+        if isinstance(node, ast.Call) and node.keywords:
+            raise SyntaxError("函数调用不支持关键字参数")
+
+
+class _GuardOperators(ast.NodeTransformer):
+    """把可能产生巨大整数的二元运算替换为带上限检查的函数调用"""
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        name = _GUARDED_OPERATORS.get(type(node.op))
+        if name is None:
+            return node
+        return ast.copy_location(ast.Call(ast.Name(name, ast.Load()), [node.left, node.right], []), node)
+
+
+@lru_cache(maxsize=128)
+def compile_expression(expression: str):
+    """校验并编译种子表达式，结果按表达式文本缓存"""
+    tree = ast.parse(expression.strip(), mode="eval")
+    _validate(tree)
+    tree = ast.fix_missing_locations(_GuardOperators().visit(tree))
+    return compile(tree, "<seed_expression>", "eval")
+
+
+def build_context(current_time: datetime.datetime) -> dict:
+    """根据时间构建表达式上下文"""
+    total_seconds = (
+            current_time
+            - current_time.replace(hour=0, minute=0, second=0, microsecond=0)
+    ).total_seconds()
+    return {
+        "math": SAFE_MATH,
+        "total_seconds": total_seconds,
+        "hours": current_time.hour,
+        "minutes": current_time.minute,
+        "seconds": current_time.second,
+        "microseconds": current_time.microsecond,
+    }
+
+
+def evaluate(expression: str, current_time: datetime.datetime):
+    """计算种子表达式的值，整数结果过大时抛出 ValueError"""
+    code = compile_expression(expression)
+    return eval(code, {"__builtins__": SAFE_BUILTINS, **_GUARDS}, build_context(current_time))
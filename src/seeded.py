@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : seeded.py
+import hashlib
+import random
+
+from src import engine, policy
+from src.pools import CharPool
+
+
+def derive_seed(master_seed, index: int) -> int:
+    """由主种子和子流编号派生子流种子
+
+    不同编号经 SHA-512 得到相互独立的 512 位种子，各子流的梅森旋转状态互不相关。
+    """
+    digest = hashlib.sha512(f"{master_seed!r}:{index}".encode("utf-8")).digest()
+    return int.from_bytes(digest, "big")
+
+
+class SeededStream:
+    """可复现的种子随机流
+
+    每个实例持有独立的 random.Random，互不干扰，可在多线程或多进程中并行使用。
+    编号为 0 的主流与 random.seed(seed) 的结果一致。
+    """
+
+    def __init__(self, seed, index: int = 0):
+        self.seed = seed
+        self.index = index
+        self._rng = random.Random(seed if index == 0 else derive_seed(seed, index))
+
+    @property
+    def rng(self) -> random.Random:
+        """底层的随机数生成器（用于按约束生成）"""
+        return self._rng
+
+    def substream(self, index: int) -> "SeededStream":
+        """获取同一主种子下编号为 index 的子流"""
+        return SeededStream(self.seed, index)
+
+    def spawn(self, count: int, start: int = 1) -> list:
+        """批量派生 count 个子流"""
+        return [self.substream(start + i) for i in range(count)]
+
+    def generate(self, length: int, pool) -> str:
+        """生成单个字符串"""
+        population = pool.chars if isinstance(pool, CharPool) else pool
+        return "".join(self._rng.choices(population, k=length))
+
+    def generate_batch(self, count: int, length: int, pool) -> list:
+        """批量生成字符串"""
+        data = self.generate(count * length, pool)
+        return [data[i:i + length] for i in range(0, count * length, length)]
+
+    def generate_lines(self, count: int, length: int, pool, sep: bytes = b"\n") -> bytes:
+        """批量生成以 sep 结尾的多行字符串（字节形式）"""
+        if count <= 0:
+            return b""
+        data = self.generate(count * length, pool).encode("latin-1")
+        return engine.join_lines(data, count, length, sep)
+
+
+def shard_lines(seed, shard_index: int, count: int, length: int, pool, constraints=None) -> bytes:
+    """生成种子模式下的一个分片
+
+    分片 i 固定使用子流 i + 1，只要分片大小不变，无论单进程还是多进程、
+    按何种顺序执行，都能复现相同的输出。constraints 为生成约束（policy.Policy）。
+    """
+    return stream_lines(SeededStream(seed, shard_index + 1), count, length, pool, constraints)
+
+
+def stream_lines(stream: SeededStream, count: int, length: int, pool, constraints=None) -> bytes:
+    """从随机流中继续取 count 个字符串
+
+    随机流按顺序消耗，同一子流分多次取与一次取完得到的输出相同。
+    """
+    if constraints is not None and constraints.active:
+        return policy.generate_lines(count, length, pool, constraints, stream.rng)
+    return stream.generate_lines(count, length, pool)
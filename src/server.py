@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : server.py
+import asyncio
+import json
+import logging
+import os
+import stat
+from collections import OrderedDict, deque
+
+from src import engine, policy, pools, template
+from src.batch import TokenBatch
+from src.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# 每种规格预先生成的字符串数，低于低水位时后台补充
+BUFFER_TOKENS = 65536
+LOW_WATERMARK = 16384
+# 每次补充生成的字符串数
+REFILL_BATCH = 16384
+# 同时保留缓冲区的规格数，超出后淘汰最久未使用的
+MAX_BUFFERS = 8
+# 单个请求的最大数量与单行请求的最大字节数
+MAX_COUNT = 100_000
+MAX_REQUEST_BYTES = 1024 * 1024
+# 缓冲区耗尽时最多等待补充的秒数，超时返回 busy 让客户端稍后重试
+BUSY_TIMEOUT = 5.0
+
+
+class TokenBuffer:
+    """某一规格（长度、字符池、约束或模板）的预生成字符串缓冲区
+
+    预生成的字符串按批紧凑存放（TokenBatch），取用时才转换为 str。
+    取用后低于低水位时在线程池中补充；请求数量超过已有数量时等待补充完成，
+    等待期间不再读取该连接的后续请求，由 TCP 流量控制把压力传回客户端。
+    """
+
+    def __init__(self, length, pool, constraints, backend, capacity=BUFFER_TOKENS, template=None):
+        self.length = length
+        self.pool = pool
+        self.constraints = constraints
+        self.backend = backend
+        self.capacity = capacity
+        self.template = template
+        self._batches = deque()
+        # 第一批中下一个可取用的下标与缓冲的总数
+        self._head = 0
+        self._size = 0
+        self._refill_task = None
+        self._available = asyncio.Condition()
+
+    def __len__(self):
+        return self._size
+
+    def _generate(self, count) -> TokenBatch:
+        """在工作线程中生成 count 个字符串"""
+        if self.template is not None:
+            return self.template.generate_token_batch(count, backend=self.backend)
+        if self.constraints.active:
+            return TokenBatch.from_tokens(
+                policy.generate(self.length, self.pool, self.constraints) for _ in range(count)
+            )
+        return engine.generate_token_batch(count, self.length, self.pool, backend=self.backend)
+
+    def fill(self, needed=0):
+        """数量低于低水位（或本次需要的数量）且没有进行中的补充时开始补充"""
+        if self._refill_task is None and self._size < max(LOW_WATERMARK, needed):
+            self._refill_task = asyncio.get_running_loop().create_task(self._refill())
+
+    async def _refill(self):
+        """补充到容量上限"""
+        loop = asyncio.get_running_loop()
+        try:
+            while self._size < self.capacity:
+                batch = await loop.run_in_executor(
+                    None, self._generate, min(REFILL_BATCH, self.capacity - self._size)
+                )
+                async with self._available:
+                    self._batches.append(batch)
+                    self._size += len(batch)
+                    self._available.notify_all()
+        except Exception as e:
+            logger.error(f"补充缓冲区失败: {str(e)}")
+        finally:
+            self._refill_task = None
+
+    async def take(self, count, timeout=BUSY_TIMEOUT):
+        """取出 count 个字符串；超过容量的请求直接在线程池中生成"""
+        if count > self.capacity:
+            batch = await asyncio.get_running_loop().run_in_executor(None, self._generate, count)
+            return batch.tolist()
+        async with self._available:
+            self.fill(count)
+            await asyncio.wait_for(self._available.wait_for(lambda: self._size >= count), timeout)
+            tokens = []
+            while len(tokens) < count:
+                batch = self._batches[0]
+                end = min(self._head + count - len(tokens), len(batch))
+                tokens.extend(map(batch.token, range(self._head, end)))
+                self._head = end
+                if end == len(batch):
+                    self._batches.popleft()
+                    self._head = 0
+            self._size -= count
+        self.fill()
+        return tokens
+
+
+class GenerationServer:
+    """本地生成服务
+
+    协议为按行分隔的 JSON，连接保持打开，可连续发送多个请求：
+    - 单个请求：{"id": 1, "length": 16, "count": 10, "upper": true, ...}，
+      返回 {"id": 1, "tokens": [...]}
+    - 批量请求：{"batch": [请求, ...]}，返回 {"results": [响应, ...]}
+    - 状态：{"op": "stats"}；耗时指标：{"op": "metrics"}（启动时需设置 PWGEN_METRICS=1）
+    未指定的字段使用配置中的默认值；出错时返回 {"error": "..."}，缓冲区耗尽时返回 "busy"。
+    """
+
+    def __init__(self, settings, backend=None):
+        self.settings = settings
+        if backend is None:
+            default = settings.default_algorithm
+            backend = default if default in engine.SECURE_BACKENDS else "secrets"
+        self.backend = backend
+        self._buffers = OrderedDict()
+        self._connections = 0
+        self._served = 0
+
+    def _spec(self, request):
+        """将请求解析为 (长度, 字符池, 约束, 模板)，指定模板（或预设名称）时忽略长度与约束"""
+        settings = self.settings
+        flags = (
+            request.get("upper", settings.default_include_upper),
+            request.get("lower", settings.default_include_lower),
+            request.get("digits", settings.default_include_number),
+            request.get("special", settings.default_include_special),
+        )
+        char_pool = pools.get_pool(*map(bool, flags))
+        if "template" in request:
+            pattern = template.resolve(str(request["template"]), settings.template_presets)
+            compiled = template.compile_template(pattern, char_pool)
+            if not settings.length_min <= compiled.length <= settings.length_max:
+                raise ValueError(f"模板展开后的长度必须在 {settings.length_min}-{settings.length_max} 之间")
+            return compiled.length, char_pool, policy.NO_POLICY, compiled
+        length = int(request.get("length", settings.length_default))
+        if not settings.length_min <= length <= settings.length_max:
+            raise ValueError(f"长度必须在 {settings.length_min}-{settings.length_max} 之间")
+        if char_pool is None:
+            raise ValueError("至少需要选择一种字符类型！")
+        constraints = policy.Policy(
+            request.get("min_per_class", settings.policy_min_per_class),
+            request.get("no_consecutive", settings.policy_no_consecutive),
+            request.get("unique", settings.policy_unique),
+        )
+        return length, char_pool, constraints, None
+
+    def _buffer(self, length, char_pool, constraints, compiled=None):
+        """获取规格对应的缓冲区（最近使用的排在最后）"""
+        key = (length, char_pool.chars if char_pool is not None else None, constraints, compiled)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            if compiled is None:
+                policy.validate(length, char_pool, constraints)
+            buffer = TokenBuffer(length, char_pool, constraints, self.backend, template=compiled)
+            self._buffers[key] = buffer
+            while len(self._buffers) > MAX_BUFFERS:
+                self._buffers.popitem(last=False)
+        else:
+            self._buffers.move_to_end(key)
+        return buffer
+
+    async def handle_request(self, request) -> dict:
+        """处理单个请求（批量请求中的每一项也经过这里）"""
+        if not isinstance(request, dict):
+            return {"error": "请求必须是 JSON 对象"}
+        response = {"id": request["id"]} if "id" in request else {}
+        try:
+            op = request.get("op", "gen")
+            if op == "stats":
+                response.update(self.stats())
+                return response
+            if op == "metrics":
+                response.update(METRICS.snapshot())
+                return response
+            count = int(request.get("count", 1))
+            if not 0 <= count <= MAX_COUNT:
+                raise ValueError(f"数量必须在 0-{MAX_COUNT} 之间")
+            buffer = self._buffer(*self._spec(request))
+            with METRICS.span("request"):
+                response["tokens"] = await buffer.take(count)
+            self._served += count
+            METRICS.count("tokens", count)
+        except asyncio.TimeoutError:
+            response["error"] = "busy"
+            response["retry_after"] = BUSY_TIMEOUT
+        except (TypeError, ValueError, OverflowError) as e:
+            response["error"] = str(e)
+        except Exception:
+            # 单个请求的意外错误不应断开整个连接
+            logger.exception("处理请求失败")
+            response["error"] = "内部错误"
+        return response
+
+    async def handle_connection(self, reader, writer):
+        """处理一个连接上的全部请求，上一个响应写出后才读取下一个请求"""
+        self._connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(json.dumps({"error": "请求过大"}, ensure_ascii=False).encode("utf-8") + b"\n")
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"error": "无效的 JSON"}
+                else:
+                    if isinstance(request, dict) and "batch" in request:
+                        items = request["batch"] if isinstance(request["batch"], list) else [None]
+                        response = {"results": [await self.handle_request(item) for item in items]}
+                    else:
+                        response = await self.handle_request(request)
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                # 客户端读取过慢时在这里等待
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._connections -= 1
+            writer.close()
+
+    def stats(self) -> dict:
+        """服务状态"""
+        return {
+            "connections": self._connections,
+            "served": self._served,
+            "buffers": [self._buffer_stats(key, buffer) for key, buffer in self._buffers.items()],
+        }
+
+    @staticmethod
+    def _buffer_stats(key, buffer) -> dict:
+        """单个缓冲区的状态，模板缓冲区报告模板本身"""
+        length, chars, constraints, compiled = key
+        entry = {"length": length, "pool": len(chars) if chars is not None else 0, "buffered": len(buffer)}
+        if compiled is not None:
+            entry["template"] = compiled.pattern
+        else:
+            entry["constraints"] = repr(constraints)
+        return entry
+
+    async def prefill(self):
+        """启动时按配置中的默认规格预先填充缓冲区"""
+        self._buffer(*self._spec({})).fill()
+
+    async def start(self, host="127.0.0.1", port=8765, unix_path=None):
+        """启动服务，指定 unix_path 时监听 Unix 套接字"""
+        await self.prefill()
+        if unix_path:
+            # 清理上次运行遗留的套接字文件
+            if os.path.exists(unix_path) and stat.S_ISSOCK(os.stat(unix_path).st_mode):
+                os.unlink(unix_path)
+            server = await asyncio.start_unix_server(self.handle_connection, unix_path, limit=MAX_REQUEST_BYTES)
+            logger.info(f"生成服务已启动: {unix_path}")
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_REQUEST_BYTES)
+            logger.info(f"生成服务已启动: {host}:{port}")
+        return server
+
+
+def serve(settings, host="127.0.0.1", port=8765, unix_path=None, backend=None):
+    """运行生成服务直到被中断"""
+
+    async def run():
+        server = await GenerationServer(settings, backend).start(host, port, unix_path)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        logger.info("生成服务已停止")
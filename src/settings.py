@@ -2,8 +2,28 @@
 # @Time     : 2025/2/11
 # @Author   : Mahiro
 # @File     : settings.py
+import copy
 import json
 import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+
+# 影响生成结果的配置项：热更新时只有这些配置项变化才需要重新生成
+GENERATION_KEYS = frozenset({
+    "default_algorithm", "default_math_expression", "length_min", "length_max",
+    "default_include_upper", "default_include_lower", "default_include_number", "default_include_special",
+    "policy_min_per_class", "policy_no_consecutive", "policy_unique",
+    "passphrase_mode", "passphrase_wordlist", "passphrase_words", "passphrase_separator",
+    "passphrase_capitalize", "passphrase_digit",
+    "template_mode", "template_pattern", "template_presets",
+})
+
+# 新建文件的权限：与 open() 创建文件时相同，按 umask 去掉相应的位
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
 
 
 class Settings:
@@ -28,32 +48,158 @@ class Settings:
             "default_include_special": False,
             "copy_highlight_enabled": True,
             "copy_bubble_enabled": True,
-            "copy_highlight_color": "#FFFF99"
+            "copy_highlight_color": "#FFFF99",
+            # 生成约束（见 policy 模块）
+            "policy_min_per_class": 0,
+            "policy_no_consecutive": False,
+            "policy_unique": False,
+            # 口令模式（见 passphrase 模块），词表为每行一个单词的文本文件
+            "passphrase_mode": False,
+            "passphrase_wordlist": "",
+            "passphrase_words": 6,
+            "passphrase_separator": "-",
+            "passphrase_capitalize": False,
+            "passphrase_digit": False,
+            # 模板模式（见 template 模块），预设为 {名称: 模板}
+            "template_mode": False,
+            "template_pattern": "AAAA-9999-????",
+            "template_presets": {
+                "serial": "AAAA-9999-????",
+                "license_key": "[A-HJ-NP-Z2-9]{5}-[A-HJ-NP-Z2-9]{5}-[A-HJ-NP-Z2-9]{5}-[A-HJ-NP-Z2-9]{5}",
+                "pin": "9{6}",
+                "hex_id": "[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+            }
         }
-        self._config = self._default_config.copy()
+        self._config = copy.deepcopy(self._default_config)
+
+        # 事务与后台写入状态
+        self._transaction_depth = 0
+        self._dirty = False
+        self._save_condition = threading.Condition()
+        self._pending_config = None
+        self._writer = None
+        # 同步与后台写入共用的锁与版本号：较早的配置不会覆盖已写入的较新配置
+        self._write_lock = threading.Lock()
+        self._version = 0
+        self._written_version = 0
+
+        # 变更检测与订阅者
+        self._signature = None
+        self._subscribers = []
+
         self.load()
 
+    @property
+    def config_path(self):
+        """配置文件路径"""
+        return self._config_path
+
+    def file_signature(self):
+        """配置文件的签名 (mtime, size, inode)，文件不存在时返回 None"""
+        try:
+            stat = os.stat(self._config_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _merged(self, loaded_config: dict) -> dict:
+        """文件中的配置覆盖默认配置，文件中没有的配置项使用默认值"""
+        config = copy.deepcopy(self._default_config)
+        config.update(loaded_config)
+        return config
+
     def load(self):
         """加载配置文件"""
+        self._signature = self.file_signature()
         try:
+            loaded_config = {}
             if os.path.exists(self._config_path):
                 with open(self._config_path, "r", encoding="utf-8") as f:
                     loaded_config = json.load(f)
-                self._config.update(loaded_config)
+            self._config = self._merged(loaded_config)
             self._apply_config()
         except Exception as e:
             self.logger.error(f"加载配置失败: {str(e)}")
-            self._config = self._default_config.copy()
+            self._config = copy.deepcopy(self._default_config)
             self._apply_config()
 
     def save(self):
-        """保存配置文件"""
+        """保存配置文件，尚未开始的后台写入不再需要"""
+        with self._save_condition:
+            self._pending_config = None
+            self._version += 1
+            version = self._version
+        self._write(dict(self._config), version)
+
+    def save_async(self):
+        """在后台线程中保存配置文件，连续多次请求只写入最新的配置"""
+        with self._save_condition:
+            self._version += 1
+            self._pending_config = (self._version, dict(self._config))
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+                self._writer.start()
+
+    def flush(self):
+        """等待后台写入完成"""
+        with self._save_condition:
+            while self._writer is not None:
+                self._save_condition.wait()
+
+    def _writer_loop(self):
+        """后台写入线程"""
+        while True:
+            with self._save_condition:
+                pending = self._pending_config
+                self._pending_config = None
+                if pending is None:
+                    self._writer = None
+                    self._save_condition.notify_all()
+                    return
+            self._write(pending[1], pending[0])
+
+    def _write(self, config, version):
+        """原子写入：先写临时文件再替换，避免写入中断导致配置文件损坏
+
+        替换后的文件保留原文件的权限与所有者（没有原文件时按 umask），
+        版本号不比已写入的新时跳过。
+        """
+        with self._write_lock:
+            if version <= self._written_version:
+                return
+            try:
+                directory = os.path.dirname(self._config_path)
+                os.makedirs(directory, exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(prefix=".config.", suffix=".tmp", dir=directory)
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump(config, f, ensure_ascii=False, indent=4)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self._copy_permissions(temp_path)
+                    os.replace(temp_path, self._config_path)
+                    self._signature = self.file_signature()
+                    self._written_version = version
+                except BaseException:
+                    os.unlink(temp_path)
+                    raise
+            except Exception as e:
+                self.logger.error(f"保存配置失败: {str(e)}")
+
+    def _copy_permissions(self, temp_path):
+        """临时文件使用原配置文件的权限与所有者"""
         try:
-            os.makedirs(os.path.dirname(self._config_path), exist_ok=True)
-            with open(self._config_path, "w", encoding="utf-8") as f:
-                json.dump(self._config, f, ensure_ascii=False, indent=4)
-        except Exception as e:
-            self.logger.error(f"保存配置失败: {str(e)}")
+            stat = os.stat(self._config_path)
+        except FileNotFoundError:
+            os.chmod(temp_path, FILE_MODE)
+            return
+        os.chmod(temp_path, stat.st_mode & 0o7777)
+        if hasattr(os, "chown"):
+            try:
+                os.chown(temp_path, stat.st_uid, stat.st_gid)
+            except OSError:
+                # 非特权用户无法改为其他所有者，保持当前用户
+                pass
 
     def _apply_config(self):
         """应用配置"""
@@ -61,12 +207,98 @@ class Settings:
             setattr(self, key, value)
 
     def update(self, key, value):
-        """更新配置项"""
+        """更新配置项，值未变化时不写入；事务中只在事务结束时写入一次"""
+        if key in self._config and self._config[key] == value:
+            return
         self._config[key] = value
         setattr(self, key, value)
-        self.save()
+        if self._transaction_depth:
+            self._dirty = True
+        else:
+            self.save()
+
+    def update_many(self, values: dict, background: bool = False):
+        """批量更新配置项，最多写入一次"""
+        with self.transaction(background=background):
+            for key, value in values.items():
+                self.update(key, value)
+
+    @contextmanager
+    def transaction(self, background: bool = False):
+        """配置事务：事务内的修改在最外层事务结束时统一写入
+
+        background=True 时在后台线程中写入，不阻塞界面。
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        finally:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0 and self._dirty:
+                self._dirty = False
+                if background:
+                    self.save_async()
+                else:
+                    self.save()
+
+    def subscribe(self, callback):
+        """订阅配置变化，callback 接收 {配置项: 新值}"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """取消订阅"""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _notify(self, changed):
+        """通知订阅者发生变化的配置项"""
+        for callback in list(self._subscribers):
+            try:
+                callback(changed)
+            except Exception as e:
+                self.logger.error(f"配置变更回调失败: {str(e)}")
 
     def reload(self):
         """重新加载配置（热更新）"""
+        # 先等待尚未完成的后台写入，避免读到旧文件
+        self.flush()
+        old_config = dict(self._config)
         self.load()
         self.logger.info("配置已热更新")
+        changed = {key: value for key, value in self._config.items() if old_config.get(key) != value}
+        if changed:
+            self._notify(changed)
+        return changed
+
+    def reload_if_changed(self):
+        """文件签名变化时才重新读取配置，只通知发生变化的配置项
+
+        文件中删除的配置项恢复为默认值。读取失败（例如文件正在被写入）时保留当前配置，下次检查时重试。
+        """
+        if self._writer is not None:
+            # 自身的后台写入尚未完成
+            return {}
+        signature = self.file_signature()
+        if signature == self._signature:
+            return {}
+        if signature is None:
+            self._signature = None
+            return {}
+        try:
+            with open(self._config_path, "r", encoding="utf-8") as f:
+                loaded_config = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"加载配置失败: {str(e)}")
+            return {}
+        self._signature = signature
+
+        config = self._merged(loaded_config)
+        changed = {key: value for key, value in config.items() if self._config.get(key) != value}
+        self._config = config
+        if not changed:
+            return {}
+        for key, value in changed.items():
+            setattr(self, key, value)
+        self.logger.info(f"配置已热更新: {', '.join(changed)}")
+        self._notify(changed)
+        return changed
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : startup.py
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """启动耗时分析
+
+    未启用时 phase() 不做任何计时；启用后记录每个阶段的耗时，
+    在第一个密码显示出来时输出按阶段划分的报告。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.start = None
+        self.phases = []
+        self._last = None
+        self._reported = False
+
+    def enable(self, start=None):
+        """启用分析，start 为启动时刻（time.perf_counter），默认为当前时刻"""
+        self.enabled = True
+        self.start = time.perf_counter() if start is None else start
+        self._last = self.start
+
+    @contextmanager
+    def phase(self, name):
+        """记录一个阶段的耗时"""
+        if not self.enabled:
+            yield
+            return
+        begin = time.perf_counter()
+        if begin - self._last > 0.0005:
+            # 两个阶段之间未被覆盖的时间
+            self.phases.append(("(其他)", begin - self._last))
+        try:
+            yield
+        finally:
+            self._last = time.perf_counter()
+            self.phases.append((name, self._last - begin))
+
+    def finish(self, name="first_password"):
+        """标记首个结果已显示，输出报告（只输出一次）"""
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+        self.report()
+
+    def report(self, stream=None):
+        """输出各阶段耗时"""
+        stream = stream or sys.stderr
+        total = self._last - self.start
+        stream.write("启动耗时分析:\n")
+        for name, seconds in self.phases:
+            share = seconds / total if total else 0.0
+            stream.write(f"  {name:<20} {seconds * 1000:9.1f} ms {share:7.1%}\n")
+        stream.write(f"  {'total':<20} {total * 1000:9.1f} ms\n")
+        stream.flush()
+
+
+# 全局启动分析器
+PROFILER = StartupProfiler()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : streaming.py
+import mmap
+
+from src import engine, parallel, policy, seeded
+
+# 每块生成的字符数上限，峰值内存只与块大小有关，与生成总量无关
+CHUNK_CHARS = 1024 * 1024
+
+# 内存映射输出时每次映射的窗口大小（字节），写完即解除映射
+MMAP_WINDOW = 8 * 1024 * 1024
+
+
+def output_size(count: int, length: int, sep: bytes = b"\n") -> int:
+    """count 个长度为 length 的字符串（每个以 sep 结尾）的总字节数"""
+    return max(count, 0) * (length + len(sep))
+
+
+def iter_lines(count, length, pool, seed=None, backend="secrets", chunk_chars=CHUNK_CHARS, constraints=None):
+    """逐块产出以换行结尾的多行字节串
+
+    每块约 chunk_chars 个字符；单个字符串超过块大小时按块拆分产出。
+    指定 seed 时按并行模式的分片划分子流，每个分片再按块从其子流中依次生成，
+    输出与多进程一致，内存占用仍只与块大小有关。
+    constraints 为生成约束（policy.Policy）。
+    """
+    per_chunk = max(1, chunk_chars // max(length, 1))
+    if seed is not None:
+        shard_size = parallel.shard_size_for(length)
+        for index, start in enumerate(range(0, count, shard_size)):
+            n = min(shard_size, count - start)
+            stream = seeded.SeededStream(seed, index + 1)
+            for piece in range(0, n, per_chunk):
+                yield seeded.stream_lines(stream, min(per_chunk, n - piece), length, pool, constraints)
+        return
+
+    if constraints is not None and constraints.active:
+        for start in range(0, count, per_chunk):
+            yield policy.generate_lines(min(per_chunk, count - start), length, pool, constraints)
+        return
+
+    if length > chunk_chars:
+        for _ in range(count):
+            yield from engine.iter_random_bytes(length, pool, backend)
+            yield b"\n"
+        return
+
+    remaining = count
+    while remaining > 0:
+        n = min(per_chunk, remaining)
+        yield engine.generate_lines(n, length, pool, backend=backend)
+        remaining -= n
+
+
+def iter_lines_parallel(count, length, pool, workers=None, ordered=True, seed=None, backend="secrets",
+                        constraints=None):
+    """多进程逐分片产出多行字节串（memoryview 只在下一次迭代前有效）"""
+    return parallel.generate_parallel(count, length, pool, workers=workers or None, ordered=ordered, seed=seed,
+                                      backend=backend, constraints=constraints)
+
+
+def write_stream(stream, chunks) -> int:
+    """将各块依次写入输出流，返回写入的字节数"""
+    written = 0
+    for chunk in chunks:
+        stream.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def write_mmap(path, chunks, size, window=MMAP_WINDOW) -> int:
+    """将各块写入预先分配好大小的内存映射文件，返回写入的字节数
+
+    文件先扩展到 size 字节，再按 window 大小逐段映射，写满一段即解除映射，
+    已写入的页由系统回写磁盘，进程常驻内存不随文件大小增长。
+    """
+    granularity = mmap.ALLOCATIONGRANULARITY
+    # 映射偏移必须按分配粒度对齐
+    window = max(granularity, window - window % granularity)
+    with open(path, "w+b") as f:
+        f.truncate(size)
+        offset = 0
+        mapped = None
+        map_start = 0
+        try:
+            for chunk in chunks:
+                # 及时释放视图，块可能是只在本次迭代内有效的共享内存视图
+                with memoryview(chunk) as view:
+                    if offset + len(view) > size:
+                        raise ValueError(f"写入内容超出预分配的大小: {size}")
+                    start = 0
+                    while start < len(view):
+                        if mapped is None or offset >= map_start + len(mapped):
+                            if mapped is not None:
+                                mapped.close()
+                            map_start = offset
+                            mapped = mmap.mmap(f.fileno(), min(window, size - offset), offset=offset)
+                        position = offset - map_start
+                        n = min(len(view) - start, len(mapped) - position)
+                        mapped[position:position + n] = view[start:start + n]
+                        start += n
+                        offset += n
+        finally:
+            if mapped is not None:
+                mapped.close()
+        if offset != size:
+            raise ValueError(f"写入内容不足预分配的大小: {offset}/{size}")
+    return offset
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : tasks.py
+import threading
+
+from src import audit, engine, passphrase, policy, seeded
+from src.metrics import METRICS
+
+
+class Task:
+    """可取消的后台任务的基类：子类实现 run() 与 strength()"""
+
+    def __init__(self):
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """取消任务"""
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def run(self):
+        """执行任务，被取消时返回 None"""
+        raise NotImplementedError
+
+    def strength(self, generated):
+        """结果的强度评估"""
+        raise NotImplementedError
+
+
+class GenerationTask(Task):
+    """可取消的后台生成任务
+
+    任务按块生成，每块之间检查取消标记，输入变化后旧任务可以尽快退出。
+    指定 seed 时使用种子随机流，否则使用 backend 对应的安全随机后端。
+    constraints 为生成约束（policy.Policy），有约束时按约束生成，逐位解码或抽取时同样检查取消标记。
+    """
+    # 每块生成的字符数
+    CHUNK_SIZE = 256 * 1024
+
+    def __init__(self, length: int, pool, backend: str = "secrets", seed=None, constraints=None):
+        super().__init__()
+        self.length = length
+        self.pool = pool
+        self.backend = backend
+        self.seed = seed
+        self.constraints = constraints
+
+    def run(self):
+        """执行生成，任务被取消时返回 None
+
+        计时区间：rng_draw 为取随机字符，assembly 为拼接成最终字符串
+        （按约束生成时两者无法拆分，全部计入 rng_draw）。
+        """
+        stream = seeded.SeededStream(self.seed) if self.seed is not None else None
+        METRICS.count("generations")
+        if self.constraints is not None and self.constraints.active:
+            rng = stream.rng if stream is not None else None
+            with METRICS.span("rng_draw"):
+                return policy.generate(self.length, self.pool, self.constraints, rng, self.is_cancelled)
+        parts = []
+        remaining = self.length
+        while remaining > 0:
+            if self.is_cancelled():
+                return None
+            n = min(self.CHUNK_SIZE, remaining)
+            with METRICS.span("rng_draw"):
+                if stream is None:
+                    parts.append(engine.random_bytes(n, self.pool, self.backend))
+                else:
+                    # 分块调用 choices 与一次性调用得到的序列相同
+                    parts.append(stream.generate(n, self.pool))
+            remaining -= n
+        if self.is_cancelled():
+            return None
+        with METRICS.span("assembly"):
+            if stream is None:
+                return b"".join(parts).decode("latin-1")
+            return "".join(parts)
+
+    def strength(self, generated):
+        """结果的强度评估（见 audit.analyze），结果为空时返回 None"""
+        return audit.analyze(generated) if generated else None
+
+
+class PassphraseTask(Task):
+    """口令生成任务（接口与 GenerationTask 相同）
+
+    词表在后台线程中打开，首次打开时构建偏移索引，之后只需映射。
+    """
+
+    def __init__(self, wordlist_path, spec, seed=None):
+        super().__init__()
+        self.wordlist_path = wordlist_path
+        self.spec = spec
+        self.seed = seed
+        self.wordlist = None
+
+    def run(self):
+        """执行生成，任务被取消时返回 None"""
+        METRICS.count("generations")
+        with METRICS.span("wordlist"):
+            self.wordlist = passphrase.open_wordlist(self.wordlist_path)
+        if self.is_cancelled():
+            return None
+        rng = seeded.SeededStream(self.seed).rng if self.seed is not None else None
+        with METRICS.span("rng_draw"):
+            return passphrase.generate(self.wordlist, self.spec, rng)
+
+    def strength(self, generated) -> dict:
+        """按词表大小计算的强度（字符统计不适用于口令）"""
+        bits = passphrase.entropy_bits(self.wordlist, self.spec)
+        return {"effective_entropy": bits, "rating": audit.rating_for(bits)}
+
+
+class TemplateTask(Task):
+    """模板生成任务（接口与 GenerationTask 相同），template 为编译好的 template.Template"""
+
+    def __init__(self, template, backend: str = "secrets", seed=None):
+        super().__init__()
+        self.template = template
+        self.backend = backend
+        self.seed = seed
+
+    def run(self):
+        """执行生成，任务被取消时返回 None"""
+        METRICS.count("generations")
+        if self.is_cancelled():
+            return None
+        rng = seeded.SeededStream(self.seed).rng if self.seed is not None else None
+        with METRICS.span("rng_draw"):
+            return self.template.generate(self.backend, rng)
+
+    def strength(self, generated) -> dict:
+        """按各位置字符池大小计算的强度（原样字符不计入）"""
+        bits = self.template.entropy_bits
+        return {"effective_entropy": bits, "rating": audit.rating_for(bits)}
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : template.py
+import math
+from functools import lru_cache
+
+from src import engine, parallel, pools, seeded
+from src.batch import TokenBatch
+from src.pools import CharPool
+
+# 模板中表示字符类型的占位符
+PLACEHOLDERS = {
+    "A": pools.POOLS[(True, False, False, False)],
+    "a": pools.POOLS[(False, True, False, False)],
+    "9": pools.POOLS[(False, False, True, False)],
+    "#": pools.POOLS[(False, False, False, True)],
+    "*": pools.POOLS[(True, True, True, True)],
+}
+# 使用当前选中字符类型（字符池）的占位符
+POOL_PLACEHOLDER = "?"
+
+# 单个位置重复次数的上限
+MAX_REPEAT = 1024
+# 展开后位置数的上限
+MAX_POSITIONS = 1 << 16
+
+
+def _pool_chars(pool):
+    """字符池的字符串形式（没有字符池时为 None）"""
+    if pool is None or isinstance(pool, str):
+        return pool
+    return pool.chars if isinstance(pool, CharPool) else "".join(pool)
+
+
+def _parse_set(pattern: str, start: int):
+    """解析 [...] 自定义字符集（支持 0-9 形式的范围），返回 (字符集, 结束位置)"""
+    end = pattern.find("]", start + 1)
+    if end < 0:
+        raise ValueError(f"字符集缺少 ]: 位置 {start}")
+    body = pattern[start + 1:end]
+    chars = []
+    i = 0
+    while i < len(body):
+        if i + 2 < len(body) and body[i + 1] == "-":
+            low, high = ord(body[i]), ord(body[i + 2])
+            if low > high:
+                raise ValueError(f"字符集范围无效: {body[i:i + 3]}")
+            chars.extend(map(chr, range(low, high + 1)))
+            i += 3
+        else:
+            chars.append(body[i])
+            i += 1
+    # 去重并保持顺序，重复的字符会使抽取有偏
+    chars = "".join(dict.fromkeys(chars))
+    if not chars:
+        raise ValueError(f"字符集为空: 位置 {start}")
+    if not chars.isascii() or not chars.isprintable():
+        raise ValueError(f"字符集只能包含可打印的 ASCII 字符: {chars!r}")
+    return CharPool(chars), end + 1
+
+
+def _parse_repeat(pattern: str, start: int):
+    """解析 {n} 重复次数，返回 (次数, 结束位置)，没有重复时次数为 1"""
+    if start >= len(pattern) or pattern[start] != "{":
+        return 1, start
+    end = pattern.find("}", start + 1)
+    if end < 0 or not pattern[start + 1:end].isdigit():
+        raise ValueError(f"重复次数格式应为 {{n}}: 位置 {start}")
+    repeat = int(pattern[start + 1:end])
+    if not 1 <= repeat <= MAX_REPEAT:
+        raise ValueError(f"重复次数必须在 1-{MAX_REPEAT} 之间")
+    return repeat, end + 1
+
+
+def parse(pattern: str, pool=None) -> tuple:
+    """将模板解析为逐位置的列表，每项为 CharPool（随机字符）或 str（原样保留的字符）
+
+    - A / a / 9 / #: 大写字母 / 小写字母 / 数字 / 特殊字符
+    - ?: 当前选中的字符类型（pool），*: 全部字符类型
+    - [...]: 自定义字符集，如 [0-9A-F]
+    - {n}: 前一个位置重复 n 次，如 9{6}
+    - \\x: 字符 x 原样保留；其他字符都原样保留
+    """
+    positions = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            if i + 1 >= len(pattern):
+                raise ValueError("模板不能以 \\ 结尾")
+            item, i = pattern[i + 1], i + 2
+        elif char == "[":
+            item, i = _parse_set(pattern, i)
+        elif char == POOL_PLACEHOLDER:
+            if pool is None:
+                raise ValueError("模板中的 ? 需要选择至少一种字符类型")
+            item, i = pool if isinstance(pool, CharPool) else CharPool(_pool_chars(pool)), i + 1
+        elif char in PLACEHOLDERS:
+            item, i = PLACEHOLDERS[char], i + 1
+        elif char in "]{}":
+            raise ValueError(f"模板中的 {char} 需要使用 \\ 转义: 位置 {i}")
+        else:
+            item, i = char, i + 1
+        repeat, i = _parse_repeat(pattern, i)
+        if len(positions) + repeat > MAX_POSITIONS:
+            raise ValueError(f"模板展开后不能超过 {MAX_POSITIONS} 个位置")
+        positions.extend([item] * repeat)
+    if not positions:
+        raise ValueError("模板不能为空")
+    return tuple(positions)
+
+
+class Template:
+    """编译后的模板
+
+    编译时生成逐位置的表：每个随机位置对应的字符池（含预计算的字节映射表）与其在结果中的字节偏移，
+    以及填好全部原样字符的一行。批量生成时整批复用这张表：每个字符池一次取够整批的随机字符，
+    按列切片写入各位置，原样字符随整行复制，Python 层循环次数只与模板长度有关，与数量无关。
+    """
+    __slots__ = ("pattern", "pool", "positions", "length", "_row", "_columns")
+
+    def __init__(self, pattern: str, pool=None):
+        positions = parse(pattern, pool)
+        row = bytearray()
+        columns = {}
+        for item in positions:
+            if isinstance(item, CharPool):
+                columns.setdefault(item.chars, (item, []))[1].append(len(row))
+                row.append(0)
+            else:
+                row += item.encode("utf-8")
+        object.__setattr__(self, "pattern", pattern)
+        object.__setattr__(self, "pool", _pool_chars(pool))
+        object.__setattr__(self, "positions", positions)
+        object.__setattr__(self, "length", len(row))
+        object.__setattr__(self, "_row", bytes(row))
+        object.__setattr__(self, "_columns", tuple((item, tuple(offsets)) for item, offsets in columns.values()))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Template 不可修改")
+
+    @property
+    def entropy_bits(self) -> float:
+        """每个字符串的熵（位），原样字符不计入"""
+        return sum(len(offsets) * math.log2(len(item)) for item, offsets in self._columns)
+
+    @property
+    def combinations(self) -> int:
+        """可能生成的不同字符串总数"""
+        return math.prod(len(item) ** len(offsets) for item, offsets in self._columns)
+
+    def _key(self):
+        return self.pattern, self.pool
+
+    def __eq__(self, other):
+        return isinstance(other, Template) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __reduce__(self):
+        return Template, self._key()
+
+    def __repr__(self):
+        return f"Template({self.pattern!r})"
+
+    def generate_lines(self, count: int, sep: bytes = b"\n", backend: str = "secrets", rng=None) -> bytes:
+        """批量生成以 sep 结尾的多行字符串（字节形式）
+
+        rng 为种子随机流（random.Random），为 None 时使用 backend 对应的安全随机后端。
+        """
+        if count <= 0:
+            return b""
+        stride = self.length + len(sep)
+        out = bytearray((self._row + sep) * count)
+        for item, offsets in self._columns:
+            width = len(offsets)
+            if rng is None:
+                data = engine.random_bytes(count * width, item, backend)
+            else:
+                data = "".join(rng.choices(item.chars, k=count * width)).encode("latin-1")
+            for column, offset in enumerate(offsets):
+                out[offset::stride] = data[column::width]
+        return bytes(out)
+
+    def generate_token_batch(self, count: int, sep: bytes = b"\n", backend: str = "secrets", rng=None) -> TokenBatch:
+        """批量生成并紧凑存放在一块缓冲区中"""
+        count = max(count, 0)
+        return TokenBatch(self.generate_lines(count, sep, backend, rng), count, self.length, sep)
+
+    def generate_batch(self, count: int, backend: str = "secrets", rng=None) -> list:
+        """批量生成 count 个字符串"""
+        return self.generate_token_batch(count, backend=backend, rng=rng).tolist()
+
+    def generate(self, backend: str = "secrets", rng=None) -> str:
+        """生成单个字符串"""
+        return self.generate_lines(1, b"", backend, rng).decode("utf-8")
+
+
+@lru_cache(maxsize=64)
+def _compile(pattern: str, chars):
+    return Template(pattern, chars)
+
+
+def compile_template(pattern: str, pool=None) -> Template:
+    """编译模板并缓存，pool 为 ? 使用的字符池"""
+    return _compile(pattern, _pool_chars(pool))
+
+
+def resolve(name_or_pattern: str, presets: dict) -> str:
+    """预设名称返回对应的模板，否则视为模板本身"""
+    return presets.get(name_or_pattern, name_or_pattern)
+
+
+def iter_lines(count: int, template: Template, seed=None, backend: str = "secrets", per_chunk: int = 65536):
+    """逐块产出以换行结尾的多行字节串
+
+    指定 seed 时与普通种子模式相同，按分片使用子流，保证输出可复现。
+    """
+    if seed is not None:
+        shard_size = parallel.shard_size_for(template.length)
+        for index, start in enumerate(range(0, count, shard_size)):
+            n = min(shard_size, count - start)
+            yield template.generate_lines(n, rng=seeded.SeededStream(seed, index + 1).rng)
+        return
+    for start in range(0, count, per_chunk):
+        yield template.generate_lines(min(per_chunk, count - start), backend=backend)
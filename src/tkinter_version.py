@@ -1,17 +1,22 @@
 import ctypes
 import datetime
-import json
 import logging
-import math
 import os
+import queue
 import random
-import secrets
 import string
+import sys
+import threading
 import tkinter as tk
 import webbrowser
-from tkinter import ttk, messagebox, font
+from tkinter import ttk, messagebox, font, filedialog
 
-from src.settings import Settings
+from src import engine, passphrase, policy, pools, seed_expression, tasks, template
+from src.config_watcher import ConfigWatcher
+from src.i18n import LOCAL_NAMES, Translator, available_locals
+from src.metrics import METRICS
+from src.result_view import ProgressiveText, needs_wrap
+from src.settings import GENERATION_KEYS, Settings
 
 # 设置logger格式
 logging.basicConfig(
@@ -20,29 +25,57 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.ERROR)
 
-SETTINGS = Settings(logger)
+# 配置与界面语言在首次需要时由 init() 创建，导入模块时不读取任何文件
+SETTINGS = None
+TRANSLATOR = None
 
-try:
-    with open("../data/local.json") as f:
-        LOCAL = json.load(f)
-except Exception as __exp:
-    os.makedirs("../data", exist_ok=True)
-    __config = {"local": "chinese"}
-    with open("../data/local.json", "w") as f:
-        json.dump(__config, f)
 
-# 高DPI适配
-try:
-    ctypes.windll.shcore.SetProcessDpiAwareness(1)
-except Exception as _e:
-    logger.exception(f"高DPI适配失败: {str(_e)}")
+def enable_high_dpi():
+    """高DPI适配（仅 Windows）"""
+    if sys.platform != "win32":
+        return
+    try:
+        ctypes.windll.shcore.SetProcessDpiAwareness(1)
+    except Exception as _e:
+        logger.warning(f"高DPI适配失败: {str(_e)}")
+
+
+def init():
+    """初始化配置、界面语言与高DPI适配（只执行一次）"""
+    global SETTINGS, TRANSLATOR
+    if SETTINGS is not None:
+        return
+    SETTINGS = Settings(logger)
+    # 语言文件在首次使用时才加载
+    TRANSLATOR = Translator(SETTINGS.local)
+    enable_high_dpi()
 
 
 class RandomStringGenerator:
+    # 后台生成结果的轮询间隔（毫秒）
+    POLL_INTERVAL_MS = 20
+    # 检查配置文件变化的间隔（毫秒）
+    CONFIG_CHECK_INTERVAL_MS = 1000
+
     def __init__(self, root):
+        init()
+
         # 初始化设置，从配置中加载
         self._settings()
 
+        # 后台生成任务
+        self._current_task = None
+        self._task_results = queue.Queue()
+        self._polling = False
+        self._seed_time_str = ""
+
+        # 结果显示：完整结果与分段渲染状态、字体度量缓存
+        self._result = ProgressiveText()
+        self._font_metrics = {}
+        self._resize_after_id = None
+        self._strength = None
+        self._metrics_window = None
+
         # 创建主窗口
         self.root = root
         self.root.title(self.window_title)
@@ -59,6 +92,8 @@ class RandomStringGenerator:
         self.include_number = tk.BooleanVar(value=SETTINGS.default_include_number)
         self.include_special = tk.BooleanVar(value=SETTINGS.default_include_special)
         self.algorithm_var = tk.StringVar(value=SETTINGS.default_algorithm)
+        self.passphrase_mode = tk.BooleanVar(value=SETTINGS.passphrase_mode)
+        self.template_mode = tk.BooleanVar(value=SETTINGS.template_mode)
         self.result_var = tk.StringVar()
 
         # 创建UI组件
@@ -69,6 +104,11 @@ class RandomStringGenerator:
         # 绑定事件
         self.event_bind()
 
+        # 监听配置文件变化
+        self.config_watcher = ConfigWatcher(SETTINGS)
+        SETTINGS.subscribe(self._on_settings_changed)
+        self.root.after(self.CONFIG_CHECK_INTERVAL_MS, self._check_config)
+
     def _settings(self):
         """初始化设置，从配置中加载"""
         self._load_settings()
@@ -109,11 +149,12 @@ class RandomStringGenerator:
         main_frame.rowconfigure(5, weight=1)
 
         # 当前时间显示（含毫秒）
-        self.time_label = ttk.Label(main_frame, text="种子生成时间: ")
+        self.time_label = ttk.Label(main_frame)
         self.time_label.grid(row=0, column=0, columnspan=4, sticky=tk.W)
 
         # 表达式输入（条件显示）
-        self.expression_label = ttk.Label(main_frame, text="种子表达式：")
+        self.expression_label = ttk.Label(main_frame)
+        self._bind_text(self.expression_label, "seed_expressions", label=True)
         self.expression_entry = ttk.Entry(
             main_frame, textvariable=self.expression_var, width=40
         )
@@ -122,7 +163,9 @@ class RandomStringGenerator:
         # 长度设置
         length_frame = ttk.Frame(main_frame)
         length_frame.grid(row=2, column=0, columnspan=4, sticky=tk.W)
-        ttk.Label(length_frame, text="字符串长度：").grid(row=0, column=0, sticky=tk.W)
+        length_label = ttk.Label(length_frame)
+        length_label.grid(row=0, column=0, sticky=tk.W)
+        self._bind_text(length_label, "string_length", label=True)
         length_spinbox = ttk.Spinbox(
             length_frame,
             from_=self.length_min,
@@ -155,31 +198,38 @@ class RandomStringGenerator:
         checkbox_frame = ttk.Frame(main_frame)
         checkbox_frame.grid(row=3, column=0, columnspan=5, sticky=tk.NSEW)
         checkbox_frame.columnconfigure((0, 1, 2, 3), weight=1)
-        ttk.Label(checkbox_frame, text="包含字符类型: ").pack(side=tk.LEFT)
-        ttk.Checkbutton(
-            checkbox_frame,
-            text="大写字母",
-            variable=self.include_upper,
-            command=self.generate_string,
-        ).pack(side=tk.LEFT)
-        ttk.Checkbutton(
-            checkbox_frame,
-            text="小写字母",
-            variable=self.include_lower,
-            command=self.generate_string,
-        ).pack(side=tk.LEFT)
-        ttk.Checkbutton(
+        char_label = ttk.Label(checkbox_frame)
+        char_label.pack(side=tk.LEFT)
+        self._bind_text(char_label, "character_type", label=True)
+        for key, variable in (
+                ("uppercase_letters", self.include_upper),
+                ("lowercase_letters", self.include_lower),
+                ("digits", self.include_number),
+                ("special_characters", self.include_special),
+        ):
+            checkbutton = ttk.Checkbutton(
+                checkbox_frame,
+                variable=variable,
+                command=self.generate_string,
+            )
+            checkbutton.pack(side=tk.LEFT)
+            self._bind_text(checkbutton, key)
+        # 口令模式：从词表中抽取单词，忽略长度与字符类型
+        passphrase_check = ttk.Checkbutton(
             checkbox_frame,
-            text="阿拉伯数字",
-            variable=self.include_number,
-            command=self.generate_string,
-        ).pack(side=tk.LEFT)
-        ttk.Checkbutton(
+            variable=self.passphrase_mode,
+            command=lambda: self._toggle_mode(self.passphrase_mode, self.template_mode),
+        )
+        passphrase_check.pack(side=tk.LEFT, padx=(10, 0))
+        self._bind_text(passphrase_check, "passphrase_mode")
+        # 模板模式：按设置中的模板逐位置生成，忽略长度（? 使用所选字符类型）
+        template_check = ttk.Checkbutton(
             checkbox_frame,
-            text="特殊字符",
-            variable=self.include_special,
-            command=self.generate_string,
-        ).pack(side=tk.LEFT)
+            variable=self.template_mode,
+            command=lambda: self._toggle_mode(self.template_mode, self.passphrase_mode),
+        )
+        template_check.pack(side=tk.LEFT)
+        self._bind_text(template_check, "template_mode")
 
         # 结果显示区域
         result_frame = ttk.Frame(main_frame)
@@ -187,7 +237,7 @@ class RandomStringGenerator:
         self.result_text = tk.Text(
             result_frame,
             wrap=tk.NONE,
-            font=("TkDefaultFont", 12),
+            font=("TkFixedFont", 12),
             background="white",
             relief="solid",
             padx=5,
@@ -198,12 +248,17 @@ class RandomStringGenerator:
         )
         self.result_text.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
+        # 强度评估
+        self.strength_label = ttk.Label(result_frame)
+        self.strength_label.pack(side=tk.BOTTOM, anchor=tk.W, pady=(5, 0))
+
         # 滚动条
         scroll_y = ttk.Scrollbar(
             result_frame, orient=tk.VERTICAL, command=self.result_text.yview
         )
         scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        self.result_text.configure(yscrollcommand=scroll_y.set)
+        self._scroll_y = scroll_y
+        self.result_text.configure(yscrollcommand=self._on_result_scroll)
 
         # 按钮布局（居中）
         btn_frame = ttk.Frame(main_frame)
@@ -213,18 +268,42 @@ class RandomStringGenerator:
         btn_frame.columnconfigure(2, weight=1)
         btn_frame.columnconfigure(3, weight=1)
 
-        ttk.Button(btn_frame, text="设置", command=self.show_settings).grid(
-            row=0, column=0, sticky=tk.EW
-        )
-        ttk.Button(btn_frame, text="怎么使用", command=self.show_help).grid(
-            row=0, column=1, padx=5, sticky=tk.EW
-        )
-        ttk.Button(btn_frame, text="重新生成", command=self.generate_string).grid(
-            row=0, column=2, padx=5, sticky=tk.EW
-        )
-        ttk.Button(btn_frame, text="复制到剪贴板", command=self.copy_to_clipboard).grid(
-            row=0, column=3, sticky=tk.EW
-        )
+        settings_button = ttk.Button(btn_frame, command=self.show_settings)
+        settings_button.grid(row=0, column=0, sticky=tk.EW)
+        help_button = ttk.Button(btn_frame, command=self.show_help)
+        help_button.grid(row=0, column=1, padx=5, sticky=tk.EW)
+        generate_button = ttk.Button(btn_frame, command=self.generate_string)
+        generate_button.grid(row=0, column=2, padx=5, sticky=tk.EW)
+        copy_button = ttk.Button(btn_frame, command=self.copy_to_clipboard)
+        copy_button.grid(row=0, column=3, sticky=tk.EW)
+        self._bind_text(settings_button, "settings")
+        self._bind_text(help_button, "how_to_use")
+        self._bind_text(generate_button, "rebuild")
+        self._bind_text(copy_button, "copy_to_clipboard")
+
+        # 动态文本在切换语言时单独更新
+        TRANSLATOR.on_change(self._update_time_label)
+        TRANSLATOR.on_change(self._update_strength_label)
+
+    def _bind_text(self, widget, key, label=False):
+        """绑定控件文本，切换语言时自动更新"""
+        TRANSLATOR.bind(lambda text: widget.config(text=text), key, label=label)
+
+    def _update_time_label(self):
+        """根据算法更新时间标签"""
+        if self.algorithm_var.get() in engine.SECURE_BACKENDS:
+            self.time_label.config(text=TRANSLATOR.get("safe_random_introduce"))
+        else:
+            self.time_label.config(text=TRANSLATOR.label("seed_generation_time") + self._seed_time_str)
+
+    def _update_strength_label(self):
+        """显示当前结果的强度评估"""
+        if self._strength is None:
+            self.strength_label.config(text="")
+            return
+        rating = TRANSLATOR.get(f"strength_ratings.{self._strength['rating']}")
+        value = TRANSLATOR.get("strength_value", rating=rating, bits=self._strength["effective_entropy"])
+        self.strength_label.config(text=TRANSLATOR.label("strength") + value)
 
     def _update_expression_visibility(self):
         """根据算法类型更新种子表达式的可见性"""
@@ -268,16 +347,57 @@ class RandomStringGenerator:
     def toggle_algorithm(self, event=None):
         """切换算法，更新UI显示"""
         self._update_expression_visibility()
-        if self.algorithm_var.get().startswith("secrets"):
-            self.time_label.config(text="安全随机生成（不使用种子）")
-        else:
-            self.time_label.config(text="种子生成时间: ")
+        self._seed_time_str = ""
+        self._update_time_label()
+        if self.algorithm_var.get() not in engine.SECURE_BACKENDS:
             self.generate_string()
 
     def reload_settings(self):
         """重新加载配置"""
         SETTINGS.reload()
+        self.apply_settings()
+
+    def _check_config(self):
+        """定时检查配置文件，外部修改后自动应用"""
+        self.config_watcher.check()
+        self.root.after(self.CONFIG_CHECK_INTERVAL_MS, self._check_config)
+
+    def _on_settings_changed(self, changed):
+        """配置文件发生变化：只应用变化的配置项，生成参数变化时才重新生成
+
+        其他配置项（如复制提示）变化时保留界面上的当前结果与尚未保存的选择。
+        """
         self._load_settings()
+        if "window_title" in changed or "version" in changed:
+            self.root.title(self.window_title)
+        if "min_window_size" in changed:
+            self.root.minsize(*self.min_window_size)
+        if "local" in changed:
+            TRANSLATOR.set_local(SETTINGS.local)
+        variables = {
+            "default_algorithm": self.algorithm_var,
+            "default_include_upper": self.include_upper,
+            "default_include_lower": self.include_lower,
+            "default_include_number": self.include_number,
+            "default_include_special": self.include_special,
+            "passphrase_mode": self.passphrase_mode,
+            "template_mode": self.template_mode,
+        }
+        for key, variable in variables.items():
+            if key in changed:
+                variable.set(changed[key])
+        # 口令模式与模板模式互斥
+        if self.passphrase_mode.get() and self.template_mode.get():
+            self.template_mode.set(False)
+        if GENERATION_KEYS.intersection(changed):
+            self._update_expression_visibility()
+            self.generate_string()
+        logger.info(f"配置已热更新: {', '.join(changed)}")
+
+    def apply_settings(self):
+        """将内存中的配置应用到界面"""
+        self._load_settings()
+        TRANSLATOR.set_local(SETTINGS.local)
         self.root.title(self.window_title)
         self.root.minsize(*self.min_window_size)
         
@@ -287,6 +407,8 @@ class RandomStringGenerator:
         self.include_lower.set(SETTINGS.default_include_lower)
         self.include_number.set(SETTINGS.default_include_number)
         self.include_special.set(SETTINGS.default_include_special)
+        self.passphrase_mode.set(SETTINGS.passphrase_mode)
+        self.template_mode.set(SETTINGS.template_mode and not SETTINGS.passphrase_mode)
         
         # 更新UI
         self._update_expression_visibility()
@@ -296,16 +418,26 @@ class RandomStringGenerator:
     def generate_string(self):
         try:
             # 更新算法UI显示
-            self.toggle_algorithm()
+            self._update_expression_visibility()
+            self._update_time_label()
             
-            char_pool = self.get_char_pool()
-            length = self._get_valid_length()
-            generated = self._generate_with_selected_algorithm(char_pool, length)
-            self._display_result(generated)
+            if self.passphrase_mode.get():
+                task = self._create_passphrase_task()
+            elif self.template_mode.get():
+                task = self._create_template_task()
+            else:
+                task = self._create_task(self.get_char_pool(), self._get_valid_length())
+            self._start_task(task)
         except SyntaxError as e:
             self._handle_syntax_error(e)
         except Exception as e:
-            messagebox.showerror("未知错误", f"生成过程中发生错误: \n{str(e)}")
+            self._show_error("unknown_errors", e)
+
+    def _toggle_mode(self, mode, other):
+        """口令模式与模板模式互斥，勾选其中一个时取消另一个"""
+        if mode.get():
+            other.set(False)
+        self.generate_string()
 
     def _get_valid_length(self):
         """获取有效的长度值"""
@@ -315,59 +447,132 @@ class RandomStringGenerator:
             self.length_var.set(self.length_default)
             return self.length_default
 
-    def _generate_with_selected_algorithm(self, char_pool, length):
-        """根据选择的算法生成随机字符串"""
-        if self.algorithm_var.get().startswith("secrets"):
-            return self._generate_secrets(char_pool, length)
+    def _create_task(self, char_pool, length):
+        """根据选择的算法创建生成任务"""
+        if self.algorithm_var.get() in engine.SECURE_BACKENDS:
+            return self._create_secrets_task(char_pool, length)
         else:
-            return self._generate_random_with_seed(char_pool, length)
+            return self._create_seeded_task(char_pool, length)
 
-    def _generate_secrets(self, char_pool, length):
-        """使用secrets模块生成安全随机字符串"""
-        return "".join(secrets.choice(char_pool) for _ in range(length))
+    def _create_secrets_task(self, char_pool, length):
+        """使用系统熵源批量映射生成安全随机字符串"""
+        return tasks.GenerationTask(
+            length, char_pool, backend=self.algorithm_var.get(), constraints=policy.Policy.from_settings(SETTINGS)
+        )
 
-    def _generate_random_with_seed(self, char_pool, length):
-        """使用random模块和种子生成随机字符串"""
-        current_time = datetime.datetime.now()
-        time_str = current_time.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        self.time_label.config(text=f"种子生成时间: {time_str}")
-        
-        total_seconds = (
-                current_time
-                - current_time.replace(hour=0, minute=0, second=0, microsecond=0)
-        ).total_seconds()
-        
-        context = {
-            "math": math,
-            "total_seconds": total_seconds,
-            "hours": current_time.hour,
-            "minutes": current_time.minute,
-            "seconds": current_time.second,
-            "microseconds": current_time.microsecond,
-        }
+    def _create_seeded_task(self, char_pool, length):
+        """使用种子随机流生成随机字符串（种子在UI线程中计算）"""
+        # 每次生成使用独立的随机流，不修改全局 random 状态
+        return tasks.GenerationTask(
+            length, char_pool, seed=self._evaluate_seed(), constraints=policy.Policy.from_settings(SETTINGS)
+        )
 
-        seed_value = eval(self.expression_var.get(), context)
-        random.seed(abs(seed_value))
-        return "".join(random.choices(char_pool, k=length))
+    def _evaluate_seed(self):
+        """按当前时间计算种子表达式"""
+        current_time = datetime.datetime.now()
+        self._seed_time_str = current_time.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        self._update_time_label()
+
+        with METRICS.span("seed_eval"):
+            seed_value = seed_expression.evaluate(self.expression_var.get(), current_time)
+        return abs(seed_value)
+
+    def _create_passphrase_task(self):
+        """口令模式：从设置中的词表抽取单词（种子随机算法下同样使用种子）"""
+        if not SETTINGS.passphrase_wordlist:
+            raise ValueError(TRANSLATOR.get("passphrase_wordlist_missing"))
+        seed = None if self.algorithm_var.get() in engine.SECURE_BACKENDS else self._evaluate_seed()
+        return tasks.PassphraseTask(
+            SETTINGS.passphrase_wordlist, passphrase.Passphrase.from_settings(SETTINGS), seed
+        )
 
-    def _display_result(self, generated):
-        """显示生成的结果"""
-        self.result_text.config(state=tk.NORMAL)
-        self.result_text.delete("1.0", tk.END)
-        self.result_text.insert(tk.END, generated)
-        self.result_text.config(state=tk.DISABLED)
-        self.adjust_wrap_mode()
+    def _create_template_task(self):
+        """模板模式：模板在界面线程中编译（已缓存），? 使用所选字符类型"""
+        char_pool = pools.get_pool(
+            self.include_upper.get(),
+            self.include_lower.get(),
+            self.include_number.get(),
+            self.include_special.get(),
+        )
+        compiled = template.compile_template(SETTINGS.template_pattern, char_pool)
+        algorithm = self.algorithm_var.get()
+        if algorithm in engine.SECURE_BACKENDS:
+            return tasks.TemplateTask(compiled, backend=algorithm)
+        return tasks.TemplateTask(compiled, seed=self._evaluate_seed())
+
+    def _start_task(self, task):
+        """取消过期任务并在后台线程中执行新任务"""
+        if self._current_task is not None:
+            self._current_task.cancel()
+        self._current_task = task
+        threading.Thread(target=self._run_task, args=(task,), daemon=True).start()
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.POLL_INTERVAL_MS, self._poll_tasks)
+
+    def _run_task(self, task):
+        """后台线程：执行任务并投递结果"""
+        try:
+            self._task_results.put((task, task.run(), None))
+        except Exception as e:
+            self._task_results.put((task, None, e))
+
+    def _poll_tasks(self):
+        """UI线程：取回后台结果，丢弃过期任务的结果"""
+        while True:
+            try:
+                task, generated, error = self._task_results.get_nowait()
+            except queue.Empty:
+                break
+            if task is not self._current_task:
+                continue
+            self._current_task = None
+            if error is not None:
+                self._show_error("unknown_errors", error)
+            elif generated is not None:
+                self._display_result(generated, task)
+
+        if self._current_task is not None:
+            self.root.after(self.POLL_INTERVAL_MS, self._poll_tasks)
+        else:
+            self._polling = False
+
+    def _display_result(self, generated, task):
+        """显示生成的结果（超长结果只渲染首段，滚动到末尾时再追加）"""
+        with METRICS.span("render"):
+            self._result.reset(generated)
+            self.result_text.config(state=tk.NORMAL)
+            self.result_text.delete("1.0", tk.END)
+            self.result_text.insert(tk.END, self._result.next_chunk())
+            self.result_text.config(state=tk.DISABLED)
+            self.adjust_wrap_mode()
+        with METRICS.span("strength"):
+            self._strength = task.strength(generated)
+        self._update_strength_label()
+
+    def _on_result_scroll(self, first, last):
+        """结果框滚动：接近末尾时追加下一段"""
+        self._scroll_y.set(first, last)
+        if float(last) > 0.9 and not self._result.complete:
+            self.result_text.config(state=tk.NORMAL)
+            self.result_text.insert(tk.END, self._result.next_chunk())
+            self.result_text.config(state=tk.DISABLED)
 
     def _handle_syntax_error(self, e):
         """处理语法错误"""
         if not self.expression_var.get():
             if messagebox.askyesno(
-                    "表达式为空", "种子表达式为空，是否使用默认表达式？"
+                    TRANSLATOR.get("empty_expression_message_box.title"),
+                    TRANSLATOR.get("empty_expression_message_box.message"),
             ):
                 self.expression_var.set(self.default_math_expression)
                 self.generate_string()
         else:
-            messagebox.showerror("语法错误", f"生成过程中发生错误：\n{str(e)}")
+            self._show_error("syntax_errors", e)
+
+    def _show_error(self, key, e):
+        """显示错误提示，key 为语言文件中的错误类型"""
+        messagebox.showerror(TRANSLATOR.get(f"{key}.title"), f"{TRANSLATOR.get(f'{key}.message')}\n{str(e)}")
 
     def format_length(self, length):
         if length < self.length_min:
@@ -379,41 +584,51 @@ class RandomStringGenerator:
         return length
 
     def get_char_pool(self):
-        char_pool = []
-        if self.include_upper.get():
-            char_pool.extend(string.ascii_uppercase)
-        if self.include_lower.get():
-            char_pool.extend(string.ascii_lowercase)
-        if self.include_number.get():
-            char_pool.extend("0123456789")
-        if self.include_special.get():
-            char_pool.extend("!@#$%^&*()_+-=[]{}|;:',.<>?/`~")
-
-        if not char_pool:
-            raise ValueError("至少需要选择一种字符类型！")
+        with METRICS.span("pool"):
+            char_pool = pools.get_pool(
+                self.include_upper.get(),
+                self.include_lower.get(),
+                self.include_number.get(),
+                self.include_special.get(),
+            )
+
+        if char_pool is None:
+            raise ValueError(TRANSLATOR.get("char_pool_error"))
 
         return char_pool
 
     def on_window_resize(self, event):
         if event.widget == self.root:
-            self.root.after(10, self.adjust_wrap_mode)
+            # 合并连续的尺寸变化事件
+            if self._resize_after_id is not None:
+                self.root.after_cancel(self._resize_after_id)
+            self._resize_after_id = self.root.after(10, self.adjust_wrap_mode)
+
+    def _get_font_metrics(self):
+        """获取结果字体的 (是否等宽, 字符宽度)，按字体缓存"""
+        font_name = str(self.result_text["font"])
+        if font_name not in self._font_metrics:
+            current_font = font.Font(font=self.result_text["font"])
+            self._font_metrics[font_name] = (bool(current_font.metrics("fixed")), current_font.measure("0"))
+        return self._font_metrics[font_name]
 
     def adjust_wrap_mode(self):
-        self.result_text.configure(wrap=tk.NONE)
-        self.result_text.update_idletasks()
-
-        content = self.result_text.get("1.0", "end-1c").strip()
+        self._resize_after_id = None
+        content = self._result.text
         if not content:
             return
 
-        current_font = font.Font(font=self.result_text["font"])
-        text_width = current_font.measure(content)
+        fixed, char_width = self._get_font_metrics()
         container_width = self.result_text.winfo_width()
-
-        if text_width > container_width:
-            self.result_text.configure(wrap=tk.WORD)
+        if fixed:
+            # 等宽字体直接按字符数计算，不读取控件内容也不逐字测量
+            wrap = needs_wrap(len(content), char_width, container_width)
         else:
-            self.result_text.configure(wrap=tk.NONE)
+            wrap = font.Font(font=self.result_text["font"]).measure(content) > container_width
+
+        wrap_mode = tk.WORD if wrap else tk.NONE
+        if self.result_text.cget("wrap") != wrap_mode:
+            self.result_text.configure(wrap=wrap_mode)
 
     def copy_on_double_click(self, event):
         if self.result_text.cget("wrap") == tk.NONE:
@@ -444,87 +659,273 @@ class RandomStringGenerator:
         if os.path.exists(help_file):
             webbrowser.open(f"file://{help_file}")
         else:
-            messagebox.showinfo("帮助", "帮助文件不存在")
+            messagebox.showinfo(TRANSLATOR.get("help_missing.title"), TRANSLATOR.get("help_missing.message"))
+
+    def show_metrics(self, event=None):
+        """显示调试面板：生成流程各阶段的耗时统计"""
+        if self._metrics_window is not None and self._metrics_window.winfo_exists():
+            self._metrics_window.lift()
+            return
+        window = tk.Toplevel(self.root)
+        window.title(TRANSLATOR.get("debug_panel"))
+        window.geometry("520x360")
+        self._metrics_window = window
+
+        enabled_var = tk.BooleanVar(value=METRICS.enabled)
+        ttk.Checkbutton(
+            window, text=TRANSLATOR.get("metrics_enabled"), variable=enabled_var,
+            command=lambda: METRICS.enable(enabled_var.get())
+        ).pack(anchor=tk.W, padx=10, pady=(10, 0))
+
+        summary_text = tk.Text(window, font=("TkFixedFont", 10), wrap=tk.NONE, height=12)
+
+        def refresh():
+            summary_text.config(state=tk.NORMAL)
+            summary_text.delete("1.0", tk.END)
+            summary_text.insert(tk.END, "\n".join(METRICS.summary_lines()))
+            summary_text.config(state=tk.DISABLED)
+
+        def reset():
+            METRICS.reset()
+            refresh()
+
+        def export():
+            path = filedialog.asksaveasfilename(
+                parent=window, title=TRANSLATOR.get("metrics_export"), initialfile="metrics.json",
+                filetypes=[("JSON", "*.json"), ("Prometheus", "*.prom")]
+            )
+            if path:
+                METRICS.dump(path)
+
+        btn_frame = ttk.Frame(window)
+        btn_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=10)
+        for key, command in (("metrics_refresh", refresh), ("metrics_reset", reset), ("metrics_export", export)):
+            ttk.Button(btn_frame, text=TRANSLATOR.get(key), command=command).pack(side=tk.LEFT, padx=(0, 5))
+        summary_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(5, 0))
+        refresh()
 
     def show_settings(self):
         """显示设置页面"""
         # 创建设置窗口
         settings_window = tk.Toplevel(self.root)
-        settings_window.title("设置")
-        settings_window.geometry("450x400")
-        settings_window.resizable(False, False)
+        settings_window.title(TRANSLATOR.get("settings"))
+        settings_window.resizable(False, True)
         settings_window.transient(self.root)
         settings_window.grab_set()
-        
+
+        # 保存按钮固定在底部，选项放在可滚动的区域中，窗口高度不超过屏幕
+        button_frame = ttk.Frame(settings_window, padding=(20, 10))
+        button_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        canvas = tk.Canvas(settings_window, highlightthickness=0)
+        scrollbar = ttk.Scrollbar(settings_window, orient=tk.VERTICAL, command=canvas.yview)
+        canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
         # 创建主框架
-        main_frame = ttk.Frame(settings_window, padding=20)
-        main_frame.pack(fill=tk.BOTH, expand=True)
+        main_frame = ttk.Frame(canvas, padding=20)
+        canvas.create_window((0, 0), window=main_frame, anchor=tk.NW)
+        main_frame.bind("<Configure>", lambda event: canvas.configure(scrollregion=canvas.bbox("all")))
+        settings_window.bind("<MouseWheel>", lambda event: canvas.yview_scroll(-1 if event.delta > 0 else 1, "units"))
+        settings_window.bind("<Button-4>", lambda event: canvas.yview_scroll(-1, "units"))
+        settings_window.bind("<Button-5>", lambda event: canvas.yview_scroll(1, "units"))
         
         # 算法设置
-        ttk.Label(main_frame, text="默认生成算法:", font=("TkDefaultFont", 10, "bold")).grid(row=0, column=0, sticky=tk.W, pady=(0, 10))
+        ttk.Label(main_frame, text=TRANSLATOR.label("default_algorithm"), font=("TkDefaultFont", 10, "bold")).grid(row=0, column=0, sticky=tk.W, pady=(0, 10))
         self.default_algorithm_var = tk.StringVar(value=SETTINGS.default_algorithm)
-        ttk.Radiobutton(main_frame, text="secrets (安全随机)", variable=self.default_algorithm_var, value="secrets").grid(row=1, column=0, sticky=tk.W, padx=20)
-        ttk.Radiobutton(main_frame, text="random (种子随机)", variable=self.default_algorithm_var, value="random").grid(row=2, column=0, sticky=tk.W, padx=20)
+        ttk.Radiobutton(main_frame, text=f"secrets ({TRANSLATOR.get('safe_random')})", variable=self.default_algorithm_var, value="secrets").grid(row=1, column=0, sticky=tk.W, padx=20)
+        ttk.Radiobutton(main_frame, text=f"numpy ({TRANSLATOR.get('vectorized_random')})", variable=self.default_algorithm_var, value="numpy").grid(row=2, column=0, sticky=tk.W, padx=20)
+        ttk.Radiobutton(main_frame, text=f"random ({TRANSLATOR.get('seed_random')})", variable=self.default_algorithm_var, value="random").grid(row=3, column=0, sticky=tk.W, padx=20)
         
         # 默认字符类型设置
-        ttk.Label(main_frame, text="默认包含字符类型:", font=("TkDefaultFont", 10, "bold")).grid(row=3, column=0, sticky=tk.W, pady=(15, 10))
+        ttk.Label(main_frame, text=TRANSLATOR.label("default_character_type"), font=("TkDefaultFont", 10, "bold")).grid(row=4, column=0, sticky=tk.W, pady=(15, 10))
         self.default_upper_var = tk.BooleanVar(value=SETTINGS.default_include_upper)
         self.default_lower_var = tk.BooleanVar(value=SETTINGS.default_include_lower)
         self.default_number_var = tk.BooleanVar(value=SETTINGS.default_include_number)
         self.default_special_var = tk.BooleanVar(value=SETTINGS.default_include_special)
         
-        ttk.Checkbutton(main_frame, text="大写字母", variable=self.default_upper_var).grid(row=4, column=0, sticky=tk.W, padx=20)
-        ttk.Checkbutton(main_frame, text="小写字母", variable=self.default_lower_var).grid(row=5, column=0, sticky=tk.W, padx=20)
-        ttk.Checkbutton(main_frame, text="阿拉伯数字", variable=self.default_number_var).grid(row=6, column=0, sticky=tk.W, padx=20)
-        ttk.Checkbutton(main_frame, text="特殊字符", variable=self.default_special_var).grid(row=7, column=0, sticky=tk.W, padx=20)
+        ttk.Checkbutton(main_frame, text=TRANSLATOR.get("uppercase_letters"), variable=self.default_upper_var).grid(row=5, column=0, sticky=tk.W, padx=20)
+        ttk.Checkbutton(main_frame, text=TRANSLATOR.get("lowercase_letters"), variable=self.default_lower_var).grid(row=6, column=0, sticky=tk.W, padx=20)
+        ttk.Checkbutton(main_frame, text=TRANSLATOR.get("digits"), variable=self.default_number_var).grid(row=7, column=0, sticky=tk.W, padx=20)
+        ttk.Checkbutton(main_frame, text=TRANSLATOR.get("special_characters"), variable=self.default_special_var).grid(row=8, column=0, sticky=tk.W, padx=20)
         
         # 复制设置
-        ttk.Label(main_frame, text="复制功能设置:", font=("TkDefaultFont", 10, "bold")).grid(row=8, column=0, sticky=tk.W, pady=(15, 10))
+        ttk.Label(main_frame, text=TRANSLATOR.label("copy_settings"), font=("TkDefaultFont", 10, "bold")).grid(row=9, column=0, sticky=tk.W, pady=(15, 10))
         self.copy_highlight_var = tk.BooleanVar(value=SETTINGS.copy_highlight_enabled)
         self.copy_bubble_var = tk.BooleanVar(value=SETTINGS.copy_bubble_enabled)
         
-        ttk.Checkbutton(main_frame, text="复制时高亮文本", variable=self.copy_highlight_var).grid(row=9, column=0, sticky=tk.W, padx=20)
-        ttk.Checkbutton(main_frame, text="显示复制气泡提示", variable=self.copy_bubble_var).grid(row=10, column=0, sticky=tk.W, padx=20)
+        ttk.Checkbutton(main_frame, text=TRANSLATOR.get("copy_highlight"), variable=self.copy_highlight_var).grid(row=10, column=0, sticky=tk.W, padx=20)
+        ttk.Checkbutton(main_frame, text=TRANSLATOR.get("copy_bubble"), variable=self.copy_bubble_var).grid(row=11, column=0, sticky=tk.W, padx=20)
+        
+        # 生成约束
+        ttk.Label(main_frame, text=TRANSLATOR.label("policy_settings"), font=("TkDefaultFont", 10, "bold")).grid(row=12, column=0, sticky=tk.W, pady=(15, 10))
+        self.policy_min_var = tk.IntVar(value=SETTINGS.policy_min_per_class)
+        self.policy_no_consecutive_var = tk.BooleanVar(value=SETTINGS.policy_no_consecutive)
+        self.policy_unique_var = tk.BooleanVar(value=SETTINGS.policy_unique)
+
+        min_frame = ttk.Frame(main_frame)
+        min_frame.grid(row=13, column=0, sticky=tk.W, padx=20)
+        ttk.Label(min_frame, text=TRANSLATOR.label("policy_min_per_class")).pack(side=tk.LEFT)
+        ttk.Spinbox(min_frame, from_=0, to=16, width=5, textvariable=self.policy_min_var).pack(side=tk.LEFT)
+        ttk.Checkbutton(main_frame, text=TRANSLATOR.get("policy_no_consecutive"), variable=self.policy_no_consecutive_var).grid(row=14, column=0, sticky=tk.W, padx=20)
+        ttk.Checkbutton(main_frame, text=TRANSLATOR.get("policy_unique"), variable=self.policy_unique_var).grid(row=15, column=0, sticky=tk.W, padx=20)
+
+        # 口令模式
+        ttk.Label(main_frame, text=TRANSLATOR.label("passphrase_settings"), font=("TkDefaultFont", 10, "bold")).grid(row=16, column=0, sticky=tk.W, pady=(15, 10))
+        self.passphrase_wordlist_var = tk.StringVar(value=SETTINGS.passphrase_wordlist)
+        self.passphrase_words_var = tk.IntVar(value=SETTINGS.passphrase_words)
+        self.passphrase_separator_var = tk.StringVar(value=SETTINGS.passphrase_separator)
+        self.passphrase_capitalize_var = tk.BooleanVar(value=SETTINGS.passphrase_capitalize)
+        self.passphrase_digit_var = tk.BooleanVar(value=SETTINGS.passphrase_digit)
+
+        wordlist_frame = ttk.Frame(main_frame)
+        wordlist_frame.grid(row=17, column=0, sticky=tk.W, padx=20)
+        ttk.Label(wordlist_frame, text=TRANSLATOR.label("passphrase_wordlist")).pack(side=tk.LEFT)
+        ttk.Entry(wordlist_frame, textvariable=self.passphrase_wordlist_var, width=24).pack(side=tk.LEFT)
+        ttk.Button(
+            wordlist_frame, text="...", width=3,
+            command=lambda: self.passphrase_wordlist_var.set(
+                filedialog.askopenfilename(parent=settings_window) or self.passphrase_wordlist_var.get()
+            )
+        ).pack(side=tk.LEFT, padx=(5, 0))
+        words_frame = ttk.Frame(main_frame)
+        words_frame.grid(row=18, column=0, sticky=tk.W, padx=20)
+        ttk.Label(words_frame, text=TRANSLATOR.label("passphrase_words")).pack(side=tk.LEFT)
+        ttk.Spinbox(words_frame, from_=1, to=64, width=5, textvariable=self.passphrase_words_var).pack(side=tk.LEFT)
+        ttk.Label(words_frame, text=TRANSLATOR.label("passphrase_separator")).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Entry(words_frame, textvariable=self.passphrase_separator_var, width=5).pack(side=tk.LEFT)
+        options_frame = ttk.Frame(main_frame)
+        options_frame.grid(row=19, column=0, sticky=tk.W, padx=20)
+        ttk.Checkbutton(options_frame, text=TRANSLATOR.get("passphrase_capitalize"), variable=self.passphrase_capitalize_var).pack(side=tk.LEFT)
+        ttk.Checkbutton(options_frame, text=TRANSLATOR.get("passphrase_digit"), variable=self.passphrase_digit_var).pack(side=tk.LEFT, padx=(10, 0))
+
+        # 模板模式：在预设中输入新名称保存即可添加预设
+        ttk.Label(main_frame, text=TRANSLATOR.label("template_settings"), font=("TkDefaultFont", 10, "bold")).grid(row=20, column=0, sticky=tk.W, pady=(15, 10))
+        self.template_preset_var = tk.StringVar()
+        self.template_pattern_var = tk.StringVar(value=SETTINGS.template_pattern)
+        for name, pattern in SETTINGS.template_presets.items():
+            if pattern == SETTINGS.template_pattern:
+                self.template_preset_var.set(name)
+                break
+
+        template_frame = ttk.Frame(main_frame)
+        template_frame.grid(row=21, column=0, sticky=tk.W, padx=20)
+        ttk.Label(template_frame, text=TRANSLATOR.label("template_preset")).pack(side=tk.LEFT)
+        preset_combo = ttk.Combobox(
+            template_frame, textvariable=self.template_preset_var, values=list(SETTINGS.template_presets), width=12
+        )
+        preset_combo.pack(side=tk.LEFT)
+        preset_combo.bind(
+            "<<ComboboxSelected>>",
+            lambda event: self.template_pattern_var.set(SETTINGS.template_presets[self.template_preset_var.get()])
+        )
+        ttk.Label(template_frame, text=TRANSLATOR.label("template_pattern")).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Entry(template_frame, textvariable=self.template_pattern_var, width=20).pack(side=tk.LEFT)
+        ttk.Label(main_frame, text=TRANSLATOR.get("template_help"), foreground="gray", wraplength=400).grid(row=22, column=0, sticky=tk.W, padx=20)
+
+        # 界面语言
+        ttk.Label(main_frame, text=TRANSLATOR.label("language"), font=("TkDefaultFont", 10, "bold")).grid(row=23, column=0, sticky=tk.W, pady=(15, 10))
+        self._language_codes = available_locals()
+        self.language_var = tk.StringVar(value=LOCAL_NAMES.get(SETTINGS.local, SETTINGS.local))
+        ttk.Combobox(
+            main_frame,
+            textvariable=self.language_var,
+            values=[LOCAL_NAMES.get(local, local) for local in self._language_codes],
+            state="readonly",
+        ).grid(row=24, column=0, sticky=tk.W, padx=20)
         
         # 保存按钮
-        save_btn = ttk.Button(main_frame, text="保存设置", command=lambda: self._save_settings(settings_window))
-        save_btn.grid(row=11, column=0, pady=20, sticky=tk.E)
+        save_btn = ttk.Button(button_frame, text=TRANSLATOR.get("save_settings"), command=lambda: self._save_settings(settings_window))
+        save_btn.pack(side=tk.RIGHT)
         
-        # 居中窗口
+        # 按内容确定大小（高度不超过屏幕）并居中窗口
         settings_window.update_idletasks()
-        width = settings_window.winfo_width()
-        height = settings_window.winfo_height()
+        width = main_frame.winfo_reqwidth() + scrollbar.winfo_reqwidth()
+        canvas.configure(width=main_frame.winfo_reqwidth())
+        height = min(
+            main_frame.winfo_reqheight() + button_frame.winfo_reqheight(),
+            self.root.winfo_screenheight() - 120,
+        )
         x = (self.root.winfo_screenwidth() // 2) - (width // 2)
         y = (self.root.winfo_screenheight() // 2) - (height // 2)
-        settings_window.geometry(f"+{x}+{y}")
+        settings_window.geometry(f"{width}x{height}+{x}+{y}")
 
     def _save_settings(self, settings_window):
         """保存设置"""
-        # 更新配置
-        SETTINGS.update("default_algorithm", self.default_algorithm_var.get())
-        SETTINGS.update("default_include_upper", self.default_upper_var.get())
-        SETTINGS.update("default_include_lower", self.default_lower_var.get())
-        SETTINGS.update("default_include_number", self.default_number_var.get())
-        SETTINGS.update("default_include_special", self.default_special_var.get())
-        SETTINGS.update("copy_highlight_enabled", self.copy_highlight_var.get())
-        SETTINGS.update("copy_bubble_enabled", self.copy_bubble_var.get())
-        
-        # 保存到文件
-        SETTINGS.save()
+        try:
+            min_per_class = max(0, int(self.policy_min_var.get()))
+        except (tk.TclError, ValueError):
+            min_per_class = SETTINGS.policy_min_per_class
+        try:
+            passphrase_words = max(1, int(self.passphrase_words_var.get()))
+        except (tk.TclError, ValueError):
+            passphrase_words = SETTINGS.passphrase_words
+        template_pattern = self.template_pattern_var.get()
+        try:
+            template.parse(template_pattern, pools.DEFAULT_POOL)
+        except ValueError as e:
+            self._show_error("unknown_errors", e)
+            return
+        # 填写了预设名称时保存为预设，覆盖已有的不同预设前需要确认
+        template_presets = dict(SETTINGS.template_presets)
+        preset_name = self.template_preset_var.get().strip()
+        if preset_name and template_presets.get(preset_name, template_pattern) != template_pattern:
+            if messagebox.askyesno(
+                    TRANSLATOR.get("template_preset_overwrite.title"),
+                    TRANSLATOR.get("template_preset_overwrite.message", name=preset_name),
+                    parent=settings_window,
+            ):
+                template_presets[preset_name] = template_pattern
+        elif preset_name:
+            template_presets[preset_name] = template_pattern
+
+        # 更新配置（只在后台写入一次文件）
+        SETTINGS.update_many({
+            "default_algorithm": self.default_algorithm_var.get(),
+            "default_include_upper": self.default_upper_var.get(),
+            "default_include_lower": self.default_lower_var.get(),
+            "default_include_number": self.default_number_var.get(),
+            "default_include_special": self.default_special_var.get(),
+            "copy_highlight_enabled": self.copy_highlight_var.get(),
+            "copy_bubble_enabled": self.copy_bubble_var.get(),
+            "policy_min_per_class": min_per_class,
+            "policy_no_consecutive": self.policy_no_consecutive_var.get(),
+            "policy_unique": self.policy_unique_var.get(),
+            "passphrase_wordlist": self.passphrase_wordlist_var.get().strip(),
+            "passphrase_words": passphrase_words,
+            "passphrase_separator": self.passphrase_separator_var.get(),
+            "passphrase_capitalize": self.passphrase_capitalize_var.get(),
+            "passphrase_digit": self.passphrase_digit_var.get(),
+            "template_pattern": template_pattern,
+            "template_presets": template_presets,
+            "local": self._selected_language(),
+        }, background=True)
         
-        # 重新加载设置
-        self.reload_settings()
+        # 应用设置（内存中的配置已是最新，无需重新读取文件）
+        self.apply_settings()
         
         # 关闭窗口
         settings_window.destroy()
-        messagebox.showinfo("成功", "设置已保存！")
+        messagebox.showinfo(TRANSLATOR.get("settings_saved.title"), TRANSLATOR.get("settings_saved.message"))
+
+    def _selected_language(self):
+        """设置窗口中选择的语言"""
+        selected = self.language_var.get()
+        for local in self._language_codes:
+            if LOCAL_NAMES.get(local, local) == selected:
+                return local
+        return SETTINGS.local
 
     def copy_to_clipboard(self):
         """复制文本到剪贴板，支持高亮和气泡提示"""
         try:
             selected = self.result_text.get(tk.SEL_FIRST, tk.SEL_LAST)
         except tk.TclError:
-            selected = self.result_text.get("1.0", tk.END).strip()
+            selected = self._result.text
+        else:
+            # 选中了全部已渲染的内容时复制完整结果
+            if len(selected) >= self._result.rendered:
+                selected = self._result.text
 
         if selected:
             self.root.clipboard_clear()
@@ -536,7 +937,7 @@ class RandomStringGenerator:
             
             # 显示气泡提示
             if SETTINGS.copy_bubble_enabled:
-                self._show_temporary_message("已复制到剪贴板！")
+                self._show_temporary_message(TRANSLATOR.get("selected_message_box.message"))
 
     def _highlight_text(self):
         """高亮显示结果文本"""
@@ -589,6 +990,9 @@ class RandomStringGenerator:
             self.root.bind(event, self.exit_app)
             self.result_text.bind(event, self.exit_app)
 
+        # F12 打开调试面板
+        self.root.bind("<F12>", self.show_metrics)
+
         # 绑定焦点事件
         self._bind_focus_events()
 
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : test_entropy.py
+import os
+import unittest
+
+from src import entropy
+
+
+class EntropyPoolTest(unittest.TestCase):
+    """缓冲池中的每个字节只使用一次，fork 后父子进程不会得到相同的字节"""
+
+    def test_reads_do_not_repeat(self):
+        pool = entropy.EntropyPool(block_size=4096, background=False)
+        chunks = [pool.read(32) for _ in range(512)]
+        self.assertTrue(all(len(chunk) == 32 for chunk in chunks))
+        self.assertEqual(len(set(chunks)), len(chunks))
+
+    def test_large_read(self):
+        pool = entropy.EntropyPool(background=False)
+        self.assertEqual(len(pool.read(entropy.DIRECT_READ)), entropy.DIRECT_READ)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "需要 os.fork")
+    def test_fork_safety(self):
+        pool = entropy.EntropyPool(block_size=4096)
+        # 父进程先填充缓冲区并启动后台预读
+        pool.read(16)
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(read_fd)
+                os.write(write_fd, pool.read(64))
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as f:
+            child = f.read()
+        os.waitpid(pid, 0)
+        self.assertEqual(len(child), 64)
+        self.assertNotEqual(child, pool.read(64))
+
+    def test_pooled_random(self):
+        rng = entropy.PooledRandom(entropy.EntropyPool(background=False))
+        for bits in (1, 7, 8, 63, 64, 200):
+            self.assertLess(rng.getrandbits(bits), 1 << bits)
+        self.assertTrue(0.0 <= rng.random() < 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : test_parallel.py
+import random
+import unittest
+from unittest import mock
+
+from src import parallel, pools, seeded, streaming
+from src.policy import Policy
+
+POOL = pools.get_pool(True, True, True, False)
+
+
+def _serial(count, length, seed, constraints=None, chunk_chars=streaming.CHUNK_CHARS):
+    return b"".join(streaming.iter_lines(count, length, POOL, seed, chunk_chars=chunk_chars, constraints=constraints))
+
+
+def _parallel(count, length, seed, constraints=None, ordered=True, workers=2):
+    return b"".join(bytes(view) for view in parallel.generate_parallel(
+        count, length, POOL, workers=workers, ordered=ordered, seed=seed, constraints=constraints))
+
+
+class SeededReproducibilityTest(unittest.TestCase):
+    """种子模式下单进程与多进程、不同进程数与不同块大小的输出完全相同"""
+
+    def setUp(self):
+        # 缩小分片，少量字符串也能分成多个分片
+        patcher = mock.patch.object(parallel, "SHARD_BYTES", 1024)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_serial_matches_parallel(self):
+        expected = _serial(500, 16, 42)
+        self.assertEqual(len(expected.split()), 500)
+        self.assertEqual(_parallel(500, 16, 42), expected)
+        self.assertEqual(_parallel(500, 16, 42, workers=3), expected)
+        self.assertEqual(_serial(500, 16, 42, chunk_chars=100), expected)
+        self.assertNotEqual(_serial(500, 16, 43), expected)
+
+    def test_unordered(self):
+        expected = sorted(_serial(500, 16, 7).split())
+        self.assertEqual(sorted(_parallel(500, 16, 7, ordered=False).split()), expected)
+
+    def test_constraints(self):
+        constraints = Policy(min_per_class=2, no_consecutive=True)
+        expected = _serial(300, 12, 5, constraints)
+        self.assertEqual(_parallel(300, 12, 5, constraints), expected)
+        for token in expected.split():
+            self.assertTrue(all(a != b for a, b in zip(token, token[1:])))
+
+    def test_shard_lines(self):
+        data = seeded.shard_lines(9, 3, 10, 8, POOL)
+        stream = seeded.SeededStream(9, 4)
+        pieces = seeded.stream_lines(stream, 4, 8, POOL) + seeded.stream_lines(stream, 6, 8, POOL)
+        self.assertEqual(pieces, data)
+
+
+class SeededStreamTest(unittest.TestCase):
+
+    def test_main_stream_matches_random_seed(self):
+        rng = random.Random(123)
+        self.assertEqual(seeded.SeededStream(123).generate(32, POOL), "".join(rng.choices(POOL.chars, k=32)))
+
+    def test_substreams_independent(self):
+        streams = seeded.SeededStream(123).spawn(3)
+        self.assertEqual(len({stream.generate(32, POOL) for stream in streams}), 3)
+
+
+class ShardSizeTest(unittest.TestCase):
+
+    def test_byte_budget(self):
+        self.assertEqual(parallel.shard_size_for(1 << 30), 1)
+        for length in (1, 16, 1024, 1 << 20):
+            self.assertLessEqual(parallel.shard_size_for(length) * (length + 1),
+                                 max(parallel.SHARD_BYTES, length + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : test_policy.py
+import itertools
+import random
+import unittest
+from collections import Counter
+from unittest import mock
+
+from src import policy
+from src.policy import Policy
+
+# 两种字符类型各两个字符，便于穷举
+POOL = "AB12"
+
+
+def _satisfies(token, constraints):
+    groups = policy.split_pool(POOL)
+    if constraints.unique and len(set(token)) != len(token):
+        return False
+    if constraints.no_consecutive and any(a == b for a, b in zip(token, token[1:])):
+        return False
+    return all(sum(token.count(c) for c in group) >= constraints.min_per_class for group, _ in groups)
+
+
+def _valid_tokens(length, constraints):
+    return {"".join(chars) for chars in itertools.product(POOL, repeat=length)
+            if _satisfies("".join(chars), constraints)}
+
+
+class FeasibilityTest(unittest.TestCase):
+    """计数与可行性检查需要与穷举结果一致"""
+
+    def test_count_matches_enumeration(self):
+        for length in range(0, 7):
+            for min_per_class, no_consecutive, unique in itertools.product(range(4), (False, True), (False, True)):
+                constraints = Policy(min_per_class, no_consecutive, unique)
+                expected = len(_valid_tokens(length, constraints))
+                with self.subTest(length=length, constraints=constraints):
+                    self.assertEqual(policy.count(length, POOL, constraints), expected)
+                    groups = policy.split_pool(POOL)
+                    self.assertEqual(policy.feasible(length, groups, constraints), expected > 0)
+
+    def test_validate_rejects_infeasible(self):
+        with self.assertRaises(ValueError):
+            policy.validate(3, POOL, Policy(min_per_class=2))
+        with self.assertRaises(ValueError):
+            policy.validate(100_000, "A", Policy(no_consecutive=True))
+        policy.validate(100_000, POOL, Policy(min_per_class=1, no_consecutive=True))
+
+
+class UniformityTest(unittest.TestCase):
+    """生成结果只包含满足约束的字符串，且在这些字符串上均匀分布"""
+
+    SAMPLES = 20000
+
+    def _check_uniform(self, length, constraints):
+        valid = _valid_tokens(length, constraints)
+        rng = random.Random(1234)
+        counts = Counter(policy.generate(length, POOL, constraints, rng) for _ in range(self.SAMPLES))
+        self.assertEqual(set(counts), valid)
+        expected = self.SAMPLES / len(valid)
+        chi_square = sum((counts[token] - expected) ** 2 / expected for token in valid)
+        # 自由度 len(valid) - 1，取远大于其均值的阈值，固定种子下不会误报
+        self.assertLess(chi_square, 2 * len(valid) + 30)
+
+    def test_exact_decoding(self):
+        self._check_uniform(4, Policy(min_per_class=1, no_consecutive=True))
+        self._check_uniform(5, Policy(min_per_class=2))
+
+    def test_rejection_sampling(self):
+        with mock.patch.object(policy, "MAX_EXACT_LENGTH", 0):
+            self._check_uniform(4, Policy(min_per_class=1, no_consecutive=True))
+            self._check_uniform(5, Policy(min_per_class=2))
+
+    def test_unique(self):
+        self._check_uniform(3, Policy(min_per_class=1, unique=True))
+
+
+class LongConstrainedTest(unittest.TestCase):
+    """超出计数表规模的长度改用拒绝抽样，并可以取消"""
+
+    def test_long_length(self):
+        token = policy.generate(50_000, POOL, Policy(min_per_class=1, no_consecutive=True), random.Random(1))
+        self.assertEqual(len(token), 50_000)
+        self.assertTrue(all(a != b for a, b in zip(token, token[1:])))
+
+    def test_cancelled(self):
+        constraints = Policy(min_per_class=1, no_consecutive=True)
+        self.assertIsNone(policy.generate(50_000, POOL, constraints, random.Random(1), lambda: True))
+        self.assertIsNone(policy.generate(16, POOL, constraints, random.Random(1), lambda: True))
+
+    def test_too_strict(self):
+        with self.assertRaises(ValueError):
+            # 可以满足，但每组恰好 1000 个的概率极低
+            policy.generate(3000, "ABCxyz123", Policy(min_per_class=1000), random.Random(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
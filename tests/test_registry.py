@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : test_registry.py
+import os
+import tempfile
+import unittest
+
+from src import registry
+from src.registry import TokenRegistry
+
+
+class RegistryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp.cleanup)
+
+    def path(self, name="registry"):
+        return os.path.join(self._temp.name, name)
+
+
+class RegisterTest(RegistryTestCase):
+    """登记时丢弃与历史记录及本批中前面的字符串重复的字符串"""
+
+    def test_dedup(self):
+        with TokenRegistry(self.path()) as reg:
+            self.assertEqual(reg.add_batch(["a", "b", "a", "c"]), ["a", "b", "c"])
+            self.assertEqual(reg.add_batch(["c", "d", "b", "e"]), ["d", "e"])
+            self.assertEqual(len(reg), 5)
+            self.assertIn("d", reg)
+            self.assertNotIn("f", reg)
+
+    def test_limit(self):
+        with TokenRegistry(self.path()) as reg:
+            self.assertEqual(reg.register(["a", "a", "b", "c", "d"], limit=2), [0, 2])
+            self.assertEqual(len(reg), 2)
+
+    def test_persistent(self):
+        with TokenRegistry(self.path()) as reg:
+            reg.add_batch(["a", "b"])
+        with TokenRegistry(self.path()) as reg:
+            self.assertEqual(len(reg), 2)
+            self.assertEqual(reg.add_batch(["b", "c"]), ["c"])
+
+    def test_bloom_growth(self):
+        tokens = [f"token-{i}" for i in range(500)]
+        with TokenRegistry(self.path(), capacity=64) as reg:
+            for start in range(0, len(tokens), 50):
+                reg.add_batch(tokens[start:start + 50])
+            self.assertGreaterEqual(reg.info()["bloom"]["capacity"], len(tokens))
+            self.assertTrue(all(token in reg for token in tokens))
+            self.assertEqual(reg.add_batch(tokens), [])
+
+    def test_locked(self):
+        with TokenRegistry(self.path()):
+            with self.assertRaises(RuntimeError):
+                TokenRegistry(self.path())
+
+
+class MaintenanceTest(RegistryTestCase):
+    """合并与压缩不丢失、不重复记录"""
+
+    def test_merge(self):
+        with TokenRegistry(self.path("other")) as other:
+            other.add_batch(["b", "c", "d"])
+        with TokenRegistry(self.path()) as reg:
+            reg.add_batch(["a", "b"])
+            self.assertEqual(reg.merge(self.path("other")), 2)
+            self.assertEqual(len(reg), 4)
+            self.assertTrue(all(token in reg for token in "abcd"))
+            self.assertEqual(reg.merge(self.path("other")), 0)
+
+    def test_compact(self):
+        tokens = [f"token-{i}" for i in range(100)]
+        with TokenRegistry(self.path()) as reg:
+            for token in tokens:
+                reg.add_batch([token])
+            # 段过多时自动合并
+            self.assertLessEqual(reg.info()["segments"], registry.MAX_SEGMENTS)
+            reg.compact()
+            self.assertEqual(reg.info()["segments"], 1)
+            self.assertEqual(len(reg), len(tokens))
+            self.assertTrue(all(token in reg for token in tokens))
+        with TokenRegistry(self.path()) as reg:
+            self.assertEqual(reg.add_batch(tokens), [])
+
+
+class IssueTest(RegistryTestCase):
+    """发放的字符串在本次与历史发放中都不重复，可用字符串不足时报错"""
+
+    def _issue(self, reg, count, length, pool="0123456789"):
+        return b"".join(registry.issue_lines(reg, count, length, pool, batch_size=64)).split()
+
+    def test_unique_across_runs(self):
+        with TokenRegistry(self.path()) as reg:
+            first = self._issue(reg, 600, 3)
+            second = self._issue(reg, 400, 3)
+        issued = first + second
+        self.assertEqual(len(issued), 1000)
+        self.assertEqual(len(set(issued)), 1000)
+
+    def test_space_too_small(self):
+        with TokenRegistry(self.path()) as reg:
+            with self.assertRaises(RuntimeError):
+                self._issue(reg, 11, 1)
+
+    def test_exhausted(self):
+        with TokenRegistry(self.path()) as reg:
+            self._issue(reg, 10, 1)
+            with self.assertRaises(RuntimeError):
+                self._issue(reg, 1, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : test_seed_expression.py
+import datetime
+import math
+import unittest
+
+from src import seed_expression
+
+TIME = datetime.datetime(2026, 10, 18, 12, 34, 56, 789000)
+
+
+class EvaluateTest(unittest.TestCase):
+    """表达式按时间上下文计算"""
+
+    def test_context(self):
+        total_seconds = 12 * 3600 + 34 * 60 + 56.789
+        self.assertAlmostEqual(seed_expression.evaluate("total_seconds", TIME), total_seconds)
+        self.assertEqual(seed_expression.evaluate("hours * 100 + minutes", TIME), 1234)
+        self.assertEqual(seed_expression.evaluate("math.cos(total_seconds)", TIME), math.cos(total_seconds))
+
+    def test_builtins(self):
+        self.assertEqual(seed_expression.evaluate("max(seconds, 3) + abs(-2)", TIME), 58)
+        self.assertEqual(seed_expression.evaluate("pow(3, 10 ** 9, 7)", TIME), pow(3, 10 ** 9, 7))
+        self.assertEqual(seed_expression.evaluate("2 ** 10 * 3 << 1", TIME), 6144)
+        self.assertEqual(seed_expression.evaluate("math.factorial(20)", TIME), math.factorial(20))
+
+    def test_compiled_once(self):
+        seed_expression.compile_expression.cache_clear()
+        seed_expression.evaluate("seconds + 1", TIME)
+        seed_expression.evaluate("seconds + 1", TIME)
+        self.assertEqual(seed_expression.compile_expression.cache_info().hits, 1)
+
+
+class SandboxTest(unittest.TestCase):
+    """只允许白名单中的语法、名称与 math 属性"""
+
+    def test_rejected_syntax(self):
+        for expression in (
+                "__import__('os')",
+                "(lambda: 1)()",
+                "[x for x in range(3)]",
+                "math.__dict__",
+                "seconds.__class__",
+                "open",
+                "'a' * 3",
+                "int(x=1)",
+                "_pow(2, 3)",
+        ):
+            with self.subTest(expression=expression):
+                with self.assertRaises(SyntaxError):
+                    seed_expression.evaluate(expression, TIME)
+
+    def test_huge_integers(self):
+        for expression in (
+                "9 ** 9 ** 9",
+                "pow(9, 10 ** 6)",
+                "1 << 10 ** 8",
+                "(10 ** 1000) * (10 ** 1000)",
+                "round(7, -10 ** 6)",
+                "math.factorial(10 ** 6)",
+                "math.comb(10 ** 6, 500000)",
+                "math.perm(10 ** 6)",
+        ):
+            with self.subTest(expression=expression):
+                with self.assertRaises(ValueError):
+                    seed_expression.evaluate(expression, TIME)
+
+
+if __name__ == "__main__":
+    unittest.main()
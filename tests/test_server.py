@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : test_server.py
+import asyncio
+import logging
+import unittest
+
+from src.server import GenerationServer
+from src.settings import Settings
+
+
+class StatsTest(unittest.TestCase):
+    """stats 请求需要兼容模板缓冲区"""
+
+    def test_stats_after_template_request(self):
+        async def run():
+            server = GenerationServer(Settings(logging.getLogger(__name__)))
+            tokens = await server.handle_request({
+                "template": "9{4}-[A-F]{2}", "count": 2,
+                # 不选择任何字符类型：模板缓冲区没有字符池
+                "upper": False, "lower": False, "digits": False, "special": False,
+            })
+            self.assertEqual(len(tokens["tokens"]), 2)
+            await server.handle_request({"count": 1, "length": 8})
+            return await server.handle_request({"op": "stats"})
+
+        stats = asyncio.run(run())
+        self.assertNotIn("error", stats)
+        templates = [entry for entry in stats["buffers"] if "template" in entry]
+        self.assertEqual(templates[0]["template"], "9{4}-[A-F]{2}")
+        self.assertEqual(templates[0]["pool"], 0)
+        self.assertEqual(len(stats["buffers"]), 2)
+
+
+class RequestErrorTest(unittest.TestCase):
+    """无效请求返回错误，不会断开连接或分配过大的缓冲区"""
+
+    def _handle(self, request):
+        async def run():
+            server = GenerationServer(Settings(logging.getLogger(__name__)))
+            return await server.handle_request(request)
+
+        return asyncio.run(run())
+
+    def test_overflow(self):
+        self.assertIn("error", self._handle({"min_per_class": 1e400}))
+
+    def test_template_too_long(self):
+        self.assertIn("error", self._handle({"template": "9{1024}" * 2}))
+        self.assertIn("error", self._handle({"template": "9{1024}" * 100}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# @Time     : 2026/10/18
+# @Author   : Mahiro
+# @File     : test_template.py
+import math
+import random
+import unittest
+
+from src import pools, template
+from src.pools import CharPool
+
+
+class ParseTest(unittest.TestCase):
+    """模板解析为逐位置的字符池或原样字符"""
+
+    def test_placeholders(self):
+        positions = template.parse("Aa9#*")
+        self.assertEqual(positions, tuple(template.PLACEHOLDERS[c] for c in "Aa9#*"))
+
+    def test_pool_placeholder(self):
+        pool = pools.get_pool(False, False, True, False)
+        self.assertEqual(template.parse("?", pool)[0].chars, pool.chars)
+        with self.assertRaises(ValueError):
+            template.parse("?")
+
+    def test_sets_and_repeat(self):
+        positions = template.parse("[0-3x]{3}-\\A\\{")
+        self.assertEqual(len(positions), 6)
+        self.assertEqual(positions[0].chars, "0123x")
+        self.assertEqual(positions[3:], ("-", "A", "{"))
+        # 重复的字符去重
+        self.assertEqual(template.parse("[aab]")[0].chars, "ab")
+
+    def test_errors(self):
+        for pattern in ("", "[abc", "[]", "[z-a]", "9{0}", "9{x}", f"9{{{template.MAX_REPEAT + 1}}}",
+                        "a]", "\\", "[é]", "9{1024}" * (template.MAX_POSITIONS // 1024 + 1)):
+            with self.subTest(pattern=pattern):
+                with self.assertRaises(ValueError):
+                    template.parse(pattern)
+
+
+class TemplateTest(unittest.TestCase):
+    """编译后的模板按位置生成，原样字符保持不变"""
+
+    def test_generate_matches_positions(self):
+        compiled = template.compile_template("AA-[0-9a-f]{4}-\\?9")
+        positions = compiled.positions
+        for token in compiled.generate_batch(200):
+            self.assertEqual(len(token), len(positions))
+            for char, item in zip(token, positions):
+                if isinstance(item, CharPool):
+                    self.assertIn(char, item.chars)
+                else:
+                    self.assertEqual(char, item)
+
+    def test_generate_lines(self):
+        compiled = template.compile_template("9{3}x")
+        data = compiled.generate_lines(5, sep=b"\r\n")
+        lines = data.split(b"\r\n")
+        self.assertEqual(lines[-1], b"")
+        self.assertTrue(all(len(line) == 4 and line.endswith(b"x") for line in lines[:-1]))
+
+    def test_strength(self):
+        compiled = template.compile_template("A9{2}-")
+        self.assertEqual(compiled.combinations, 26 * 10 ** 2)
+        self.assertAlmostEqual(compiled.entropy_bits, math.log2(26) + 2 * math.log2(10))
+
+    def test_seeded(self):
+        compiled = template.compile_template("*{12}")
+        self.assertEqual(compiled.generate(rng=random.Random(1)), compiled.generate(rng=random.Random(1)))
+        lines = b"".join(template.iter_lines(10, compiled, seed=3))
+        self.assertEqual(lines, b"".join(template.iter_lines(10, compiled, seed=3)))
+        self.assertEqual(len(lines.split()), 10)
+
+    def test_cached_and_hashable(self):
+        self.assertIs(template.compile_template("A{4}"), template.compile_template("A{4}"))
+        self.assertEqual(template.Template("A{4}"), template.compile_template("A{4}"))
+        with self.assertRaises(AttributeError):
+            template.compile_template("A").pattern = "B"
+
+
+if __name__ == "__main__":
+    unittest.main()